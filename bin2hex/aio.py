@@ -0,0 +1,177 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import io
+import os
+import stat
+import asyncio
+import functools
+import contextlib
+
+from collections import deque
+from typing import AsyncIterator, Iterator, List
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from bin2hex.error import *
+from bin2hex.plan import ConversionPlan
+from bin2hex.registry import default_format
+from bin2hex.stream import map_file, safe_open
+from bin2hex.parallel import SHARD_SIZE_MIN, shard_unit, convert_range
+
+# The input is converted by ranges of this byte count, so a cancelled conversion stops within a range
+AIO_RANGE_SIZE = SHARD_SIZE_MIN
+
+# The next range is converted while the last one is written, more ranges in flight only hold more memory
+AIO_RANGES_IN_FLIGHT = 2
+
+def convert_file_range(plan_class:type, options:dict, stream_kwargs:dict, input_file:str, offset:int, length:int) -> str:
+    # Convert a range of the input file in a worker process
+    # The plan is rebuilt from the options, because the functions of a user ECC file can't be pickled
+    # The options were validated by the caller, so the warnings are not repeated
+    with contextlib.redirect_stdout(io.StringIO()):
+        plan = plan_class(**options)
+    with open(input_file, 'rb') as ifile:
+        input_data = map_file(ifile)
+    return convert_range(plan, {**plan.kwargs, **stream_kwargs}, input_data, offset, length)
+
+class FileSink:
+    # The default sink, which writes the chunks to the output files by a thread of its own,
+    # so the event loop is not blocked by the disk, and the chunks are written in order
+    def __init__(self, plan:ConversionPlan, output_file:str):
+        self.plan = plan
+        self.output_file = output_file
+        self.stack = contextlib.ExitStack()
+        self.executor = ThreadPoolExecutor(1)
+        self.writer = None
+
+    async def run(self, function:callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def open(self) -> None:
+        self.writer = await self.run(self.plan.open_output, self.output_file, self.stack)
+
+    async def write(self, chunk:str) -> None:
+        await self.run(self.writer.write, chunk)
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            await self.run(self.writer.close)
+        await self.run(self.stack.close)
+        self.executor.shutdown(wait = False)
+
+    def remove(self) -> None:
+        self.stack.close()
+        for split_file in self.plan.output_files(self.output_file):
+            with contextlib.suppress(OSError):
+                os.remove(split_file)
+
+    async def abort(self) -> None:
+        # The output files of a failed or cancelled conversion are removed, instead of being left incomplete
+        # They are removed by the thread after the chunk it is writing, so the event loop doesn't wait for the disk,
+        # and a second cancellation doesn't stop the removal
+        removal = self.executor.submit(self.remove)
+        self.executor.shutdown(wait = False)
+        await asyncio.wrap_future(removal)
+
+class TextSink:
+    # The sink given by the user, which has an async write method, receives the text of the output in order
+    # The chunks are joined by the separator of the format, the same as the output file
+    def __init__(self, sink, separator:str):
+        self.sink = sink
+        self.separator = separator
+        self.first = True
+
+    async def open(self) -> None:
+        pass
+
+    async def write(self, chunk:str) -> None:
+        if not chunk:
+            return
+        if not self.first:
+            chunk = self.separator + chunk
+        self.first = False
+        await self.sink.write(chunk)
+
+    async def close(self) -> None:
+        # The sink is closed by the user, who opened it
+        pass
+
+    async def abort(self) -> None:
+        pass
+
+async def convert_ranges(executor:Executor, convert_function:callable, ranges:List[tuple]) -> AsyncIterator[str]:
+    # The outputs of the ranges in order, the next range is converted while the output of the last one is written
+    loop = asyncio.get_running_loop()
+    pending = deque()
+    try:
+        for offset, length in ranges:
+            pending.append(loop.run_in_executor(executor, convert_function, offset, length))
+            if len(pending) >= AIO_RANGES_IN_FLIGHT:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        # The ranges not started yet are not converted after a cancellation or an error
+        for future in pending:
+            future.cancel()
+
+async def step_chunks(executor:Executor, output_chunks:Iterator[str]) -> AsyncIterator[str]:
+    # The chunks of a stream function are produced one block at a time by a thread of the executor
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(executor, next, output_chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+async def convert(input_file:str, output_file:str = None, convert_format:str = default_format, executor:Executor = None, sink = None, **options) -> None:
+    # Convert the input file without blocking the event loop, the options are the same as ConversionPlan
+    # The ranges of the input are converted by the executor, which is the default executor of the loop if None is given,
+    # and a ProcessPoolExecutor converts them in worker processes, so many conversions can run at the same time
+    # The output is written to output_file, or to sink, which is an object with an async write method
+    if (output_file is None) == (sink is None):
+        raise ConversionError(INVALID_OPTION, f"Error: Either an output file or a sink must be specified.")
+    plan = ConversionPlan(convert_format, **options)
+    if sink is not None and plan.split_count > 1:
+        raise ConversionError(INVALID_OPTION, f"Error: The split option can't be used with a sink.")
+
+    ifile = safe_open(input_file, 'rb')
+    if ifile is None:
+        raise ConversionError(INVALID_INPUT_FILE)
+    with ifile:
+        file_stat = os.fstat(ifile.fileno())
+        if not stat.S_ISREG(file_stat.st_mode):
+            raise ConversionError(INVALID_INPUT_FILE, f"Error: {input_file} is not a regular file.")
+        if "sparse_fill" in plan.kwargs:
+            # The address records of the sparse output depend on the words before them, so the blocks are converted in order
+            # by the stream function, which is kept by a thread because it can't be sent to a worker process
+            step_executor = None if isinstance(executor, ProcessPoolExecutor) else executor
+            output_chunks = step_chunks(step_executor, plan.stream_file(ifile))
+        else:
+            # The ranges hold whole lines, so they are converted to the same lines as the whole input
+            stream_kwargs = {}
+            unit = shard_unit(plan, stream_kwargs)
+            range_size = -(-AIO_RANGE_SIZE // unit) * unit
+            ranges = [(offset, min(range_size, file_stat.st_size - offset)) for offset in range(0, file_stat.st_size, range_size)]
+            if isinstance(executor, ProcessPoolExecutor):
+                convert_function = functools.partial(convert_file_range, type(plan), plan.options, stream_kwargs, input_file)
+            else:
+                # The threads share the mapped input and the plan of this conversion
+                convert_function = functools.partial(convert_range, plan, {**plan.kwargs, **stream_kwargs}, map_file(ifile))
+            output_chunks = convert_ranges(executor, convert_function, ranges)
+
+        output_sink = FileSink(plan, output_file) if sink is None else TextSink(sink, plan.separator)
+        try:
+            await output_sink.open()
+            async for chunk in output_chunks:
+                await output_sink.write(chunk)
+            await output_sink.close()
+        except BaseException:
+            await output_sink.abort()
+            raise
+        finally:
+            await output_chunks.aclose()
@@ -0,0 +1,366 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import io
+import os
+import json
+import time
+import contextlib
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import List
+
+from bin2hex.error import *
+from bin2hex.plan import ConversionPlan
+from bin2hex.registry import ecc_dict, default_format, warm_up
+from bin2hex.fanout import fanout_plans, convert_file_fanout
+from bin2hex.parallel import cpu_count
+from bin2hex.stream import safe_open, join_chunks
+
+# The small jobs of convert_many are sent to the workers in batches up to this input byte count,
+# so a worker is not sent a message for every tiny image
+MANY_BATCH_SIZE = 0x100000
+
+# Every worker is given a few batches at least, so a slow batch doesn't hold back the others
+MANY_BATCHES_PER_WORKER = 4
+
+# The pool of convert_many, which is kept for the next calls with its workers warmed up
+_many_executor = None
+_many_workers = None
+
+# The plans of the built-in options in a worker, the plans with a user ECC file are built again,
+# so a changed ECC file is loaded again
+_many_plans = {}
+
+# The options of a job in the manifest, which are named as the long options of the command line tool
+manifest_options = {
+    "address": "start_address",
+    "alignment": "align_width",
+    "ecc": "ecc",
+    "ecc-skip-all-ones": "ecc_skip_all_ones",
+    "ecc-skip-all-zeros": "ecc_skip_all_zeros",
+    "pad-count": "pad_count",
+    "pad-byte": "pad_byte",
+    "split": "split_count",
+    "sparse": "sparse_fill",
+}
+
+manifest_flags = ["ecc-skip-all-ones", "ecc-skip-all-zeros"]
+
+def load_manifest_file(manifest_file:str) -> dict:
+    # The manifest is a TOML file if its extension is ".toml", otherwise a JSON file
+    try:
+        if manifest_file.endswith(".toml"):
+            try:
+                import tomllib
+            except ImportError:
+                try:
+                    import tomli as tomllib
+                except ImportError:
+                    raise ConversionError(INVALID_INPUT_FILE, f"Error: The TOML manifest requires Python 3.11 or the tomli package.")
+            with open(manifest_file, 'rb') as f:
+                return tomllib.load(f)
+        else:
+            with open(manifest_file) as f:
+                return json.load(f)
+    except OSError:
+        raise ConversionError(INVALID_INPUT_FILE, f"Error: The manifest {manifest_file} can't be read.")
+    except ValueError as e:
+        raise ConversionError(INVALID_INPUT_FILE, f"Error: The manifest {manifest_file} is not valid. {e}")
+
+def parse_job(index:int, entry:dict, base_dir:str) -> dict:
+    # Translate a job of the manifest to the arguments of the plans
+    # The paths are relative to the directory of the manifest
+    entry = {key.replace('_', '-'): value for key, value in entry.items()}
+    for key in entry:
+        if key not in manifest_options and key not in ["name", "input", "output", "format"]:
+            raise ConversionError(INVALID_OPTION, f"Error: The option \"{key}\" is not supported.")
+    if "input" not in entry:
+        raise ConversionError(INVALID_INPUT_FILE, f"Error: No input file specified.")
+    if "output" not in entry:
+        raise ConversionError(INVALID_INPUT_FILE, f"Error: No output file specified.")
+
+    output_files = entry["output"] if isinstance(entry["output"], list) else [entry["output"]]
+    convert_formats = entry.get("format", default_format)
+    convert_formats = convert_formats if isinstance(convert_formats, list) else [convert_formats]
+    if not all(isinstance(value, str) for value in [entry["input"]] + output_files + convert_formats):
+        raise ConversionError(INVALID_OPTION, f"Error: The input, output and format of a job must be strings.")
+    if len(output_files) != len(convert_formats):
+        raise ConversionError(INVALID_OPTION, f"Error: {len(convert_formats)} formats are specified for {len(output_files)} output files. Every output file requires a format.")
+
+    options = {}
+    for key, name in manifest_options.items():
+        # A null value in the job clears the option of the defaults
+        if entry.get(key) is None:
+            continue
+        value = entry[key]
+        if key in manifest_flags:
+            if not isinstance(value, bool):
+                raise ConversionError(INVALID_OPTION, f"Error: The option \"{key}\" must be true or false.")
+        elif key == "ecc":
+            # A user ECC file is relative to the manifest too
+            if value not in ecc_dict:
+                value = os.path.join(base_dir, value)
+        elif isinstance(value, str):
+            try:
+                value = int(value, 0)
+            except ValueError:
+                raise ConversionError(INVALID_OPTION, f"Error: The option \"{key}\" must be an integer.")
+        elif not isinstance(value, int) or isinstance(value, bool):
+            raise ConversionError(INVALID_OPTION, f"Error: The option \"{key}\" must be an integer.")
+        options[name] = value
+
+    return {
+        "index": index,
+        "name": str(entry.get("name", output_files[0])),
+        "input": os.path.join(base_dir, entry["input"]),
+        "formats": convert_formats,
+        "outputs": [os.path.join(base_dir, output_file) for output_file in output_files],
+        "options": options,
+    }
+
+def job_plans(job:dict) -> List[ConversionPlan]:
+    if len(job["formats"]) == 1:
+        return [ConversionPlan(job["formats"][0], **job["options"])]
+    return fanout_plans(job["formats"], **job["options"])
+
+def load_manifest(manifest_file:str) -> List[dict]:
+    # Read the manifest and validate all the jobs before any of them is converted
+    # The options in the "defaults" table apply to all the jobs, unless a job sets its own
+    manifest = load_manifest_file(manifest_file)
+    base_dir = os.path.dirname(os.path.abspath(manifest_file))
+    defaults = manifest.get("defaults", {}) if isinstance(manifest, dict) else {}
+    entries = manifest.get("jobs", []) if isinstance(manifest, dict) else manifest
+    if not isinstance(entries, list) or len(entries) == 0:
+        raise ConversionError(INVALID_INPUT_FILE, f"Error: No job is found in the manifest {manifest_file}.")
+
+    # The defaults are merged into every job, so every job is invalid if they are not a table
+    defaults_valid = isinstance(defaults, dict)
+
+    jobs = []
+    errors = []
+    output_files = set()
+    for index, entry in enumerate(entries):
+        try:
+            if not defaults_valid:
+                raise ConversionError(INVALID_INPUT_FILE, f"Error: The defaults of the manifest must be a table of options.")
+            if not isinstance(entry, dict):
+                raise ConversionError(INVALID_INPUT_FILE, f"Error: The job must be a table of options, not {type(entry).__name__}.")
+            job = parse_job(index, {**defaults, **entry}, base_dir)
+            # The warnings of the plans are reported by the conversion of the job
+            with contextlib.redirect_stdout(io.StringIO()):
+                job_plans(job)
+            if not os.path.isfile(job["input"]):
+                raise ConversionError(INVALID_INPUT_FILE, f"Error: {job['input']} doesn't exist.")
+            for output_file in job["outputs"]:
+                if output_file in output_files:
+                    raise ConversionError(INVALID_OPTION, f"Error: The output file {output_file} is written by more than one job.")
+                output_files.add(output_file)
+            jobs.append(job)
+        except ConversionError as e:
+            errors.append((index, e))
+    if errors:
+        for index, e in errors:
+            print(f"Job {index + 1}: {e.message}")
+        raise ConversionError(errors[0][1].code, f"Error: {len(errors)} of {len(entries)} jobs in the manifest {manifest_file} are not valid.")
+    return jobs
+
+def run_job(job:dict) -> tuple:
+    # Convert a job, and return its return code, messages and elapsed time
+    start_time = time.perf_counter()
+    messages = io.StringIO()
+    code = SUCCESS
+    with contextlib.redirect_stdout(messages):
+        try:
+            plans = job_plans(job)
+            ifile = safe_open(job["input"], 'rb')
+            if ifile is None:
+                raise ConversionError(INVALID_INPUT_FILE)
+            with ifile:
+                if len(plans) == 1:
+                    plans[0].write(plans[0].stream_file(ifile), job["outputs"][0])
+                else:
+                    convert_file_fanout(plans, ifile, job["outputs"])
+        except ConversionError as e:
+            if e.message:
+                print(e.message)
+            code = e.code
+        except Exception as e:
+            print(f"Error: {e}")
+            code = GENERAL_FAIL
+    return job["index"], code, messages.getvalue(), time.perf_counter() - start_time
+
+def report_job(job:dict, job_count:int, code:int, messages:str, elapsed:float) -> None:
+    for line in messages.splitlines():
+        print(f"  {line}")
+    status = "Done" if code == SUCCESS else "Failed"
+    print(f"[{job['index'] + 1}/{job_count}] {job['name']}: {status} in {elapsed:.3f}s")
+
+def run_batch(manifest_file:str, workers:int = 1) -> int:
+    # Convert all the jobs of the manifest, the return code is the code of the first failed job
+    try:
+        jobs = load_manifest(manifest_file)
+    except ConversionError as e:
+        if e.message:
+            print(e.message)
+        return e.code
+
+    # The largest inputs are started first, so a large job doesn't start last and hold back the whole batch
+    jobs.sort(key = lambda job: os.path.getsize(job["input"]), reverse = True)
+    start_time = time.perf_counter()
+    codes = [SUCCESS] * len(jobs)
+    if workers <= 1 or len(jobs) == 1:
+        for job in jobs:
+            index, code, messages, elapsed = run_job(job)
+            codes[index] = code
+            report_job(job, len(jobs), code, messages, elapsed)
+    else:
+        with ProcessPoolExecutor(min(workers, len(jobs))) as executor:
+            futures = {executor.submit(run_job, job): job for job in jobs}
+            for future in as_completed(futures):
+                index, code, messages, elapsed = future.result()
+                codes[index] = code
+                report_job(futures[future], len(jobs), code, messages, elapsed)
+
+    failed_codes = [code for code in codes if code != SUCCESS]
+    print(f"{len(jobs) - len(failed_codes)} of {len(jobs)} jobs are done in {time.perf_counter() - start_time:.3f}s.")
+    return failed_codes[0] if failed_codes else SUCCESS
+
+def many_plan(options:dict) -> ConversionPlan:
+    ecc = options.get("ecc")
+    if ecc is not None and ecc not in ecc_dict:
+        return ConversionPlan(**options)
+    key = tuple(sorted(options.items()))
+    if key not in _many_plans:
+        _many_plans[key] = ConversionPlan(**options)
+    return _many_plans[key]
+
+def run_many_job(job:dict) -> dict:
+    # Convert a job of convert_many, the errors are returned in its result instead of raised
+    start_time = time.perf_counter()
+    messages = io.StringIO()
+    code = SUCCESS
+    text = None
+    with contextlib.redirect_stdout(messages):
+        try:
+            options = {key: value for key, value in job.items() if key not in ["input", "output"]}
+            try:
+                plan = many_plan(options)
+            except TypeError as e:
+                raise ConversionError(INVALID_OPTION, f"Error: The options of the job are not valid. {e}")
+            if isinstance(job.get("input"), (bytes, bytearray, memoryview)):
+                text = plan.convert(job["input"])
+                if job.get("output") is not None:
+                    with contextlib.ExitStack() as stack:
+                        writer = plan.open_output(job["output"], stack)
+                        writer.write(text)
+                        writer.close()
+                    text = None
+            elif job.get("output") is not None:
+                plan.convert_file(job.get("input"), job["output"])
+            else:
+                ifile = safe_open(job.get("input"), 'rb')
+                if ifile is None:
+                    raise ConversionError(INVALID_INPUT_FILE)
+                with ifile:
+                    text = join_chunks(plan.stream_file(ifile), plan.separator)
+        except ConversionError as e:
+            if e.message:
+                print(e.message)
+            code = e.code
+            text = None
+        except Exception as e:
+            print(f"Error: {e}")
+            code = GENERAL_FAIL
+            text = None
+    return {"code": code, "text": text, "messages": messages.getvalue(), "seconds": time.perf_counter() - start_time}
+
+def run_many_batch(jobs:List[dict]) -> List[dict]:
+    return [run_many_job(job) for job in jobs]
+
+def job_size(job:dict) -> int:
+    if isinstance(job.get("input"), (bytes, bytearray, memoryview)):
+        return len(job["input"])
+    try:
+        return os.path.getsize(job["input"])
+    except (OSError, TypeError, KeyError):
+        return 0
+
+def many_batches(jobs:List[dict], workers:int) -> List[List[dict]]:
+    # The jobs are grouped in their order, so the results of the batches are in the order of the jobs
+    batch_size = min(MANY_BATCH_SIZE, max(1, sum(job_size(job) for job in jobs) // (workers * MANY_BATCHES_PER_WORKER)))
+    batches = []
+    size = 0
+    for job in jobs:
+        if not batches or size >= batch_size:
+            batches.append([])
+            size = 0
+        batches[-1].append(job)
+        size += job_size(job)
+    return batches
+
+def many_executor(workers:int) -> ProcessPoolExecutor:
+    # The workers import all the converters and build the ECC tables when they start, once for all the calls
+    global _many_executor, _many_workers
+    if _many_executor is not None and _many_workers != workers:
+        _many_executor.shutdown()
+        _many_executor = None
+    if _many_executor is None:
+        _many_executor = ProcessPoolExecutor(workers, initializer = warm_up)
+        _many_workers = workers
+    return _many_executor
+
+def shutdown_many() -> None:
+    # Stop the workers kept by convert_many, the next call starts them again
+    global _many_executor, _many_workers
+    if _many_executor is not None:
+        _many_executor.shutdown()
+    _many_executor = None
+    _many_workers = None
+
+def failed_result(e:Exception) -> dict:
+    return {"code": GENERAL_FAIL, "text": None, "messages": f"Error: The job failed in the worker process. {e}\n", "seconds": 0.0}
+
+def run_many_alone(executor:ProcessPoolExecutor, job:dict) -> dict:
+    try:
+        return executor.submit(run_many_batch, [job]).result()[0]
+    except BrokenProcessPool as e:
+        shutdown_many()
+        return failed_result(e)
+    except Exception as e:
+        return failed_result(e)
+
+def convert_many(jobs:List[dict], max_workers:int = None) -> List[dict]:
+    # Convert many images by the worker processes, which are kept for the next calls
+    # A job is a dict of "input", which is a file name or the data, the optional "output" file name,
+    # and the options of ConversionPlan, such as "convert_format" and "ecc"
+    # The results are in the order of the jobs, every result is a dict of "code", "text", "messages" and "seconds",
+    # "text" is the output of the job without an output file, and a failed job doesn't stop the others
+    # The views of the data can't be sent to the workers, so they are copied to bytes
+    jobs = [dict(job, input = bytes(job["input"])) if isinstance(job.get("input"), (bytearray, memoryview)) else job for job in jobs]
+    workers = max_workers if max_workers is not None else cpu_count()
+    if workers <= 1 or len(jobs) <= 1:
+        return run_many_batch(jobs)
+    executor = many_executor(workers)
+    futures = [(executor.submit(run_many_batch, batch_jobs), batch_jobs) for batch_jobs in many_batches(jobs, workers)]
+    results = []
+    for future, batch_jobs in futures:
+        try:
+            results.extend(future.result())
+        except BrokenProcessPool as e:
+            # The batch is lost with its worker, a broken pool is not kept, the next call starts new workers
+            shutdown_many()
+            results.extend(failed_result(e) for _ in batch_jobs)
+        except Exception as e:
+            # A job of the batch can't be sent to the worker, such as an option which can't be pickled,
+            # so the jobs are sent again one by one, and only the job itself fails
+            if len(batch_jobs) == 1:
+                results.append(failed_result(e))
+            else:
+                results.extend(run_many_alone(executor, job) for job in batch_jobs)
+    return results
@@ -0,0 +1,263 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import inspect
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from bin2hex import __version__
+from bin2hex.error import *
+from bin2hex.engine import default_engine
+from bin2hex.plan import ConversionPlan
+from bin2hex.registry import format_dict
+from bin2hex.stats import peak_rss
+
+# The default sizes of the images, from a boot ROM to a flash bank
+BENCH_SIZES_DEFAULT = "64K,1M,16M"
+
+# A case is a regression if its throughput is lower than the baseline by more than this ratio
+BENCH_THRESHOLD_DEFAULT = 0.1
+
+# The images are generated block by block, so an image of GB scale is never held in memory
+BENCH_BLOCK_SIZE = 1 << 20
+
+# Half of the erased image is erased, by runs of this byte count
+BENCH_ERASED_RUN = 0x10000
+
+# The image size of the startup cases, which is converted in much less time than starting the command line tool
+BENCH_STARTUP_SIZE = 0x400
+
+size_units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+def parse_size(text:str) -> int:
+    text = text.strip().upper()
+    if text and text[-1] in size_units:
+        return int(text[:-1], 0) * size_units[text[-1]]
+    return int(text, 0)
+
+def format_size(size:int) -> str:
+    for unit in ["G", "M", "K"]:
+        if size >= size_units[unit] and size % size_units[unit] == 0:
+            return f"{size // size_units[unit]}{unit}"
+    return str(size)
+
+def bench_formats() -> List[str]:
+    # The aliases are converted by the same function, so only the first name of every function is measured
+    functions = set()
+    convert_formats = []
+    for convert_format, format_sub_dict in format_dict.items():
+        if format_sub_dict["function"] not in functions:
+            functions.add(format_sub_dict["function"])
+            convert_formats.append(convert_format)
+    return convert_formats
+
+def supports_ecc(convert_format:str) -> bool:
+    # ARM SECDED supports some data widths only
+    try:
+        ConversionPlan(convert_format, ecc = "arm_secded").convert(bytes(16))
+        return True
+    except (ValueError, ConversionError):
+        return False
+
+def bench_cases(convert_format:str) -> List[tuple]:
+    # Every case is (name, plan options, whether the image is half erased)
+    parameters = inspect.signature(format_dict[convert_format]["function"]).parameters
+    cases = [(convert_format, {"convert_format": convert_format}, False)]
+    if "ecc_encode" in parameters and supports_ecc(convert_format):
+        cases.append((f"{convert_format}+ecc", {"convert_format": convert_format, "ecc": "arm_secded"}, False))
+        cases.append((f"{convert_format}+ecc+skip", {"convert_format": convert_format, "ecc": "arm_secded", "ecc_skip_all_ones": True}, True))
+    if "pad_count" in parameters:
+        cases.append((f"{convert_format}+pad", {"convert_format": convert_format, "pad_count": 1}, False))
+    cases.append((f"{convert_format}+split", {"convert_format": convert_format, "split_count": 4}, False))
+    return cases
+
+def generate_image(image_file:str, size:int, seed:int, erased:bool) -> None:
+    # The same seed generates the same image, so the results of different runs are comparable
+    rng = random.Random(seed)
+    with open(image_file, 'wb') as f:
+        for offset in range(0, size, BENCH_BLOCK_SIZE):
+            block_size = min(BENCH_BLOCK_SIZE, size - offset)
+            block = bytearray(rng.getrandbits(block_size * 8).to_bytes(block_size, 'little'))
+            if erased:
+                # Every other run is erased, as the free space of a flash image
+                # The block size is a multiple of two runs, so every block starts with a random run
+                for i in range(BENCH_ERASED_RUN, len(block), 2 * BENCH_ERASED_RUN):
+                    block[i : i + BENCH_ERASED_RUN] = b"\xFF" * len(block[i : i + BENCH_ERASED_RUN])
+            f.write(block)
+
+def run_case(options:dict, input_file:str, output_file:str, repeat:int) -> tuple:
+    # Convert the image for repeat times in a new process, and return the best time and the peak memory
+    plan = ConversionPlan(**options)
+    elapsed = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            plan.convert_file(input_file, output_file)
+            run_time = time.perf_counter() - start_time
+            elapsed = run_time if elapsed is None else min(elapsed, run_time)
+    return elapsed, peak_rss()
+
+def print_header() -> None:
+    print(f"{'Case':<28} {'Size':>6} {'Time':>10} {'MB/s':>10} {'Words/s':>14} {'Peak RSS':>12}")
+
+def print_result(result:dict) -> None:
+    rss_text = f"{result['peak_rss_kb']} KB" if result["peak_rss_kb"] is not None else "-"
+    print(f"{result['case']:<28} {format_size(result['size']):>6} {result['seconds']:>9.4f}s {result['mb_per_s']:>10.2f} {result['words_per_s']:>14.0f} {rss_text:>12}")
+
+def run_bench(convert_formats:List[str], sizes:List[int], repeat:int = 3, seed:int = 0) -> List[dict]:
+    results = []
+    with tempfile.TemporaryDirectory(prefix = "bin2hex-bench-") as work_dir:
+        print_header()
+        for size in sizes:
+            images = {}
+            for convert_format in convert_formats:
+                for name, options, erased in bench_cases(convert_format):
+                    if erased not in images:
+                        images[erased] = os.path.join(work_dir, f"image_{size}_{int(erased)}.bin")
+                        generate_image(images[erased], size, seed, erased)
+                    # Every case runs in a new process, so the peak memory is of the case only
+                    with ProcessPoolExecutor(1) as executor:
+                        elapsed, rss = executor.submit(run_case, options, images[erased], os.path.join(work_dir, "output.txt"), repeat).result()
+                    elapsed = max(elapsed, 1e-9)
+                    result = {
+                        "case": name,
+                        "size": size,
+                        "seconds": elapsed,
+                        "mb_per_s": size / elapsed / 1e6,
+                        "words_per_s": size / format_dict[convert_format]["data_width"] / elapsed,
+                        "peak_rss_kb": rss,
+                    }
+                    results.append(result)
+                    print_result(result)
+                    for output_file in os.listdir(work_dir):
+                        if output_file.startswith("output"):
+                            os.remove(os.path.join(work_dir, output_file))
+            for image_file in images.values():
+                os.remove(image_file)
+    return results
+
+def run_startup(repeat:int = 3, seed:int = 0) -> List[dict]:
+    # The time of importing the command line tool and of converting a small image by it, which is mostly the time of starting it
+    # The time of starting the interpreter alone is the lower bound of the others
+    results = []
+    with tempfile.TemporaryDirectory(prefix = "bin2hex-bench-") as work_dir:
+        image_file = os.path.join(work_dir, "image.bin")
+        generate_image(image_file, BENCH_STARTUP_SIZE, seed, False)
+        cases = [
+            ("startup+python", [sys.executable, "-c", "pass"]),
+            ("startup+import", [sys.executable, "-c", "import bin2hex.main"]),
+            ("startup", [sys.executable, "-m", "bin2hex", "-i", image_file, "-o", os.path.join(work_dir, "output.hex"), "-f", "vhex_dw4"]),
+            ("startup+ecc", [sys.executable, "-m", "bin2hex", "-i", image_file, "-o", os.path.join(work_dir, "output.hex"), "-f", "vhex_dw4", "-e", "arm_secded"]),
+        ]
+        print_header()
+        for name, command in cases:
+            elapsed = None
+            for _ in range(repeat):
+                start_time = time.perf_counter()
+                subprocess.run(command, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+                run_time = time.perf_counter() - start_time
+                elapsed = run_time if elapsed is None else min(elapsed, run_time)
+            result = {
+                "case": name,
+                "size": BENCH_STARTUP_SIZE,
+                "seconds": elapsed,
+                "mb_per_s": BENCH_STARTUP_SIZE / elapsed / 1e6,
+                "words_per_s": BENCH_STARTUP_SIZE / 4 / elapsed,
+                "peak_rss_kb": None,
+            }
+            results.append(result)
+            print_result(result)
+    return results
+
+def compare_results(results:List[dict], baseline:List[dict], threshold:float = BENCH_THRESHOLD_DEFAULT) -> List[tuple]:
+    # The cases slower than the baseline by more than the threshold, as (case, size, throughput, baseline throughput)
+    baseline_results = {(result["case"], result["size"]): result for result in baseline}
+    regressions = []
+    for result in results:
+        baseline_result = baseline_results.get((result["case"], result["size"]))
+        if baseline_result is not None and result["mb_per_s"] < baseline_result["mb_per_s"] * (1 - threshold):
+            regressions.append((result["case"], result["size"], result["mb_per_s"], baseline_result["mb_per_s"]))
+    return regressions
+
+def main(argv:List[str] = None) -> int:
+    parse = argparse.ArgumentParser(prog = "python -m bin2hex.bench", description = "Measure the conversion speed of bin2hex for every format and ECC mode")
+    parse.add_argument('-s', '--sizes', default = BENCH_SIZES_DEFAULT, help = f"[Optional] The image sizes separated by commas, with unit K, M or G. Default is \"{BENCH_SIZES_DEFAULT}\"")
+    parse.add_argument('-f', '--formats', default = None, help = f"[Optional] The formats separated by commas. Default is all the formats")
+    parse.add_argument('-r', '--repeat', type = int, default = 3, help = f"[Optional] The best time of this count of runs is taken. Default is 3")
+    parse.add_argument('--seed', type = int, default = 0, help = f"[Optional] The seed of the random images. Default is 0")
+    parse.add_argument('--startup', action = 'store_true', default = False, help = f"[Optional] Measure the time of starting the command line tool for a small image, instead of the formats")
+    parse.add_argument('-o', '--output', default = None, help = f"[Optional] Save the results to this JSON file")
+    parse.add_argument('-b', '--baseline', default = None, help = f"[Optional] Compare the results with the baseline JSON file saved before")
+    parse.add_argument('-t', '--threshold', type = float, default = BENCH_THRESHOLD_DEFAULT, help = f"[Optional] The slowdown ratio flagged as a regression. Default is {BENCH_THRESHOLD_DEFAULT}")
+    args = parse.parse_args(argv)
+
+    convert_formats = bench_formats() if args.formats is None else args.formats.split(",")
+    for convert_format in convert_formats:
+        if convert_format not in format_dict:
+            print(f"Error: The format {convert_format} is not supported.")
+            return INVALID_FORMAT
+    try:
+        sizes = [parse_size(size) for size in args.sizes.split(",")]
+    except ValueError:
+        print(f"Error: The sizes {args.sizes} are not valid.")
+        return INVALID_OPTION
+    if args.repeat < 1:
+        print(f"Error: The repeat count {args.repeat} is not valid. It must be 1 at least.")
+        return INVALID_OPTION
+
+    baseline = None
+    if args.baseline is not None:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)["results"]
+        except (OSError, ValueError, KeyError):
+            print(f"Error: The baseline {args.baseline} can't be read.")
+            return INVALID_INPUT_FILE
+
+    if args.startup is True:
+        results = run_startup(args.repeat, args.seed)
+    else:
+        results = run_bench(convert_formats, sizes, args.repeat, args.seed)
+
+    if args.output is not None:
+        report = {
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "engine": default_engine,
+            "results": results,
+        }
+        try:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent = 2)
+        except OSError:
+            print(f"Error: The results can't be written to {args.output}.")
+            return FAIL_WRITE_OUTPUT_FILE
+
+    if baseline is not None:
+        regressions = compare_results(results, baseline, args.threshold)
+        for case, size, mb_per_s, baseline_mb_per_s in regressions:
+            print(f"Regression: {case} {format_size(size)} is {mb_per_s:.2f} MB/s, the baseline is {baseline_mb_per_s:.2f} MB/s ({mb_per_s / baseline_mb_per_s - 1:+.1%}).")
+        if regressions:
+            return GENERAL_FAIL
+        print(f"No regression against the baseline {args.baseline}.")
+    return SUCCESS
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -5,47 +5,30 @@
 # SPDX-License-Identifier: BSD-3-Clause
 #
 
-def bin_to_c_uintx(input_data:bytes, align_width:int = 16, data_width:int = 1, swap_endian:bool = False) -> str:
-    output_data = ""
-    count = 0
-    align_count = 0
+from typing import Iterable, Iterator
+
+from bin2hex.engine import hex_lines
+from bin2hex.stream import align_blocks
 
+def bin_to_c_uintx(input_data:bytes, align_width:int = 16, data_width:int = 1, swap_endian:bool = False) -> str:
     if align_width % data_width != 0:
         print(f"Warning: The alignment width {align_width} is not aligned to the data width {data_width}. Expanding the alignment width to {align_width + data_width - (align_width % data_width)}.")
         align_width += data_width - (align_width % data_width)
 
-    if len(input_data) != 0:
-        while True:
-            # Bytes to convert
-            data_bytes = input_data[count : count + data_width]
-            # Pad zeros if the data is not aligned to the data width
-            if len(data_bytes) < data_width:
-                print(f"Warning: The input data is not aligned to the data width {data_width}. Padding zeros.")
-                data_bytes += b'\x00' * (data_width - len(data_bytes))
-            # Convert the binary bytes to hex string sequence
-            hex_seq = data_bytes.hex().upper()
-            # Handle the endian sequence
-            if swap_endian:
-                hex_str = hex_seq
-            else:
-                hex_str = ''.join([hex_seq[i-1:i] + hex_seq[i:i+1] for i in range(len(hex_seq) - 1, -1, -2)])
-            # Append the hex string
-            output_data += '0x' + hex_str
-            count += data_width
-            align_count += data_width
-            # Break if no more data to handle
-            if count >= len(input_data):
-                break
-            else:
-                output_data += ","
-            # Alignment control
-            if align_count >= align_width:
-                output_data += '\n'
-                align_count = 0
-            else:
-                output_data += ' '
-
-    return output_data
+    # Pad zeros if the data is not aligned to the data width
+    if len(input_data) % data_width != 0:
+        print(f"Warning: The input data is not aligned to the data width {data_width}. Padding zeros.")
+        input_data = bytes(input_data) + b'\x00' * (data_width - len(input_data) % data_width)
+
+    # A line holds one word at least
+    line_width = max(align_width, data_width)
+
+    if len(input_data) == 0:
+        return ""
+
+    # Every word is prefixed by "0x", including the first word of every line
+    output_lines = hex_lines(input_data, data_width, line_width, swap_endian, ', 0x')
+    return '0x' + ',\n0x'.join(output_lines)
 
 def bin_to_c_uint8(input_data:bytes, align_width:int = 16) -> str:
     return bin_to_c_uintx(input_data, align_width, 1, False)
@@ -59,9 +42,34 @@ def bin_to_c_uint32(input_data:bytes, align_width:int = 16) -> str:
 def bin_to_c_uint64(input_data:bytes, align_width:int = 16) -> str:
     return bin_to_c_uintx(input_data, align_width, 8, False)
 
+def iter_c_uintx(input_blocks:Iterable[bytes], align_width:int = 16, data_width:int = 1, swap_endian:bool = False) -> Iterator[str]:
+    if align_width % data_width != 0:
+        print(f"Warning: The alignment width {align_width} is not aligned to the data width {data_width}. Expanding the alignment width to {align_width + data_width - (align_width % data_width)}.")
+        align_width += data_width - (align_width % data_width)
+
+    # Every block holds whole lines, so the line layout is the same as converting the input at once
+    for block in align_blocks(input_blocks, max(align_width, data_width)):
+        yield bin_to_c_uintx(block, align_width, data_width, swap_endian)
+
+def iter_c_uint8(input_blocks:Iterable[bytes], align_width:int = 16) -> Iterator[str]:
+    return iter_c_uintx(input_blocks, align_width, 1, False)
+
+def iter_c_uint16(input_blocks:Iterable[bytes], align_width:int = 16) -> Iterator[str]:
+    return iter_c_uintx(input_blocks, align_width, 2, False)
+
+def iter_c_uint32(input_blocks:Iterable[bytes], align_width:int = 16) -> Iterator[str]:
+    return iter_c_uintx(input_blocks, align_width, 4, False)
+
+def iter_c_uint64(input_blocks:Iterable[bytes], align_width:int = 16) -> Iterator[str]:
+    return iter_c_uintx(input_blocks, align_width, 8, False)
+
 bin2c_dict = {
     "c_uint8": {
         "function": bin_to_c_uint8,
+        "stream_function": iter_c_uint8,
+        "separator": ",\n",
+        "data_width": 1,
+        "fixed_line": True,
         "description": [
             "Convert to the c header file which can be included by C source file to init an 'uint8_t' table",
             "The option \"alignment\" is accepted as optional. Default is 16, which means 16 bytes per line",
@@ -72,6 +80,10 @@ bin2c_dict = {
     },
     "c_uint16": {
         "function": bin_to_c_uint16,
+        "stream_function": iter_c_uint16,
+        "separator": ",\n",
+        "data_width": 2,
+        "fixed_line": True,
         "description": [
             "Convert to the c header file which can be included by C source file to init an 'uint16_t' table",
             "The option \"alignment\" is accepted as optional. Default is 16, which means 16 bytes per line",
@@ -82,6 +94,10 @@ bin2c_dict = {
     },
     "c_uint32": {
         "function": bin_to_c_uint32,
+        "stream_function": iter_c_uint32,
+        "separator": ",\n",
+        "data_width": 4,
+        "fixed_line": True,
         "description": [
             "Convert to the c header file which can be included by C source file to init an 'uint32_t' table",
             "The option \"alignment\" is accepted as optional. Default is 16, which means 16 bytes per line",
@@ -92,6 +108,10 @@ bin2c_dict = {
     },
     "c_uint64": {
         "function": bin_to_c_uint64,
+        "stream_function": iter_c_uint64,
+        "separator": ",\n",
+        "data_width": 8,
+        "fixed_line": True,
         "description": [
             "Convert to the c header file which can be included by C source file to init an 'uint64_t' table.",
             "The option \"alignment\" is accepted as optional. Default is 16, which means 16 bytes per line",
@@ -5,30 +5,128 @@
 # SPDX-License-Identifier: BSD-3-Clause
 #
 
+import sys
+import binascii
+
+from array import array
+from typing import Iterable, Iterator
+
+from bin2hex.engine import hex_words, interleave_words
+from bin2hex.stream import align_blocks
+
 def bin_to_denali(input_data:bytes) -> str:
-    output_data = ""
-    count = 0
-
-    if len(input_data) != 0:
-        while True:
-            # Bytes to convert
-            data_bytes = input_data[count : count + 1]
-            # Convert the binary bytes to hex string
-            hex_str = data_bytes.hex().upper()
-            # Append the hex string
-            output_data += f"{count:X}" + "/" + hex_str + ";"
-            count = count + 1
-            # Break if no more data to handle
-            if count >= len(input_data):
-                break
-            else:
-                output_data += "\n"
+    return _bin_to_denali_block(input_data, 0x0, 1)
+
+def bin_to_denali_dwn(input_data:bytes, data_width:int = 1) -> str:
+    return _bin_to_denali_block(input_data, 0x0, data_width)
+
+def bin_to_denali_dw2(input_data:bytes) -> str:
+    return bin_to_denali_dwn(input_data, 2)
+
+def bin_to_denali_dw4(input_data:bytes) -> str:
+    return bin_to_denali_dwn(input_data, 4)
+
+def bin_to_denali_dw8(input_data:bytes) -> str:
+    return bin_to_denali_dwn(input_data, 8)
+
+def bin_to_denali_dw16(input_data:bytes) -> str:
+    return bin_to_denali_dwn(input_data, 16)
+
+def _hex_address_groups(start_address:int, word_count:int) -> Iterator[tuple]:
+    # Split the addresses to the ranges whose addresses have the same count of hex digits
+    end_address = start_address + word_count
+    digits = 1
+    while start_address < end_address:
+        if start_address < 16 ** digits:
+            yield start_address, min(end_address, 16 ** digits), digits
+            start_address = min(end_address, 16 ** digits)
+        digits += 1
+
+# The 4 ASCII hex digits of every 16-bit address, which is built at the first use
+_address_table = None
+
+def _hex_addresses(start_address:int, end_address:int, digits:int) -> bytearray:
+    # The ASCII hex digits of the addresses, which have the same count of digits
+    global _address_table
+    if _address_table is None:
+        addresses = array('H', range(0x10000))
+        if sys.byteorder == "little":
+            addresses.byteswap()
+        _address_table = binascii.hexlify(addresses).upper()
 
+    output_data = bytearray()
+    # The high digits are the same in a 64K range, and the low 4 digits are sliced from the table
+    while start_address < end_address:
+        range_end = min(end_address, (start_address | 0xFFFF) + 1)
+        count = range_end - start_address
+        low_digits = _address_table[(start_address & 0xFFFF) * 4 : ((range_end - 1) & 0xFFFF) * 4 + 4]
+        if digits > 4:
+            output_data += interleave_words([(f"{start_address >> 16:X}".encode("ascii") * count, digits - 4), (low_digits, 4)], count)
+        else:
+            # The leading zeros are removed
+            range_data = bytearray(digits * count)
+            for i in range(digits):
+                range_data[i::digits] = low_digits[4 - digits + i::4]
+            output_data += range_data
+        start_address = range_end
     return output_data
 
+def _bin_to_denali_block(input_data:bytes, start_address:int, data_width:int = 1) -> str:
+    # Pad zeros if the data is not aligned to the data width
+    if len(input_data) % data_width != 0:
+        print(f"Warning: The input data is not aligned to the data width {data_width}. Padding zeros.")
+        input_data = bytes(input_data) + b'\x00' * (data_width - len(input_data) % data_width)
+
+    # The address of a word is its index in the memory
+    word_address = start_address // data_width
+    word_count = len(input_data) // data_width
+    # The hex digits of all the words are converted at once
+    word_text = hex_words(input_data, data_width, False, "").encode("ascii")
+    word_digits = data_width * 2
+
+    # Every line is "ADDRESS/WORD;", the lines are built column by column
+    output_data = bytearray()
+    for group_start, group_end, digits in _hex_address_groups(word_address, word_count):
+        count = group_end - group_start
+        offset = (group_start - word_address) * word_digits
+        columns = [
+            (_hex_addresses(group_start, group_end, digits), digits),
+            (b"/" * count, 1),
+            (word_text[offset : offset + count * word_digits], word_digits),
+            (b";\n" * count, 2),
+        ]
+        output_data += interleave_words(columns, count)
+    # No newline after the last line
+    return output_data[:-1].decode("ascii")
+
+def iter_denali(input_blocks:Iterable[bytes], start_address:int = 0x0) -> Iterator[str]:
+    return iter_denali_dwn(input_blocks, 1, start_address)
+
+def iter_denali_dwn(input_blocks:Iterable[bytes], data_width:int = 1, start_address:int = 0x0) -> Iterator[str]:
+    # The start address is the offset of the first block in the image, it is used by the parallel conversion
+    for block in align_blocks(input_blocks, data_width):
+        yield _bin_to_denali_block(block, start_address, data_width)
+        start_address += len(block)
+
+def iter_denali_dw2(input_blocks:Iterable[bytes], start_address:int = 0x0) -> Iterator[str]:
+    return iter_denali_dwn(input_blocks, 2, start_address)
+
+def iter_denali_dw4(input_blocks:Iterable[bytes], start_address:int = 0x0) -> Iterator[str]:
+    return iter_denali_dwn(input_blocks, 4, start_address)
+
+def iter_denali_dw8(input_blocks:Iterable[bytes], start_address:int = 0x0) -> Iterator[str]:
+    return iter_denali_dwn(input_blocks, 8, start_address)
+
+def iter_denali_dw16(input_blocks:Iterable[bytes], start_address:int = 0x0) -> Iterator[str]:
+    return iter_denali_dwn(input_blocks, 16, start_address)
+
 bin2model_dict = {
     "denali": {
         "function": bin_to_denali,
+        "stream_function": iter_denali,
+        "separator": "\n",
+        "data_width": 1,
+        "fixed_line": False,
         "description": [
             "Convert to the file which can be used by Cadence denali model",
             "No option is accepted",
@@ -38,4 +136,68 @@ bin2model_dict = {
             "  ......",
         ],
     },
+    "denali_dw2": {
+        "function": bin_to_denali_dw2,
+        "stream_function": iter_denali_dw2,
+        "separator": "\n",
+        "data_width": 2,
+        "fixed_line": False,
+        "description": [
+            "Convert to the file which can be used by Cadence denali model with 2-byte(16-bit) width",
+            "The address of every line is the index of the word",
+            "No option is accepted",
+            "The format will be:",
+            "  0/0100",
+            "  1/0302",
+            "  ......",
+        ],
+    },
+    "denali_dw4": {
+        "function": bin_to_denali_dw4,
+        "stream_function": iter_denali_dw4,
+        "separator": "\n",
+        "data_width": 4,
+        "fixed_line": False,
+        "description": [
+            "Convert to the file which can be used by Cadence denali model with 4-byte(32-bit) width",
+            "The address of every line is the index of the word",
+            "No option is accepted",
+            "The format will be:",
+            "  0/03020100",
+            "  1/07060504",
+            "  ......",
+        ],
+    },
+    "denali_dw8": {
+        "function": bin_to_denali_dw8,
+        "stream_function": iter_denali_dw8,
+        "separator": "\n",
+        "data_width": 8,
+        "fixed_line": False,
+        "description": [
+            "Convert to the file which can be used by Cadence denali model with 8-byte(64-bit) width",
+            "The address of every line is the index of the word",
+            "No option is accepted",
+            "The format will be:",
+            "  0/0706050403020100",
+            "  1/0F0E0D0C0B0A0908",
+            "  ......",
+        ],
+    },
+    "denali_dw16": {
+        "function": bin_to_denali_dw16,
+        "stream_function": iter_denali_dw16,
+        "separator": "\n",
+        "data_width": 16,
+        "fixed_line": False,
+        "description": [
+            "Convert to the file which can be used by Cadence denali model with 16-byte(128-bit) width",
+            "The address of every line is the index of the word",
+            "No option is accepted",
+            "The format will be:",
+            "  0/0F0E0D0C0B0A09080706050403020100",
+            "  1/1F1E1D1C1B1A19181716151413121110",
+            "  ......",
+        ],
+    },
 }
\ No newline at end of file
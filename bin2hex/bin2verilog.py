@@ -4,79 +4,276 @@
 #
 # SPDX-License-Identifier: BSD-3-Clause
 #
+import re
 import inspect
 
-def bin_to_vhex_dwn(input_data:bytes, data_width:int = 1, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, swap_endian:int = False) -> str:
-    output_data = ""
-    count = 0
-
-    if len(input_data) != 0:
-        while True:
-            # Bytes to convert
-            data = input_data[count : count + data_width]
-            # Pad zeros if the data is not aligned to the data width
-            if len(data) < data_width:
-                print(f"Warning: The input data is not aligned to the data width {data_width}. Padding zeros.")
-                data +=b'\x00' * (data_width - len(data))
-
-            if ecc_encode is not None:
-                clean_ecc = False
-                if ecc_skip is not None:
-                    if all(b == (ecc_skip & 0xFF) for b in data):
-                        clean_ecc = True
-                if "start_address" in inspect.signature(ecc_encode).parameters:
-                    data = ecc_encode(data, data_width, start_address)
-                else:
-                    data = ecc_encode(data, data_width)
-                # We cannot skip ECC encoding, because the ECC bit count is unknown here
-                if clean_ecc:
-                    data = bytes([ecc_skip] * len(data))
+from typing import Iterable, Iterator, List
+
+from bin2hex.engine import bin_words, hex_lines, hex_words, interleave_words
+from bin2hex.stream import align_blocks
+
+# The erased runs shorter than this count of words are left in the encoded data, and their ECC is overwritten
+ERASED_RUN_MIN = 16
+
+# The runs of fill words shorter than this count of words are written in the sparse output, which are not worth an address record
+SPARSE_RUN_MIN = 4
 
-            # Pad the data if required
-            if pad_count > 0:
-               data += bytes([pad_byte] * pad_count)
+class WordEncoder:
+    # Everything about the memory word that doesn't depend on the data is resolved once here,
+    # so the same encoder is reused by all the blocks of a conversion
+    def __init__(self, data_width:int = 1, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, swap_endian:bool = False, ecc_encode_batch:callable = None, sparse_fill:int = None):
+        self.data_width = data_width
+        self.ecc_encode = ecc_encode
+        self.ecc_encode_batch = ecc_encode_batch
+        self.ecc_skip = ecc_skip
+        self.pad_count = pad_count
+        self.pad_byte = pad_byte
+        self.swap_endian = swap_endian
+        # The calling convention of the ECC functions
+        self.ecc_encode_address = ecc_encode is not None and "start_address" in inspect.signature(ecc_encode).parameters
+        self.ecc_encode_batch_address = ecc_encode_batch is not None and "start_address" in inspect.signature(ecc_encode_batch).parameters
+        # The erased data whose ECC is skipped, it is only meaningful with the ECC
+        if ecc_encode is not None and ecc_skip is not None:
+            self.skip_pattern = re.compile(re.escape(bytes([ecc_skip & 0xFF])) + b"{%d,}" % data_width)
+        else:
+            self.skip_pattern = None
+        # The padding bytes appended to every word
+        self.pad_suffix = bytes([pad_byte]) * pad_count
+        # The memory word and the lines of the erased data, which are built at the first use
+        self.erased_word = None
+        self.erased_lines = {}
+        # The sparse output omits the memory words filled by sparse_fill
+        # The index of the next word, and whether an address record is required before it, are kept across the blocks
+        self.sparse_fill = sparse_fill
+        self.sparse_patterns = {}
+        self.word_index = 0
+        self.word_gap = False
 
-            # Convert the binary data to hex string sequence
-            hex_seq = data.hex().upper()
+    def align(self, input_data:bytes) -> bytes:
+        # Pad zeros if the data is not aligned to the data width
+        if len(input_data) % self.data_width != 0:
+            print(f"Warning: The input data is not aligned to the data width {self.data_width}. Padding zeros.")
+            input_data = bytes(input_data) + b'\x00' * (self.data_width - len(input_data) % self.data_width)
+        return input_data
 
-            # Handle the endian sequence
-            if swap_endian:
-                hex_str = hex_seq
+    def find_erased(self, input_data:bytes) -> list:
+        # The byte ranges of the erased words, the runs are found by one scan of the whole data
+        data_width = self.data_width
+        erased_runs = []
+        for match in self.skip_pattern.finditer(input_data):
+            run_start = -(-match.start() // data_width) * data_width
+            run_end = match.end() // data_width * data_width
+            if run_end > run_start:
+                erased_runs.append((run_start, run_end))
+        return erased_runs
+
+    def get_erased_word(self) -> bytes:
+        # The erased memory word is all skip bytes, the ECC is encoded once only to know its width
+        # The probe is not a word of the input, so the untimed ECC functions are called if the statistics timed them
+        if self.erased_word is None:
+            data_width = self.data_width
+            skip_word = bytes([self.ecc_skip & 0xFF]) * data_width
+            if self.ecc_encode_batch is not None:
+                ecc_encode_batch = getattr(self.ecc_encode_batch, "untimed", self.ecc_encode_batch)
+                if self.ecc_encode_batch_address:
+                    word_width = data_width + len(ecc_encode_batch(memoryview(skip_word), data_width, 0x0))
+                else:
+                    word_width = data_width + len(ecc_encode_batch(memoryview(skip_word), data_width))
             else:
-                hex_str = ''.join([hex_seq[i-1:i] + hex_seq[i:i+1] for i in range(len(hex_seq) - 1, -1, -2)])
-
-            # Append the hex string
-            output_data += hex_str
-            count += data_width
-            start_address += data_width
-            # Break if no more data to handle
-            if count >= len(input_data):
-                break
+                ecc_encode = getattr(self.ecc_encode, "untimed", self.ecc_encode)
+                if self.ecc_encode_address:
+                    word_width = len(ecc_encode(skip_word, data_width, 0x0))
+                else:
+                    word_width = len(ecc_encode(skip_word, data_width))
+            self.erased_word = bytes([self.ecc_skip]) * word_width + self.pad_suffix
+        return self.erased_word
+
+    # Encode the data words and return the memory words with their width
+    def encode(self, input_data:bytes, start_address:int = 0x0, erased_runs:list = None) -> tuple:
+        data_width = self.data_width
+        input_data = self.align(input_data)
+        if erased_runs is None and self.skip_pattern is not None:
+            erased_runs = self.find_erased(input_data)
+
+        word_count = len(input_data) // data_width
+        columns = [(input_data, data_width)]
+        if self.ecc_encode is not None and word_count != 0:
+            if self.ecc_encode_batch is not None:
+                columns.append(self.encode_ecc_batch(input_data, word_count, start_address, erased_runs))
             else:
-                output_data += '\n'
+                columns = [self.encode_ecc_per_word(input_data, word_count, start_address, erased_runs)]
+
+        # Pad the data if required
+        if self.pad_count > 0:
+            columns.append((self.pad_suffix * word_count, self.pad_count))
+
+        if len(columns) == 1:
+            return columns[0]
+        return interleave_words(columns, word_count), sum(width for _, width in columns)
+
+    def encode_ecc_batch(self, input_data:bytes, word_count:int, start_address:int, erased_runs:list) -> tuple:
+        data_width = self.data_width
+        # The batch function returns only the ECC bytes of all the words, which are interleaved with the data
+        if self.ecc_encode_batch_address:
+            ecc_data = self.ecc_encode_batch(memoryview(input_data), data_width, start_address)
+        else:
+            ecc_data = self.ecc_encode_batch(memoryview(input_data), data_width)
+        if len(ecc_data) % word_count != 0:
+            raise ValueError(f"Error: The ECC batch function returns {len(ecc_data)} bytes, which is not a multiple of the word count {word_count}.")
+        ecc_width = len(ecc_data) // word_count
+        if erased_runs:
+            ecc_data = bytearray(ecc_data)
+            for run_start, run_end in erased_runs:
+                ecc_data[run_start // data_width * ecc_width : run_end // data_width * ecc_width] = bytes([self.ecc_skip]) * ((run_end - run_start) // data_width * ecc_width)
+        return ecc_data, ecc_width
+
+    def encode_ecc_per_word(self, input_data:bytes, word_count:int, start_address:int, erased_runs:list) -> tuple:
+        data_width = self.data_width
+        ecc_encode = self.ecc_encode
+        # The ECC function is given bytes words even if the input is a view of a mapped file
+        input_data = bytes(input_data)
+        if self.ecc_encode_address:
+            words = [ecc_encode(input_data[i : i + data_width], data_width, start_address + i) for i in range(0, len(input_data), data_width)]
+        else:
+            words = [ecc_encode(input_data[i : i + data_width], data_width) for i in range(0, len(input_data), data_width)]
+        word_width = len(words[0])
+        if any(len(word) != word_width for word in words):
+            raise ValueError(f"Error: The ECC function returns words with different widths.")
+        words = b''.join(words)
+        # We cannot skip ECC encoding of the short erased runs, because the ECC bit count is unknown before the words are encoded
+        if erased_runs:
+            words = bytearray(words)
+            for run_start, run_end in erased_runs:
+                words[run_start // data_width * word_width : run_end // data_width * word_width] = bytes([self.ecc_skip]) * ((run_end - run_start) // data_width * word_width)
+        return words, word_width
+
+    def to_texts(self, input_data:bytes, start_address:int, words_functions:List[callable]) -> List[str]:
+        # Convert the memory words to lines by every function of words_functions, which is hex_words or bin_words
+        # The words are encoded once for all the functions
+        data_width = self.data_width
+        input_data = self.align(input_data)
+        output_lines = [[] for _ in words_functions]
+        if self.skip_pattern is None:
+            words, word_width = self.encode(input_data, start_address)
+            self.append_words(output_lines, words, word_width, words_functions)
+            return ['\n'.join(lines) for lines in output_lines]
+
+        erased_runs = []
+        position = 0
+        for run_start, run_end in self.find_erased(input_data) + [(len(input_data), len(input_data) + ERASED_RUN_MIN * data_width)]:
+            if (run_end - run_start) // data_width < ERASED_RUN_MIN:
+                erased_runs.append((run_start - position, run_end - position))
+                continue
+            # The data before the long erased run is encoded, with its short erased runs
+            if run_start > position:
+                words, word_width = self.encode(input_data[position : run_start], start_address + position, erased_runs)
+                self.append_words(output_lines, words, word_width, words_functions)
+            # The ECC of the long erased run is skipped, and the same line is repeated
+            if run_end <= len(input_data):
+                self.append_erased(output_lines, (run_end - run_start) // data_width, words_functions)
+            erased_runs = []
+            position = run_end
+        return ['\n'.join(lines) for lines in output_lines]
+
+    def to_text(self, input_data:bytes, start_address:int, words_function:callable) -> str:
+        return self.to_texts(input_data, start_address, [words_function])[0]
+
+    def append_lines(self, output_lines:List[list], lines:List[str], word_count:int) -> None:
+        # The address record is the index of the word in the memory, which is required after the omitted words
+        if self.word_gap:
+            for function_lines in output_lines:
+                function_lines.append(f"@{self.word_index:08X}")
+            self.word_gap = False
+        for function_lines, function_line in zip(output_lines, lines):
+            function_lines.append(function_line)
+        self.word_index += word_count
+
+    def skip_lines(self, word_count:int) -> None:
+        self.word_gap = True
+        self.word_index += word_count
+
+    def append_words(self, output_lines:List[list], words:bytes, word_width:int, words_functions:List[callable]) -> None:
+        if self.sparse_fill is None:
+            for function_lines, words_function in zip(output_lines, words_functions):
+                function_lines.append(words_function(words, word_width, self.swap_endian, '\n'))
+            return
+        # The runs of fill words are found by one scan of the memory words
+        if word_width not in self.sparse_patterns:
+            self.sparse_patterns[word_width] = re.compile(re.escape(bytes([self.sparse_fill])) + b"{%d,}" % (word_width * SPARSE_RUN_MIN))
+        position = 0
+        for match in self.sparse_patterns[word_width].finditer(words):
+            run_start = -(-match.start() // word_width) * word_width
+            run_end = match.end() // word_width * word_width
+            if (run_end - run_start) // word_width < SPARSE_RUN_MIN:
+                continue
+            if run_start > position:
+                self.append_lines(output_lines, [words_function(words[position : run_start], word_width, self.swap_endian, '\n') for words_function in words_functions], (run_start - position) // word_width)
+            self.skip_lines((run_end - run_start) // word_width)
+            position = run_end
+        if position < len(words):
+            self.append_lines(output_lines, [words_function(words[position:], word_width, self.swap_endian, '\n') for words_function in words_functions], (len(words) - position) // word_width)
+
+    def append_erased(self, output_lines:List[list], word_count:int, words_functions:List[callable]) -> None:
+        erased_word = self.get_erased_word()
+        if self.sparse_fill is not None and erased_word == bytes([self.sparse_fill]) * len(erased_word):
+            self.skip_lines(word_count)
+            return
+        lines = []
+        for words_function in words_functions:
+            if words_function not in self.erased_lines:
+                self.erased_lines[words_function] = words_function(erased_word, len(erased_word), self.swap_endian, '\n')
+            erased_line = self.erased_lines[words_function]
+            lines.append((erased_line + '\n') * (word_count - 1) + erased_line)
+        self.append_lines(output_lines, lines, word_count)
+
+    def to_hex(self, input_data:bytes, start_address:int = 0x0) -> str:
+        return self.to_text(input_data, start_address, hex_words)
+
+    def to_bin(self, input_data:bytes, start_address:int = 0x0) -> str:
+        # The binary digits are converted from the words directly, the same as the hex digits
+        return self.to_text(input_data, start_address, bin_words)
+
+def bin_to_vhex_dwn(input_data:bytes, data_width:int = 1, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, swap_endian:int = False, ecc_encode_batch:callable = None, sparse_fill:int = None) -> str:
+    encoder = WordEncoder(data_width, ecc_encode, ecc_skip, pad_count, pad_byte, swap_endian, ecc_encode_batch, sparse_fill)
+    return encoder.to_hex(input_data, start_address)
+
+def bin_to_vhex_dw1(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> str:
+    return bin_to_vhex_dwn(input_data, 1, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
+
+def bin_to_vhex_dw2(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> str:
+    return bin_to_vhex_dwn(input_data, 2, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
+
+def bin_to_vhex_dw4(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> str:
+    return bin_to_vhex_dwn(input_data, 4, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-    return output_data
+def bin_to_vhex_dw8(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> str:
+    return bin_to_vhex_dwn(input_data, 8, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-def bin_to_vhex_dw1(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0) -> str:
-    return bin_to_vhex_dwn(input_data, 1, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False)
+def bin_to_vhex_dw16(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> str:
+    return bin_to_vhex_dwn(input_data, 16, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-def bin_to_vhex_dw2(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0) -> str:
-    return bin_to_vhex_dwn(input_data, 2, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False)
+def iter_vhex_dwn(input_blocks:Iterable[bytes], data_width:int = 1, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, swap_endian:int = False, ecc_encode_batch:callable = None, sparse_fill:int = None) -> Iterator[str]:
+    encoder = WordEncoder(data_width, ecc_encode, ecc_skip, pad_count, pad_byte, swap_endian, ecc_encode_batch, sparse_fill)
+    for block in align_blocks(input_blocks, data_width):
+        yield encoder.to_hex(block, start_address)
+        start_address += len(block)
 
-def bin_to_vhex_dw4(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0) -> str:
-    return bin_to_vhex_dwn(input_data, 4, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False)
+def iter_vhex_dw1(input_blocks:Iterable[bytes], ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> Iterator[str]:
+    return iter_vhex_dwn(input_blocks, 1, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-def bin_to_vhex_dw8(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0) -> str:
-    return bin_to_vhex_dwn(input_data, 8, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False)
+def iter_vhex_dw2(input_blocks:Iterable[bytes], ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> Iterator[str]:
+    return iter_vhex_dwn(input_blocks, 2, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-def bin_to_vhex_dw16(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0) -> str:
-    return bin_to_vhex_dwn(input_data, 16, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False)
+def iter_vhex_dw4(input_blocks:Iterable[bytes], ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> Iterator[str]:
+    return iter_vhex_dwn(input_blocks, 4, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-def bin_to_vhex_addr_dwn(input_data:bytes , start_address:int = 0x0, align_width:int = 4, data_width:int = 1, swap_endian:bool = False) -> str:
-    output_data = ""
-    count = 0
-    align_count = 0
+def iter_vhex_dw8(input_blocks:Iterable[bytes], ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> Iterator[str]:
+    return iter_vhex_dwn(input_blocks, 8, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
+def iter_vhex_dw16(input_blocks:Iterable[bytes], ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> Iterator[str]:
+    return iter_vhex_dwn(input_blocks, 16, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
+
+def bin_to_vhex_addr_dwn(input_data:bytes , start_address:int = 0x0, align_width:int = 4, data_width:int = 1, swap_endian:bool = False, sparse_fill:int = None) -> str:
     if start_address % data_width != 0:
         raise ValueError(f"Error: The start address {start_address} is not aligned to the data width {data_width}.")
 
@@ -84,81 +281,136 @@ def bin_to_vhex_addr_dwn(input_data:bytes , start_address:int = 0x0, align_width
         print(f"Warning: The alignment width {align_width} is not aligned to the data width {data_width}. Expanding the alignment width to {align_width + data_width - (align_width % data_width)}.")
         align_width += data_width - (align_width % data_width)
 
-    if len(input_data) != 0:
-        while True:
-            # Bytes to convert
-            data = input_data[count : count + data_width]
-            # Pad zeros if the data is not aligned to the data width
-            if len(data) < data_width:
-                print(f"Warning: The input data is not aligned to the data width {data_width}. Padding zeros.")
-                data +=b'\x00' * (data_width - len(data))
-            # Convert the binary data to hex string sequence
-            hex_seq = data.hex().upper()
-            # Handle the endian sequence
-            if swap_endian:
-                hex_str = hex_seq
-            else:
-                hex_str = ''.join([hex_seq[i-1:i] + hex_seq[i:i+1] for i in range(len(hex_seq) - 1, -1, -2)])
-            # Append the hex string
-            if align_count == 0:
-                output_data += '@' + f"{start_address:08X}" + " "
-            output_data += hex_str
-            count += data_width
-            align_count += data_width
-            start_address += data_width
-            # Break if no more data to handle
-            if count >= len(input_data):
-                break
-            # Alignment control
-            if align_count >= align_width:
-                output_data += '\n'
-                align_count = 0
-            else:
-                output_data += ' '
+    # Pad zeros if the data is not aligned to the data width
+    if len(input_data) % data_width != 0:
+        print(f"Warning: The input data is not aligned to the data width {data_width}. Padding zeros.")
+        input_data = bytes(input_data) + b'\x00' * (data_width - len(input_data) % data_width)
+
+    # A line holds one word at least
+    line_width = max(align_width, data_width)
+
+    # Each line starts with the address of its first word
+    output_lines = hex_lines(input_data, data_width, line_width, swap_endian, ' ')
+    if sparse_fill is None:
+        return '\n'.join([f"@{start_address + i * line_width:08X} " + output_lines[i] for i in range(len(output_lines))])
+    # Every line has its address already, so the lines of fill bytes are just left out
+    fill_line = bytes([sparse_fill]) * line_width
+    input_data = bytes(input_data)
+    return '\n'.join([f"@{start_address + i * line_width:08X} " + output_lines[i] for i in range(len(output_lines)) if input_data[i * line_width : (i + 1) * line_width] != fill_line[: len(input_data) - i * line_width]])
+
+def bin_to_vhex_addr_dw1(input_data:bytes, start_address:int = 0x0, align_width:int = 32, sparse_fill:int = None) -> str:
+    return bin_to_vhex_addr_dwn(input_data, start_address, align_width, 1, False, sparse_fill)
+
+def bin_to_vhex_addr_dw2(input_data:bytes, start_address:int = 0x0, align_width:int = 32, sparse_fill:int = None) -> str:
+    return bin_to_vhex_addr_dwn(input_data, start_address, align_width, 2, False, sparse_fill)
+
+def bin_to_vhex_addr_dw4(input_data:bytes, start_address:int = 0x0, align_width:int = 32, sparse_fill:int = None) -> str:
+    return bin_to_vhex_addr_dwn(input_data, start_address, align_width, 4, False, sparse_fill)
+
+def bin_to_vhex_addr_dw8(input_data:bytes, start_address:int = 0x0, align_width:int = 32, sparse_fill:int = None) -> str:
+    return bin_to_vhex_addr_dwn(input_data, start_address, align_width, 8, False, sparse_fill)
+
+def bin_to_vhex_addr_dw16(input_data:bytes, start_address:int = 0x0, align_width:int = 32, sparse_fill:int = None) -> str:
+    return bin_to_vhex_addr_dwn(input_data, start_address, align_width, 16, False, sparse_fill)
+
+def iter_vhex_addr_dwn(input_blocks:Iterable[bytes], start_address:int = 0x0, align_width:int = 4, data_width:int = 1, swap_endian:bool = False, sparse_fill:int = None) -> Iterator[str]:
+    if start_address % data_width != 0:
+        raise ValueError(f"Error: The start address {start_address} is not aligned to the data width {data_width}.")
+
+    if align_width % data_width != 0:
+        print(f"Warning: The alignment width {align_width} is not aligned to the data width {data_width}. Expanding the alignment width to {align_width + data_width - (align_width % data_width)}.")
+        align_width += data_width - (align_width % data_width)
+
+    # Every block holds whole lines, so the line layout is the same as converting the input at once
+    for block in align_blocks(input_blocks, max(align_width, data_width)):
+        yield bin_to_vhex_addr_dwn(block, start_address, align_width, data_width, swap_endian, sparse_fill)
+        start_address += len(block)
+
+def iter_vhex_addr_dw1(input_blocks:Iterable[bytes], start_address:int = 0x0, align_width:int = 32, sparse_fill:int = None) -> Iterator[str]:
+    return iter_vhex_addr_dwn(input_blocks, start_address, align_width, 1, False, sparse_fill)
+
+def iter_vhex_addr_dw2(input_blocks:Iterable[bytes], start_address:int = 0x0, align_width:int = 32, sparse_fill:int = None) -> Iterator[str]:
+    return iter_vhex_addr_dwn(input_blocks, start_address, align_width, 2, False, sparse_fill)
+
+def iter_vhex_addr_dw4(input_blocks:Iterable[bytes], start_address:int = 0x0, align_width:int = 32, sparse_fill:int = None) -> Iterator[str]:
+    return iter_vhex_addr_dwn(input_blocks, start_address, align_width, 4, False, sparse_fill)
+
+def iter_vhex_addr_dw8(input_blocks:Iterable[bytes], start_address:int = 0x0, align_width:int = 32, sparse_fill:int = None) -> Iterator[str]:
+    return iter_vhex_addr_dwn(input_blocks, start_address, align_width, 8, False, sparse_fill)
+
+def iter_vhex_addr_dw16(input_blocks:Iterable[bytes], start_address:int = 0x0, align_width:int = 32, sparse_fill:int = None) -> Iterator[str]:
+    return iter_vhex_addr_dwn(input_blocks, start_address, align_width, 16, False, sparse_fill)
+
+def bin_to_vbin_dwn(input_data:bytes, data_width:int = 1, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte: int = 0xFF, start_address:int = 0x0, swap_endian:int = False, ecc_encode_batch:callable = None, sparse_fill:int = None) -> str:
+    encoder = WordEncoder(data_width, ecc_encode, ecc_skip, pad_count, pad_byte, swap_endian, ecc_encode_batch, sparse_fill)
+    return encoder.to_bin(input_data, start_address)
+
+def bin_to_vbin_dw1(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> str:
+    return bin_to_vbin_dwn(input_data, 1, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-    return output_data
+def bin_to_vbin_dw2(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> str:
+    return bin_to_vbin_dwn(input_data, 2, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-def bin_to_vhex_addr_dw1(input_data:bytes, start_address:int = 0x0, align_width:int = 32) -> str:
-    return bin_to_vhex_addr_dwn(input_data, start_address, align_width, 1, False)
+def bin_to_vbin_dw4(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> str:
+    return bin_to_vbin_dwn(input_data, 4, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-def bin_to_vhex_addr_dw2(input_data:bytes, start_address:int = 0x0, align_width:int = 32) -> str:
-    return bin_to_vhex_addr_dwn(input_data, start_address, align_width, 2, False)
+def bin_to_vbin_dw8(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> str:
+    return bin_to_vbin_dwn(input_data, 8, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-def bin_to_vhex_addr_dw4(input_data:bytes, start_address:int = 0x0, align_width:int = 32) -> str:
-    return bin_to_vhex_addr_dwn(input_data, start_address, align_width, 4, False)
+def bin_to_vbin_dw16(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> str:
+    return bin_to_vbin_dwn(input_data, 16, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-def bin_to_vhex_addr_dw8(input_data:bytes, start_address:int = 0x0, align_width:int = 32) -> str:
-    return bin_to_vhex_addr_dwn(input_data, start_address, align_width, 8, False)
+def iter_vbin_dwn(input_blocks:Iterable[bytes], data_width:int = 1, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte: int = 0xFF, start_address:int = 0x0, swap_endian:int = False, ecc_encode_batch:callable = None, sparse_fill:int = None) -> Iterator[str]:
+    encoder = WordEncoder(data_width, ecc_encode, ecc_skip, pad_count, pad_byte, swap_endian, ecc_encode_batch, sparse_fill)
+    for block in align_blocks(input_blocks, data_width):
+        yield encoder.to_bin(block, start_address)
+        start_address += len(block)
 
-def bin_to_vhex_addr_dw16(input_data:bytes, start_address:int = 0x0, align_width:int = 32) -> str:
-    return bin_to_vhex_addr_dwn(input_data, start_address, align_width, 16, False)
+def iter_vbin_dw1(input_blocks:Iterable[bytes], ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> Iterator[str]:
+    return iter_vbin_dwn(input_blocks, 1, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-def bin_to_vbin_dwn(input_data:bytes, data_width:int = 1, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte: int = 0xFF, start_address:int = 0x0, swap_endian:int = False) -> str:
-    data = bin_to_vhex_dwn(input_data, data_width, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, swap_endian)
-    data_lines = data.splitlines()
-    data_bin = ""
-    for data_line in data_lines:
-        data_bin += bin(int(data_line,16))[2:].zfill(len(data_line)*4) + '\n'
-    return data_bin.rstrip('\n')
+def iter_vbin_dw2(input_blocks:Iterable[bytes], ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> Iterator[str]:
+    return iter_vbin_dwn(input_blocks, 2, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-def bin_to_vbin_dw1(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0) -> str:
-    return bin_to_vbin_dwn(input_data, 1, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False)
+def iter_vbin_dw4(input_blocks:Iterable[bytes], ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> Iterator[str]:
+    return iter_vbin_dwn(input_blocks, 4, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-def bin_to_vbin_dw2(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0) -> str:
-    return bin_to_vbin_dwn(input_data, 2, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False)
+def iter_vbin_dw8(input_blocks:Iterable[bytes], ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> Iterator[str]:
+    return iter_vbin_dwn(input_blocks, 8, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-def bin_to_vbin_dw4(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0) -> str:
-    return bin_to_vbin_dwn(input_data, 4, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False)
+def iter_vbin_dw16(input_blocks:Iterable[bytes], ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, ecc_encode_batch:callable = None, sparse_fill:int = None) -> Iterator[str]:
+    return iter_vbin_dwn(input_blocks, 16, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False, ecc_encode_batch, sparse_fill)
 
-def bin_to_vbin_dw8(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0) -> str:
-    return bin_to_vbin_dwn(input_data, 8, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False)
+def iter_words_shared(input_blocks:Iterable[bytes], words_functions:List[callable], data_width:int = 1, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0, swap_endian:int = False, ecc_encode_batch:callable = None, sparse_fill:int = None) -> Iterator[tuple]:
+    # Convert the same memory words to the lines of every function of words_functions
+    # The words and their ECC are encoded once, a tuple of the chunks of all the functions is yielded for every block
+    encoder = WordEncoder(data_width, ecc_encode, ecc_skip, pad_count, pad_byte, swap_endian, ecc_encode_batch, sparse_fill)
+    for block in align_blocks(input_blocks, data_width):
+        yield tuple(encoder.to_texts(block, start_address, words_functions))
+        start_address += len(block)
 
-def bin_to_vbin_dw16(input_data:bytes, ecc_encode:callable = None, ecc_skip:int = None, pad_count:int = 0, pad_byte:int = 0xFF, start_address:int = 0x0) -> str:
-    return bin_to_vbin_dwn(input_data, 16, ecc_encode, ecc_skip, pad_count, pad_byte, start_address, False)
+# The stream functions converted from the memory words, with their data width and words function
+# The formats of the same options can share the encoded words by iter_words_shared
+word_stream_dict = {
+    iter_vhex_dw1: (1, hex_words),
+    iter_vhex_dw2: (2, hex_words),
+    iter_vhex_dw4: (4, hex_words),
+    iter_vhex_dw8: (8, hex_words),
+    iter_vhex_dw16: (16, hex_words),
+    iter_vbin_dw1: (1, bin_words),
+    iter_vbin_dw2: (2, bin_words),
+    iter_vbin_dw4: (4, bin_words),
+    iter_vbin_dw8: (8, bin_words),
+    iter_vbin_dw16: (16, bin_words),
+}
 
 bin2verilog_dict = {
     "vhex_dw1": {
         "function": bin_to_vhex_dw1,
+        "stream_function": iter_vhex_dw1,
+        "separator": "\n",
+        "data_width": 1,
+        "fixed_line": True,
         "description": [
             "Convert to the file which can be loaded by $readmemh to a common memory with 1-byte(8-bit) width",
             "The option \"ecc\" is accepted as optional. Default is \"none\"",
@@ -175,6 +427,10 @@ bin2verilog_dict = {
     },
     "vhex_dw2": {
         "function": bin_to_vhex_dw2,
+        "stream_function": iter_vhex_dw2,
+        "separator": "\n",
+        "data_width": 2,
+        "fixed_line": True,
         "description": [
             "Convert to the file which can be loaded by $readmemh to a common memory with 2-byte(16-bit) width",
             "The option \"ecc\" is accepted as optional. Default is \"none\"",
@@ -191,6 +447,10 @@ bin2verilog_dict = {
     },
     "vhex_dw4": {
         "function": bin_to_vhex_dw4,
+        "stream_function": iter_vhex_dw4,
+        "separator": "\n",
+        "data_width": 4,
+        "fixed_line": True,
         "description": [
             "Convert to the file which can be loaded by $readmemh to a common memory with 4-byte(32-bit) width",
             "The option \"ecc\" is accepted as optional. Default is \"none\"",
@@ -207,6 +467,10 @@ bin2verilog_dict = {
     },
     "vhex_dw8": {
         "function": bin_to_vhex_dw8,
+        "stream_function": iter_vhex_dw8,
+        "separator": "\n",
+        "data_width": 8,
+        "fixed_line": True,
         "description": [
             "Convert to the file which can be loaded by $readmemh to a common memory with 8-byte(64-bit) width",
             "The option \"ecc\" is accepted as optional. Default is \"none\"",
@@ -223,6 +487,10 @@ bin2verilog_dict = {
     },
     "vhex_dw16": {
         "function": bin_to_vhex_dw16,
+        "stream_function": iter_vhex_dw16,
+        "separator": "\n",
+        "data_width": 16,
+        "fixed_line": True,
         "description": [
             "Convert to the file which can be loaded by $readmemh to a common memory with 16-byte(128-bit) width",
             "The option \"ecc\" is accepted as optional. Default is \"none\"",
@@ -239,36 +507,60 @@ bin2verilog_dict = {
     },
     "verilog_dw1": {
         "function": bin_to_vhex_dw1,
+        "stream_function": iter_vhex_dw1,
+        "separator": "\n",
+        "data_width": 1,
+        "fixed_line": True,
         "description": [
             "Alias name of \"vhex_dw1\" format",
         ],
     },
     "verilog_dw2": {
         "function": bin_to_vhex_dw2,
+        "stream_function": iter_vhex_dw2,
+        "separator": "\n",
+        "data_width": 2,
+        "fixed_line": True,
         "description": [
             "Alias name of \"vhex_dw2\" format",
         ],
     },
     "verilog_dw4": {
         "function": bin_to_vhex_dw4,
+        "stream_function": iter_vhex_dw4,
+        "separator": "\n",
+        "data_width": 4,
+        "fixed_line": True,
         "description": [
             "Alias name of \"vhex_dw4\" format",
         ],
     },
     "verilog_dw8": {
         "function": bin_to_vhex_dw8,
+        "stream_function": iter_vhex_dw8,
+        "separator": "\n",
+        "data_width": 8,
+        "fixed_line": True,
         "description": [
             "Alias name of \"vhex_dw8\" format",
         ],
     },
     "verilog_dw16": {
         "function": bin_to_vhex_dw16,
+        "stream_function": iter_vhex_dw16,
+        "separator": "\n",
+        "data_width": 16,
+        "fixed_line": True,
         "description": [
             "Alias name of \"vhex_dw16\" format",
         ],
     },
     "vhex_addr_dw1": {
         "function": bin_to_vhex_addr_dw1,
+        "stream_function": iter_vhex_addr_dw1,
+        "separator": "\n",
+        "data_width": 1,
+        "fixed_line": True,
         "description": [
             "Convert to the file which can be loaded by $readmemh to a specific offset of a common memory with 1-byte(8-bit) width",
             "The option \"address\" is accepted as optional. Default is 0x0",
@@ -281,6 +573,10 @@ bin2verilog_dict = {
     },
     "vhex_addr_dw2": {
         "function": bin_to_vhex_addr_dw2,
+        "stream_function": iter_vhex_addr_dw2,
+        "separator": "\n",
+        "data_width": 2,
+        "fixed_line": True,
         "description": [
             "Convert to the file which can be loaded by $readmemh to a specific offset of a common memory with 2-byte(16-bit) width",
             "The option \"address\" is accepted as optional. Default is 0x0",
@@ -293,6 +589,10 @@ bin2verilog_dict = {
     },
     "vhex_addr_dw4": {
         "function": bin_to_vhex_addr_dw4,
+        "stream_function": iter_vhex_addr_dw4,
+        "separator": "\n",
+        "data_width": 4,
+        "fixed_line": True,
         "description": [
             "Convert to the file which can be loaded by $readmemh to a specific offset of a common memory with 4-byte(32-bit) width",
             "The option \"address\" is accepted as optional. Default is 0x0",
@@ -305,6 +605,10 @@ bin2verilog_dict = {
     },
     "vhex_addr_dw8": {
         "function": bin_to_vhex_addr_dw8,
+        "stream_function": iter_vhex_addr_dw8,
+        "separator": "\n",
+        "data_width": 8,
+        "fixed_line": True,
         "description": [
             "Convert to the file which can be loaded by $readmemh to a specific offset of a common memory with 8-byte(64-bit) width",
             "The option \"address\" is accepted as optional. Default is 0x0",
@@ -317,6 +621,10 @@ bin2verilog_dict = {
     },
     "vhex_addr_dw16": {
         "function": bin_to_vhex_addr_dw16,
+        "stream_function": iter_vhex_addr_dw16,
+        "separator": "\n",
+        "data_width": 16,
+        "fixed_line": True,
         "description": [
             "Convert to the file which can be loaded by $readmemh to a specific offset of a common memory with 16-byte(128-bit) width",
             "The option \"address\" is accepted as optional. Default is 0x0",
@@ -329,36 +637,60 @@ bin2verilog_dict = {
     },
     "verilog_addr_dw1": {
         "function": bin_to_vhex_addr_dw1,
+        "stream_function": iter_vhex_addr_dw1,
+        "separator": "\n",
+        "data_width": 1,
+        "fixed_line": True,
         "description": [
             "Alias name of \"vhex_addr_dw1\" format",
         ],
     },
     "verilog_addr_dw2": {
         "function": bin_to_vhex_addr_dw2,
+        "stream_function": iter_vhex_addr_dw2,
+        "separator": "\n",
+        "data_width": 2,
+        "fixed_line": True,
         "description": [
             "Alias name of \"vhex_addr_dw2\" format",
         ],
     },
     "verilog_addr_dw4": {
         "function": bin_to_vhex_addr_dw4,
+        "stream_function": iter_vhex_addr_dw4,
+        "separator": "\n",
+        "data_width": 4,
+        "fixed_line": True,
         "description": [
             "Alias name of \"vhex_addr_dw4\" format",
         ],
     },
     "verilog_addr_dw8": {
         "function": bin_to_vhex_addr_dw8,
+        "stream_function": iter_vhex_addr_dw8,
+        "separator": "\n",
+        "data_width": 8,
+        "fixed_line": True,
         "description": [
             "Alias name of \"vhex_addr_dw8\" format",
         ],
     },
     "verilog_addr_dw16": {
         "function": bin_to_vhex_addr_dw16,
+        "stream_function": iter_vhex_addr_dw16,
+        "separator": "\n",
+        "data_width": 16,
+        "fixed_line": True,
         "description": [
             "Alias name of \"vhex_addr_dw16\" format",
         ],
     },
     "vbin_dw1": {
         "function": bin_to_vbin_dw1,
+        "stream_function": iter_vbin_dw1,
+        "separator": "\n",
+        "data_width": 1,
+        "fixed_line": True,
         "description": [
             "Convert to the file which can be loaded by $readmemb to a common memory with 1-byte(8-bit) width",
             "The option \"ecc\" is accepted as optional. Default is \"none\"",
@@ -375,6 +707,10 @@ bin2verilog_dict = {
     },
     "vbin_dw2": {
         "function": bin_to_vbin_dw2,
+        "stream_function": iter_vbin_dw2,
+        "separator": "\n",
+        "data_width": 2,
+        "fixed_line": True,
         "description": [
             "Convert to the file which can be loaded by $readmemb to a common memory with 2-byte(16-bit) width",
             "The option \"ecc\" is accepted as optional. Default is \"none\"",
@@ -391,6 +727,10 @@ bin2verilog_dict = {
     },
     "vbin_dw4": {
         "function": bin_to_vbin_dw4,
+        "stream_function": iter_vbin_dw4,
+        "separator": "\n",
+        "data_width": 4,
+        "fixed_line": True,
         "description": [
             "Convert to the file which can be loaded by $readmemb to a common memory with 4-byte(32-bit) width",
             "The option \"ecc\" is accepted as optional. Default is \"none\"",
@@ -407,6 +747,10 @@ bin2verilog_dict = {
     },
     "vbin_dw8": {
         "function": bin_to_vbin_dw8,
+        "stream_function": iter_vbin_dw8,
+        "separator": "\n",
+        "data_width": 8,
+        "fixed_line": True,
         "description": [
             "Convert to the file which can be loaded by $readmemb to a common memory with 8-byte(64-bit) width",
             "The option \"ecc\" is accepted as optional. Default is \"none\"",
@@ -423,6 +767,10 @@ bin2verilog_dict = {
     },
     "vbin_dw16": {
         "function": bin_to_vbin_dw16,
+        "stream_function": iter_vbin_dw16,
+        "separator": "\n",
+        "data_width": 16,
+        "fixed_line": True,
         "description": [
             "Convert to the file which can be loaded by $readmemb to a common memory with 16-byte(128-bit) width",
             "The option \"ecc\" is accepted as optional. Default is \"none\"",
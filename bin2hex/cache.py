@@ -0,0 +1,192 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import os
+import time
+import json
+import stat
+import shutil
+import inspect
+import hashlib
+import tempfile
+
+from typing import BinaryIO, List
+
+from bin2hex import __version__
+from bin2hex.registry import ecc_dict
+from bin2hex.stream import read_blocks_mapped
+from bin2hex.stats import ConversionStats
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# The cache is trimmed to this byte count after every insert by default
+CACHE_SIZE_DEFAULT = 1 << 30
+
+# The counts of the hits and misses are kept in this file in the cache directory
+CACHE_STATS_FILE = "stats.json"
+
+# The temporary entries left by the killed jobs are removed after this count of seconds
+CACHE_TEMP_EXPIRE = 3600
+
+def file_digest(ifile:BinaryIO) -> str:
+    digest = hashlib.sha256()
+    for block in read_blocks_mapped(ifile):
+        digest.update(block)
+    # The file is read again by the conversion
+    ifile.seek(0)
+    return digest.hexdigest()
+
+def plan_digest(plan) -> str:
+    # The options are normalized to what the output depends on,
+    # so the format aliases and the options given with their default values share the same entries
+    options = {
+        "version": __version__,
+        "function": f"{plan.convert_function.__module__}.{plan.convert_function.__qualname__}",
+        "split_count": plan.split_count,
+    }
+    parameters = list(inspect.signature(plan.convert_function).parameters.values())[1:]
+    for parameter in parameters:
+        value = plan.kwargs.get(parameter.name, parameter.default)
+        if callable(value):
+            if plan.options["ecc"] in ecc_dict:
+                value = f"{value.__module__}.{value.__qualname__}"
+            else:
+                # The user ECC file is known by its content, so an edited file doesn't hit the old entries
+                with open(plan.options["ecc"], 'rb') as ecc_file:
+                    value = f"file:{file_digest(ecc_file)}"
+        options[parameter.name] = value
+    return hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()
+
+def read_counters(stats_file) -> dict:
+    # The counters of an empty or broken file start from zero
+    counters = {"hits": 0, "misses": 0}
+    try:
+        counters.update({key: value for key, value in json.load(stats_file).items() if key in counters and isinstance(value, int)})
+    except (AttributeError, ValueError):
+        pass
+    return counters
+
+class ConversionCache:
+    # The outputs are kept in the cache directory by the hash of the input and the options,
+    # every entry is a directory holding the output files "0", "1", ... of the split count
+    def __init__(self, directory:str, size_limit:int = CACHE_SIZE_DEFAULT):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.size_limit = size_limit
+
+    def key(self, plan, ifile:BinaryIO) -> str:
+        return hashlib.sha256((plan_digest(plan) + file_digest(ifile)).encode()).hexdigest()
+
+    def count(self, event:str) -> None:
+        # The file holds the counters only, so it doesn't grow with the lookups
+        # It is locked while it is updated, so the counts of the concurrent jobs are not lost
+        try:
+            with open(os.path.join(self.directory, CACHE_STATS_FILE), 'a+') as stats_file:
+                if fcntl is not None:
+                    fcntl.flock(stats_file, fcntl.LOCK_EX)
+                stats_file.seek(0)
+                counters = read_counters(stats_file)
+                counters[event] += 1
+                stats_file.truncate(0)
+                json.dump(counters, stats_file)
+        except OSError:
+            pass
+
+    def fetch(self, key:str, output_files:List[str]) -> bool:
+        # The output is copied rather than linked, so writing the output file again never changes the entry
+        entry = os.path.join(self.directory, key)
+        try:
+            for i, output_file in enumerate(output_files):
+                shutil.copyfile(os.path.join(entry, str(i)), output_file)
+            # The modification time of the entry is its last use for the eviction
+            os.utime(entry)
+        except OSError:
+            self.count("misses")
+            return False
+        self.count("hits")
+        return True
+
+    def store(self, key:str, output_files:List[str]) -> None:
+        # The entry is built in a temporary directory and renamed at last, so the other jobs never see a partial entry
+        # If another job has stored the same entry already, the rename fails and this one is dropped
+        temp_entry = tempfile.mkdtemp(prefix=".tmp-", dir=self.directory)
+        try:
+            for i, output_file in enumerate(output_files):
+                shutil.copyfile(output_file, os.path.join(temp_entry, str(i)))
+            os.rename(temp_entry, os.path.join(self.directory, key))
+        except OSError:
+            shutil.rmtree(temp_entry, ignore_errors=True)
+            return
+        self.evict()
+
+    def entries(self) -> List[tuple]:
+        # All the entries as (last use, byte count, path)
+        entries = []
+        now = time.time()
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                try:
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    if entry.name.startswith('.'):
+                        if entry.name.startswith(".tmp-") and now - entry.stat().st_mtime > CACHE_TEMP_EXPIRE:
+                            shutil.rmtree(entry.path, ignore_errors=True)
+                        continue
+                    with os.scandir(entry.path) as files:
+                        size = sum(f.stat().st_size for f in files)
+                    entries.append((entry.stat().st_mtime, size, entry.path))
+                except OSError:
+                    # The entry is evicted by another job
+                    continue
+        return entries
+
+    def evict(self) -> None:
+        # The least recently used entries are removed until the cache fits the size limit
+        entries = sorted(self.entries())
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total_size <= self.size_limit:
+                break
+            # The entry is renamed before removing, so a job fetching it finds either the whole entry or nothing
+            trash = tempfile.mkdtemp(prefix=".tmp-", dir=self.directory)
+            try:
+                os.rename(path, os.path.join(trash, "entry"))
+            except OSError:
+                pass
+            shutil.rmtree(trash, ignore_errors=True)
+            total_size -= size
+
+    def stats(self) -> dict:
+        try:
+            with open(os.path.join(self.directory, CACHE_STATS_FILE)) as stats_file:
+                counters = read_counters(stats_file)
+        except OSError:
+            counters = {"hits": 0, "misses": 0}
+        entries = self.entries()
+        return {**counters, "entries": len(entries), "size": sum(size for _, size, _ in entries)}
+
+    def convert_file(self, plan, ifile:BinaryIO, output_file:str, jobs:int = 1, stats:ConversionStats = None) -> bool:
+        # Copy the cached output if there is one, or convert the input and keep the output in the cache
+        # The input which can't be read twice, such as a pipe, is converted without the cache
+        if not stat.S_ISREG(os.fstat(ifile.fileno()).st_mode):
+            plan.write(plan.stream_file(ifile, jobs, stats), output_file, stats)
+            return False
+        key = self.key(plan, ifile)
+        output_files = plan.output_files(output_file)
+        hit = self.fetch(key, output_files)
+        if hit:
+            if stats is not None:
+                stats.mode = "cache"
+        else:
+            plan.write(plan.stream_file(ifile, jobs, stats), output_file, stats)
+            self.store(key, output_files)
+        if stats is not None:
+            stats.cache = self.stats()
+        return hit
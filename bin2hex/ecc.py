@@ -5,152 +5,125 @@
 # SPDX-License-Identifier: BSD-3-Clause
 #
 
-def ecc_encode_arm_secded_32bit(data: bytes) -> bytes:
-    odd_even_key = [0, 1, 0, 0, 0, 0, 1]
-
-    CB0 = [1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0]
-    CB1 = [1, 1, 0, 1, 0, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0]
-    CB2 = [1, 0, 1, 1, 1, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0]
-    CB3 = [0, 1, 1, 1, 0, 0, 1, 1, 0, 0, 1, 1, 0, 0, 0, 1, 0, 1, 1, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 0]
-    CB4 = [0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 1]
-    CB5 = [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1]
-    CB6 = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
-    CB = [CB0, CB1, CB2, CB3, CB4, CB5, CB6]
-
-    data_bits = 32
-    ecc_bits = 7
-
-    data_bitarray = [0] * data_bits
-    for i in range(len(data) * 8):
-        data_bitarray[i] = (data[i // 8] >> (i % 8)) & 1
-
-    ecc_bitarray = [0] * ecc_bits
-
-    temp_bitarray = [0] * data_bits
-    for i in range(ecc_bits):
-        for j in range(len(data_bitarray)):
-            temp_bitarray[j] = data_bitarray[j] & CB[i][j]
-
-        for j in range(len(temp_bitarray)):
-            ecc_bitarray[i] = ecc_bitarray[i] ^ temp_bitarray[j]
-        ecc_bitarray[i] = odd_even_key[i] ^ ecc_bitarray[i]
-
-    ecc_bytes = bytearray((len(ecc_bitarray) + 7) // 8)
-    for i in range(len(ecc_bitarray)):
-        ecc_bytes[i // 8] |= (ecc_bitarray[i] << (i % 8))
-
-    return data + ecc_bytes
+import sys
+import array
+
+from bin2hex.engine import select_engine, load_numpy
+
+ARM_SECDED_32BIT_KEY = [0, 1, 0, 0, 0, 0, 1]
+
+ARM_SECDED_32BIT_CB0 = [1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0]
+ARM_SECDED_32BIT_CB1 = [1, 1, 0, 1, 0, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0]
+ARM_SECDED_32BIT_CB2 = [1, 0, 1, 1, 1, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0]
+ARM_SECDED_32BIT_CB3 = [0, 1, 1, 1, 0, 0, 1, 1, 0, 0, 1, 1, 0, 0, 0, 1, 0, 1, 1, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 0]
+ARM_SECDED_32BIT_CB4 = [0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 1]
+ARM_SECDED_32BIT_CB5 = [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1]
+ARM_SECDED_32BIT_CB6 = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
+ARM_SECDED_32BIT_CB = [ARM_SECDED_32BIT_CB0, ARM_SECDED_32BIT_CB1, ARM_SECDED_32BIT_CB2, ARM_SECDED_32BIT_CB3, ARM_SECDED_32BIT_CB4, ARM_SECDED_32BIT_CB5, ARM_SECDED_32BIT_CB6]
+
+ARM_SECDED_64BIT_KEY = [1, 1, 0, 0, 0, 0, 0, 0]
+
+ARM_SECDED_64BIT_CB0 = [1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, \
+                        0, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0]
+ARM_SECDED_64BIT_CB1 = [1, 1, 0, 1, 0, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, \
+                        1, 1, 1, 1, 0, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0]
+ARM_SECDED_64BIT_CB2 = [1, 0, 1, 1, 1, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, \
+                        1, 1, 1, 0, 1, 1, 0, 1, 1, 0, 0, 1, 1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0]
+ARM_SECDED_64BIT_CB3 = [0, 1, 1, 1, 0, 0, 1, 1, 0, 0, 1, 1, 0, 0, 0, 1, 0, 1, 1, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 0, \
+                        0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 0, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 0]
+ARM_SECDED_64BIT_CB4 = [0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 1, \
+                        0, 0, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 0, 0, 1, 1, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0]
+ARM_SECDED_64BIT_CB5 = [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, \
+                        1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0, 1]
+ARM_SECDED_64BIT_CB6 = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, \
+                        0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1]
+ARM_SECDED_64BIT_CB7 = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, \
+                        0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
+ARM_SECDED_64BIT_CB = [ARM_SECDED_64BIT_CB0, ARM_SECDED_64BIT_CB1, ARM_SECDED_64BIT_CB2, ARM_SECDED_64BIT_CB3, ARM_SECDED_64BIT_CB4, ARM_SECDED_64BIT_CB5, ARM_SECDED_64BIT_CB6, ARM_SECDED_64BIT_CB7]
+
+ARM_SECDED_128BIT_KEY = [0, 1, 1, 1, 1, 0, 0, 0, 0]
+
+ARM_SECDED_128BIT_CB0 = [1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, \
+                         0, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, \
+                         1, 1, 0, 1, 1, 0, 1, 1, 1, 1, 0, 0, 0, 0, 1, 0, 0, 1, 1, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, \
+                         0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 1, 0, 0, 0, 0, 0]
+ARM_SECDED_128BIT_CB1 = [1, 1, 0, 1, 0, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, \
+                         1, 1, 1, 1, 0, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, \
+                         1, 0, 1, 1, 0, 0, 1, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, \
+                         0, 1, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0]
+ARM_SECDED_128BIT_CB2 = [1, 0, 1, 1, 1, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, \
+                         1, 1, 1, 0, 1, 1, 0, 1, 1, 0, 0, 1, 1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, \
+                         0, 1, 0, 1, 0, 1, 1, 0, 0, 1, 1, 0, 0, 1, 1, 0, 0, 0, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, \
+                         0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 1, 0, 0, 0, 1, 0, 1, 1, 0, 0, 0, 1, 0, 0, 1, 0, 1, 0]
+ARM_SECDED_128BIT_CB3 = [0, 1, 1, 1, 0, 0, 1, 1, 0, 0, 1, 1, 0, 0, 0, 1, 0, 1, 1, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 0, \
+                         0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 0, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 0, \
+                         0, 0, 1, 1, 0, 0, 0, 0, 1, 0, 1, 0, 1, 1, 0, 0, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 0, 1, 1, \
+                         0, 0, 1, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 1, 0, 0, 1, 1, 0, 1, 0, 0]
+ARM_SECDED_128BIT_CB4 = [0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 1, \
+                         0, 0, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 0, 0, 1, 1, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, \
+                         0, 0, 0, 0, 1, 0, 0, 1, 1, 0, 0, 1, 1, 1, 0, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0, 0, \
+                         1, 1, 1, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 0, 1]
+ARM_SECDED_128BIT_CB5 = [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, \
+                         1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0, 1, \
+                         0, 0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, \
+                         1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1]
+ARM_SECDED_128BIT_CB6 = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, \
+                         0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, \
+                         0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, \
+                         0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1]
+ARM_SECDED_128BIT_CB7 = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, \
+                         0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, \
+                         1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, \
+                         0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
+ARM_SECDED_128BIT_CB8 = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, \
+                         0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, \
+                         0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, \
+                         1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
+ARM_SECDED_128BIT_CB = [ARM_SECDED_128BIT_CB0, ARM_SECDED_128BIT_CB1, ARM_SECDED_128BIT_CB2, ARM_SECDED_128BIT_CB3, ARM_SECDED_128BIT_CB4, ARM_SECDED_128BIT_CB5, ARM_SECDED_128BIT_CB6, ARM_SECDED_128BIT_CB7, ARM_SECDED_128BIT_CB8]
+
+def build_ecc_table(check_matrix:list, data_bits:int) -> list:
+    # The check bits are the XOR of the contributions of all data bytes
+    # Precompute the contribution of every value of every byte position once
+    ecc_table = []
+    for position in range(data_bits // 8):
+        # Check bits flipped by each single data bit of this byte
+        bit_masks = [sum(check_matrix[i][position * 8 + j] << i for i in range(len(check_matrix))) for j in range(8)]
+        position_table = [0] * 256
+        for value in range(1, 256):
+            # Reuse the value with the lowest set bit cleared
+            lowest_bit = (value & -value).bit_length() - 1
+            position_table[value] = position_table[value & (value - 1)] ^ bit_masks[lowest_bit]
+        ecc_table.append(position_table)
+    return ecc_table
+
+def build_ecc_key(odd_even_key:list) -> int:
+    return sum(odd_even_key[i] << i for i in range(len(odd_even_key)))
+
+# The tables are built once at import, instead of walking the check matrices bit by bit for every word
+ARM_SECDED_32BIT_TABLE = build_ecc_table(ARM_SECDED_32BIT_CB, 32)
+ARM_SECDED_64BIT_TABLE = build_ecc_table(ARM_SECDED_64BIT_CB, 64)
+ARM_SECDED_128BIT_TABLE = build_ecc_table(ARM_SECDED_128BIT_CB, 128)
+ARM_SECDED_32BIT_ECC_KEY = build_ecc_key(ARM_SECDED_32BIT_KEY)
+ARM_SECDED_64BIT_ECC_KEY = build_ecc_key(ARM_SECDED_64BIT_KEY)
+ARM_SECDED_128BIT_ECC_KEY = build_ecc_key(ARM_SECDED_128BIT_KEY)
 
+def ecc_encode_arm_secded_32bit(data: bytes) -> bytes:
+    ecc = ARM_SECDED_32BIT_ECC_KEY
+    for position_table, value in zip(ARM_SECDED_32BIT_TABLE, data):
+        ecc ^= position_table[value]
+    return data + ecc.to_bytes(1, 'little')
 
 def ecc_encode_arm_secded_64bit(data: bytes) -> bytes:
-    odd_even_key = [1, 1, 0, 0, 0, 0, 0, 0]
-
-    CB0 = [1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, \
-           0, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0]
-    CB1 = [1, 1, 0, 1, 0, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, \
-           1, 1, 1, 1, 0, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0]
-    CB2 = [1, 0, 1, 1, 1, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, \
-           1, 1, 1, 0, 1, 1, 0, 1, 1, 0, 0, 1, 1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0]
-    CB3 = [0, 1, 1, 1, 0, 0, 1, 1, 0, 0, 1, 1, 0, 0, 0, 1, 0, 1, 1, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 0, \
-           0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 0, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 0]
-    CB4 = [0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 1, \
-           0, 0, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 0, 0, 1, 1, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0]
-    CB5 = [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, \
-           1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0, 1]
-    CB6 = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, \
-           0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1]
-    CB7 = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, \
-           0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
-    CB = [CB0, CB1, CB2, CB3, CB4, CB5, CB6, CB7]
-
-    data_bits = 64
-    ecc_bits = 8
-
-    data_bitarray = [0] * data_bits
-    for i in range(len(data) * 8):
-        data_bitarray[i] = (data[i // 8] >> (i % 8)) & 1
-
-    ecc_bitarray = [0] * ecc_bits
-
-    temp_bitarray = [0] * data_bits
-    for i in range(ecc_bits):
-        for j in range(len(data_bitarray)):
-            temp_bitarray[j] = data_bitarray[j] & CB[i][j]
-
-        for j in range(len(temp_bitarray)):
-            ecc_bitarray[i] = ecc_bitarray[i] ^ temp_bitarray[j]
-        ecc_bitarray[i] = odd_even_key[i] ^ ecc_bitarray[i]
-
-    ecc_bytes = bytearray((len(ecc_bitarray) + 7) // 8)
-    for i in range(len(ecc_bitarray)):
-        ecc_bytes[i // 8] |= (ecc_bitarray[i] << (i % 8))
-
-    return data + ecc_bytes
+    ecc = ARM_SECDED_64BIT_ECC_KEY
+    for position_table, value in zip(ARM_SECDED_64BIT_TABLE, data):
+        ecc ^= position_table[value]
+    return data + ecc.to_bytes(1, 'little')
 
 def ecc_encode_arm_secded_128bit(data: bytes) -> bytes:
-    odd_even_key = [0, 1, 1, 1, 1, 0, 0, 0, 0]
-
-    CB0 = [1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, \
-           0, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, \
-           1, 1, 0, 1, 1, 0, 1, 1, 1, 1, 0, 0, 0, 0, 1, 0, 0, 1, 1, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, \
-           0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 1, 0, 0, 0, 0, 0]
-    CB1 = [1, 1, 0, 1, 0, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, \
-           1, 1, 1, 1, 0, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, \
-           1, 0, 1, 1, 0, 0, 1, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, \
-           0, 1, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0]
-    CB2 = [1, 0, 1, 1, 1, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, \
-           1, 1, 1, 0, 1, 1, 0, 1, 1, 0, 0, 1, 1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, \
-           0, 1, 0, 1, 0, 1, 1, 0, 0, 1, 1, 0, 0, 1, 1, 0, 0, 0, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, \
-           0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 1, 0, 0, 0, 1, 0, 1, 1, 0, 0, 0, 1, 0, 0, 1, 0, 1, 0]
-    CB3 = [0, 1, 1, 1, 0, 0, 1, 1, 0, 0, 1, 1, 0, 0, 0, 1, 0, 1, 1, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 0, \
-           0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 0, 1, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 0, \
-           0, 0, 1, 1, 0, 0, 0, 0, 1, 0, 1, 0, 1, 1, 0, 0, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 0, 1, 1, \
-           0, 0, 1, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 1, 0, 0, 1, 1, 0, 1, 0, 0]
-    CB4 = [0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 1, \
-           0, 0, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 0, 0, 1, 1, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, \
-           0, 0, 0, 0, 1, 0, 0, 1, 1, 0, 0, 1, 1, 1, 0, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0, 0, \
-           1, 1, 1, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 0, 1]
-    CB5 = [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, \
-           1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0, 1, \
-           0, 0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, \
-           1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1]
-    CB6 = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, \
-           0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, \
-           0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, \
-           0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1]
-    CB7 = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, \
-           0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, \
-           1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, \
-           0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
-    CB8 = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, \
-           0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, \
-           0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, \
-           1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
-    CB = [CB0, CB1, CB2, CB3, CB4, CB5, CB6, CB7, CB8]
-
-    data_bits = 128
-    ecc_bits = 9
-
-    data_bitarray = [0] * data_bits
-    for i in range(len(data) * 8):
-        data_bitarray[i] = (data[i // 8] >> (i % 8)) & 1
-
-    ecc_bitarray = [0] * ecc_bits
-
-    temp_bitarray = [0] * data_bits
-    for i in range(ecc_bits):
-        for j in range(len(data_bitarray)):
-            temp_bitarray[j] = data_bitarray[j] & CB[i][j]
-
-        for j in range(len(temp_bitarray)):
-            ecc_bitarray[i] = ecc_bitarray[i] ^ temp_bitarray[j]
-        ecc_bitarray[i] = odd_even_key[i] ^ ecc_bitarray[i]
-
-    ecc_bytes = bytearray((len(ecc_bitarray) + 7) // 8)
-    for i in range(len(ecc_bitarray)):
-        ecc_bytes[i // 8] |= (ecc_bitarray[i] << (i % 8))
-
-    return data + ecc_bytes
+    ecc = ARM_SECDED_128BIT_ECC_KEY
+    for position_table, value in zip(ARM_SECDED_128BIT_TABLE, data):
+        ecc ^= position_table[value]
+    return data + ecc.to_bytes(2, 'little')
 
 def ecc_encode_arm_secded(data: bytes, data_width: int) -> bytes:
     if data_width == 4:
@@ -162,15 +135,56 @@ def ecc_encode_arm_secded(data: bytes, data_width: int) -> bytes:
     else:
         raise ValueError("Error: Only 32-bit (4 bytes), 64-bit (8 bytes) and 128-bit (16 bytes) data are supported for this ARM SECDED ECC function.")
 
+# Tables of the batch encoder, indexed by the data width in bytes: (lookup tables, ECC key, ECC byte count)
+ARM_SECDED_BATCH_TABLE = {
+    4: (ARM_SECDED_32BIT_TABLE, ARM_SECDED_32BIT_ECC_KEY, 1),
+    8: (ARM_SECDED_64BIT_TABLE, ARM_SECDED_64BIT_ECC_KEY, 1),
+    16: (ARM_SECDED_128BIT_TABLE, ARM_SECDED_128BIT_ECC_KEY, 2),
+}
+
+# The tables of the NumPy engine, which are built when NumPy is imported
+ARM_SECDED_BATCH_NUMPY_TABLE = {}
+
+def ecc_encode_arm_secded_batch(data: bytes, data_width: int, engine: str = None) -> bytes:
+    # Return only the ECC bytes of all the words in data, the caller interleaves them with the data
+    if data_width not in ARM_SECDED_BATCH_TABLE:
+        raise ValueError("Error: Only 32-bit (4 bytes), 64-bit (8 bytes) and 128-bit (16 bytes) data are supported for this ARM SECDED ECC function.")
+    ecc_table, ecc_key, ecc_count = ARM_SECDED_BATCH_TABLE[data_width]
+
+    if select_engine(engine, len(data)) == "numpy":
+        numpy = load_numpy()
+        if data_width not in ARM_SECDED_BATCH_NUMPY_TABLE:
+            ARM_SECDED_BATCH_NUMPY_TABLE[data_width] = numpy.array(ecc_table, dtype=numpy.uint16)
+        numpy_table = ARM_SECDED_BATCH_NUMPY_TABLE[data_width]
+        words = numpy.frombuffer(data, dtype=numpy.uint8).reshape(-1, data_width)
+        ecc = numpy.full(len(words), ecc_key, dtype=numpy.uint16)
+        # One gather per byte position for all the words at once
+        for position in range(data_width):
+            ecc ^= numpy_table[position][words[:, position]]
+        return ecc.astype(numpy.uint8 if ecc_count == 1 else '<u2').tobytes()
+
+    ecc = [ecc_key] * (len(data) // data_width)
+    for position in range(data_width):
+        position_table = ecc_table[position]
+        ecc = [value ^ position_table[byte] for value, byte in zip(ecc, data[position::data_width])]
+    if ecc_count == 1:
+        return bytes(ecc)
+    ecc_array = array.array('H', ecc)
+    if sys.byteorder != 'little':
+        ecc_array.byteswap()
+    return ecc_array.tobytes()
+
 ecc_dict = {
     "none": {
         "function": None,
+        "batch_function": None,
         "description": [
             "No ECC is added",
         ],
     },
     "arm_secded": {
         "function": ecc_encode_arm_secded,
+        "batch_function": ecc_encode_arm_secded_batch,
         "description": [
             "Single Error Correction Double Error Detection (SECDED) code is added",
             "The ECC bits are appended to the MSB side of the data",
@@ -179,6 +193,7 @@ ecc_dict = {
     },
     "xxxx.py": {
         "function": None,
+        "batch_function": None,
         "description": [
             "Custom ECC function defined in the specified Python file",
             "The Python file should define a function named ecc_encode"
@@ -192,6 +207,15 @@ ecc_dict = {
             "address is the start address of the data block (required in some ECC algorithms)",
             "The function should return the data with ECC bits appended to the MSB side in bytes",
             "Only vhex_dwx and vbin_dwx (x = 1, 2, 4, 8, 16) formats support this ECC",
+            "The Python file can define an optional function named ecc_encode_batch to encode many words per call",
+            "```",
+            "def ecc_encode_batch(buffer: memoryview, data_width: int, start_address: int) -> bytes",
+            "    # Add user specific algorithm here",
+            "    return ecc_bytes",
+            "```",
+            "buffer holds the data of many words, start_address is the address of the first word",
+            "The function should return only the ECC bytes of all the words, in the order of the words",
+            "ecc_encode_batch is used instead of ecc_encode when it is defined",
         ],
     },
 }
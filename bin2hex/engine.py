@@ -0,0 +1,146 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import os
+import importlib.util
+
+from typing import List, Optional
+
+# NumPy is optional. The vectorized engine is only used when it is importable
+# Importing NumPy takes longer than converting a small image, so it is imported by load_numpy at its first use
+numpy = None
+_HEX_TABLE = None
+_BIN_TABLE = None
+
+engine_list = ["python"] + (["numpy"] if importlib.util.find_spec("numpy") is not None else [])
+
+# The engine can be forced by the environment variable BIN2HEX_ENGINE, e.g. to compare the results
+default_engine = os.environ.get("BIN2HEX_ENGINE", engine_list[-1])
+if default_engine not in engine_list:
+    default_engine = engine_list[-1]
+
+# The default engine converts the data shorter than this by Python, so a conversion smaller than a block never imports NumPy
+NUMPY_SIZE_MIN = 0x10000
+
+def load_numpy():
+    # Import NumPy and build its tables once, None is returned if NumPy can't be imported
+    global numpy, _HEX_TABLE, _BIN_TABLE
+    if numpy is None:
+        try:
+            import numpy as numpy_module
+        except ImportError:
+            return None
+        # ASCII hex digits of every byte value, indexed by the byte value
+        # Both digits are packed in one uint16 item, so a single gather converts a byte
+        _HEX_TABLE = numpy_module.frombuffer("".join(f"{i:02X}" for i in range(256)).encode("ascii"), dtype=numpy_module.uint16)
+        # ASCII binary digits of every byte value, all the 8 digits are packed in one uint64 item
+        _BIN_TABLE = numpy_module.frombuffer("".join(f"{i:08b}" for i in range(256)).encode("ascii"), dtype=numpy_module.uint64)
+        numpy = numpy_module
+    return numpy
+
+def select_engine(engine:Optional[str], size:int) -> str:
+    # The engine given by the caller is used as it is, the default engine depends on the byte count of the data
+    if engine is None:
+        engine = default_engine if size >= NUMPY_SIZE_MIN else "python"
+    if engine == "numpy" and load_numpy() is None:
+        engine = "python"
+    return engine
+
+def swap_words(data:bytes, word_width:int) -> bytes:
+    # Reverse the byte order of every word with one strided copy per byte position
+    if word_width == 1:
+        return data
+    output_data = bytearray(len(data))
+    for i in range(word_width):
+        output_data[i::word_width] = data[word_width - 1 - i::word_width]
+    return output_data
+
+def interleave_words(columns:List[tuple], word_count:int) -> bytearray:
+    # Build word_count words from columns of (data, width), each word takes width bytes from every column in order
+    word_width = sum(width for _, width in columns)
+    output_data = bytearray(word_count * word_width)
+    offset = 0
+    for data, width in columns:
+        for i in range(width):
+            output_data[offset + i::word_width] = data[i::width]
+        offset += width
+    return output_data
+
+def hex_words_python(data:bytes, word_width:int, swap_endian:bool = False, separator:str = "\n") -> str:
+    # The word is little-endian by default, so the byte order of every word is reversed
+    if not swap_endian:
+        data = swap_words(data, word_width)
+    # bytes.hex() only accepts a single character separator
+    if len(separator) == 0:
+        return data.hex().upper()
+    elif len(separator) == 1:
+        return data.hex(separator, word_width).upper()
+    else:
+        return data.hex(" ", word_width).upper().replace(" ", separator)
+
+def hex_words_numpy(data:bytes, word_width:int, swap_endian:bool = False, separator:str = "\n") -> str:
+    words = numpy.frombuffer(data, dtype=numpy.uint8).reshape(-1, word_width)
+    # The word is little-endian by default, so the byte order of every word is flipped
+    if not swap_endian:
+        words = words[:, ::-1]
+    separator_bytes = numpy.frombuffer(separator.encode("ascii"), dtype=numpy.uint8)
+    # One row per word: the hex digits followed by the separator
+    text = numpy.empty((len(words), word_width * 2 + len(separator_bytes)), dtype=numpy.uint8)
+    text[:, :word_width * 2] = _HEX_TABLE[words].view(numpy.uint8)
+    text[:, word_width * 2:] = separator_bytes
+    # No separator after the last word
+    return text.tobytes()[:text.size - len(separator_bytes)].decode("ascii")
+
+# Convert the words in data, whose length must be a multiple of word_width, to hex strings joined by separator
+def hex_words(data:bytes, word_width:int, swap_endian:bool = False, separator:str = "\n", engine:str = None) -> str:
+    if len(data) != 0 and select_engine(engine, len(data)) == "numpy":
+        return hex_words_numpy(data, word_width, swap_endian, separator)
+    else:
+        return hex_words_python(data, word_width, swap_endian, separator)
+
+# The translation tables of bin_words_python, the table k spreads the bits 7-2k and 6-2k of a byte to the two nibbles of a byte
+_BIN_SPREAD_TABLES = [bytes(((i >> (7 - 2 * k)) & 1) << 4 | ((i >> (6 - 2 * k)) & 1) for i in range(256)) for k in range(4)]
+
+def bin_words_python(data:bytes, word_width:int, swap_endian:bool = False, separator:str = "\n") -> str:
+    # The word is little-endian by default, so the byte order of every word is reversed
+    if not swap_endian:
+        data = swap_words(data, word_width)
+    if not isinstance(data, (bytes, bytearray)):
+        data = bytes(data)
+    # Every bit becomes a nibble of 0 or 1, so the hex digits of the spread bytes are the binary digits
+    # A byte is spread to 4 bytes by 4 translations, which convert the whole block without a loop over the bytes
+    spread = bytearray(4 * len(data))
+    for k in range(4):
+        spread[k::4] = data.translate(_BIN_SPREAD_TABLES[k])
+    return hex_words_python(spread, 4 * word_width, True, separator)
+
+def bin_words_numpy(data:bytes, word_width:int, swap_endian:bool = False, separator:str = "\n") -> str:
+    words = numpy.frombuffer(data, dtype=numpy.uint8).reshape(-1, word_width)
+    # The word is little-endian by default, so the byte order of every word is flipped
+    if not swap_endian:
+        words = words[:, ::-1]
+    separator_bytes = numpy.frombuffer(separator.encode("ascii"), dtype=numpy.uint8)
+    # One row per word: the binary digits followed by the separator
+    text = numpy.empty((len(words), word_width * 8 + len(separator_bytes)), dtype=numpy.uint8)
+    text[:, :word_width * 8] = _BIN_TABLE[words].view(numpy.uint8).reshape(len(words), word_width * 8)
+    text[:, word_width * 8:] = separator_bytes
+    # No separator after the last word
+    return text.tobytes()[:text.size - len(separator_bytes)].decode("ascii")
+
+# Convert the words in data, whose length must be a multiple of word_width, to binary strings joined by separator
+def bin_words(data:bytes, word_width:int, swap_endian:bool = False, separator:str = "\n", engine:str = None) -> str:
+    if len(data) != 0 and select_engine(engine, len(data)) == "numpy":
+        return bin_words_numpy(data, word_width, swap_endian, separator)
+    else:
+        return bin_words_python(data, word_width, swap_endian, separator)
+
+# Convert the words in data to lines of line_width bytes, the words in a line are joined by separator
+def hex_lines(data:bytes, word_width:int, line_width:int, swap_endian:bool = False, separator:str = " ", engine:str = None) -> List[str]:
+    output_data = hex_words(data, word_width, swap_endian, separator, engine)
+    # Every word takes the same count of characters, so the lines are sliced at fixed offsets
+    line_step = (line_width // word_width) * (word_width * 2 + len(separator))
+    return [output_data[i : i + line_step - len(separator)] for i in range(0, len(output_data), line_step)]
@@ -11,3 +11,10 @@ INVALID_INPUT_FILE = 2
 FAIL_WRITE_OUTPUT_FILE = 3
 INVALID_FORMAT = 4
 INVALID_OPTION = 5
+
+class ConversionError(Exception):
+    # The error raised by the library API, the code is the same as the return code of the command line tool
+    def __init__(self, code:int = GENERAL_FAIL, message:str = ""):
+        super().__init__(message)
+        self.code = code
+        self.message = message
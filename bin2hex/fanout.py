@@ -0,0 +1,102 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import inspect
+import itertools
+import contextlib
+
+from typing import BinaryIO, Iterable, List
+
+from bin2hex.error import *
+from bin2hex.plan import ConversionPlan
+from bin2hex.registry import format_dict
+from bin2hex.bin2verilog import word_stream_dict, iter_words_shared
+from bin2hex.stream import read_blocks_mapped
+
+# The options of the plan, and the parameter of the conversion function which accepts each of them
+option_parameters = {
+    "start_address": "start_address",
+    "align_width": "align_width",
+    "ecc": "ecc_encode",
+    "ecc_skip_all_ones": "ecc_encode",
+    "ecc_skip_all_zeros": "ecc_encode",
+    "pad_count": "pad_count",
+    "pad_byte": "pad_byte",
+    "sparse_fill": "sparse_fill",
+}
+
+def fanout_plans(convert_formats:List[str], **options) -> List[ConversionPlan]:
+    # Every format is given the options it supports, e.g. the ECC options are given to the formats with ECC only
+    # An option which is supported by none of the formats is still an error
+    format_options = []
+    used_options = set()
+    for convert_format in convert_formats:
+        if convert_format not in format_dict:
+            raise ConversionError(INVALID_FORMAT, f"Error: The format {convert_format} is not supported.")
+        parameters = inspect.signature(format_dict[convert_format]["function"]).parameters
+        supported_options = {}
+        for name, value in options.items():
+            if name in option_parameters and value is not None and value is not False:
+                if option_parameters[name] not in parameters:
+                    continue
+                used_options.add(name)
+            supported_options[name] = value
+        format_options.append(supported_options)
+
+    for name, value in options.items():
+        if name in option_parameters and value is not None and value is not False and name not in used_options:
+            # The plan of the first format reports the error of the option
+            ConversionPlan(convert_formats[0], **options)
+
+    return [ConversionPlan(convert_format, **supported_options) for convert_format, supported_options in zip(convert_formats, format_options)]
+
+def fanout_streams(plans:List[ConversionPlan], input_blocks:Iterable[bytes]) -> List[tuple]:
+    # The formats converted from the same memory words with the same options are grouped,
+    # so their words and ECC are encoded once for all of them
+    groups = {}
+    for i, plan in enumerate(plans):
+        if plan.stream_function in word_stream_dict:
+            data_width, _ = word_stream_dict[plan.stream_function]
+            group_key = (data_width, tuple(sorted(plan.kwargs.items())))
+        else:
+            group_key = i
+        groups.setdefault(group_key, []).append(i)
+
+    # Every group reads the same blocks of the input
+    streams = []
+    for indexes, group_blocks in zip(groups.values(), itertools.tee(input_blocks, len(groups))):
+        plan = plans[indexes[0]]
+        if plan.stream_function in word_stream_dict:
+            data_width, _ = word_stream_dict[plan.stream_function]
+            words_functions = [word_stream_dict[plans[i].stream_function][1] for i in indexes]
+            stream = iter_words_shared(group_blocks, words_functions, data_width, **plan.kwargs)
+        else:
+            stream = ((chunk,) for chunk in plan.stream(group_blocks))
+        streams.append((indexes, stream))
+    return streams
+
+def write_fanout(plans:List[ConversionPlan], input_blocks:Iterable[bytes], output_files:List[str]) -> None:
+    # Convert the input to all the formats in one pass, every plan writes its own output file
+    with contextlib.ExitStack() as stack:
+        writers = [plan.open_output(output_file, stack) for plan, output_file in zip(plans, output_files)]
+        streams = fanout_streams(plans, input_blocks)
+        # The streams are advanced in turn, so every block of the input is released once all of them have converted it
+        while streams:
+            for stream in list(streams):
+                indexes, output_chunks = stream
+                try:
+                    chunks = next(output_chunks)
+                except StopIteration:
+                    streams.remove(stream)
+                    continue
+                for i, chunk in zip(indexes, chunks):
+                    writers[i].write(chunk)
+        for writer in writers:
+            writer.close()
+
+def convert_file_fanout(plans:List[ConversionPlan], ifile:BinaryIO, output_files:List[str]) -> None:
+    write_fanout(plans, read_blocks_mapped(ifile), output_files)
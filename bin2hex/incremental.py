@@ -0,0 +1,144 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import io
+import os
+import json
+import hashlib
+import contextlib
+
+from typing import BinaryIO, List, Optional
+
+from bin2hex.registry import format_dict
+from bin2hex.cache import plan_digest
+from bin2hex.parallel import shard_unit, convert_range
+from bin2hex.stream import map_file
+from bin2hex.stats import ConversionStats
+
+# The input is compared by blocks of about this byte count, only the lines of the changed blocks are converted again
+INCREMENTAL_BLOCK_SIZE = 0x1000
+
+# The hashes of the input blocks and the layout of the output are kept in this file next to the output file
+SIDECAR_SUFFIX = ".b2h"
+
+def supports_incremental(plan) -> bool:
+    # The lines are found by their offsets in the output file, which requires all the lines to have the same length
+    return format_dict[plan.convert_format]["fixed_line"] and plan.split_count == 1 and "sparse_fill" not in plan.kwargs
+
+def block_hashes(input_data:memoryview, block_size:int) -> List[str]:
+    return [hashlib.blake2b(input_data[i : i + block_size], digest_size = 16).hexdigest() for i in range(0, len(input_data), block_size)]
+
+def load_sidecar(sidecar_file:str) -> Optional[dict]:
+    try:
+        with open(sidecar_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_sidecar(sidecar_file:str, sidecar:dict, output_file:str) -> None:
+    # The output file is recorded, so an output file changed by anything else is converted again
+    output_stat = os.stat(output_file)
+    sidecar = {**sidecar, "output_size": output_stat.st_size, "output_mtime": output_stat.st_mtime_ns}
+    temp_file = f"{sidecar_file}.{os.getpid()}.tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(sidecar, f)
+    os.replace(temp_file, sidecar_file)
+
+def output_layout(plan, kwargs:dict, input_data:memoryview, unit:int) -> tuple:
+    # The byte count of a line with its separator, and the byte count of the output
+    separator_size = len(plan.separator)
+    full_count, remain = divmod(len(input_data), unit)
+    # The warnings of the whole conversion are not repeated by the lines converted here
+    with contextlib.redirect_stdout(io.StringIO()):
+        line_size = len(convert_range(plan, kwargs, input_data, 0, unit)) + separator_size
+        if remain:
+            output_size = full_count * line_size + len(convert_range(plan, kwargs, input_data, len(input_data) - remain, remain))
+        else:
+            output_size = full_count * line_size - separator_size
+    return line_size, output_size
+
+def patch_output(plan, kwargs:dict, input_data:memoryview, output_file:str, sidecar:dict, hashes:List[str]) -> bool:
+    # Convert the changed blocks again and write their lines over the old lines
+    # False is returned if the new lines don't fit the old layout
+    unit = sidecar["unit"]
+    block_size = sidecar["block_size"]
+    line_size = sidecar["line_size"]
+    separator = plan.separator.encode()
+    # The adjacent changed blocks are converted at once
+    ranges = []
+    for i in range(len(hashes)):
+        if hashes[i] != sidecar["hashes"][i]:
+            if ranges and ranges[-1][1] == i:
+                ranges[-1][1] = i + 1
+            else:
+                ranges.append([i, i + 1])
+    with open(output_file, 'r+b') as ofile:
+        for first, last in ranges:
+            offset = first * block_size
+            length = min(last * block_size, len(input_data)) - offset
+            output_offset = offset // unit * line_size
+            output_data = convert_range(plan, kwargs, input_data, offset, length).encode()
+            if offset + length < len(input_data):
+                output_data += separator
+                if len(output_data) != length // unit * line_size:
+                    return False
+            elif output_offset + len(output_data) != sidecar["output_size"]:
+                return False
+            ofile.seek(output_offset)
+            ofile.write(output_data)
+    return True
+
+def convert_file_incremental(plan, ifile:BinaryIO, output_file:str, jobs:int = 1, stats:ConversionStats = None) -> bool:
+    # Patch the output file of the last conversion if only some blocks of the input are changed,
+    # or convert the whole input and keep the hashes of its blocks for the next conversion
+    # True is returned if the output file is patched
+    sidecar_file = output_file + SIDECAR_SUFFIX
+    sidecar = load_sidecar(sidecar_file)
+    # The old sidecar is removed first, so an interrupted patch is never taken as a complete output
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(sidecar_file)
+
+    input_data = None
+    if supports_incremental(plan):
+        input_data = map_file(ifile)
+    else:
+        print(f"Warning: The incremental conversion is not supported by the format {plan.convert_format} with these options. Converting the whole input.")
+    if input_data is None:
+        plan.write(plan.stream_file(ifile, jobs, stats), output_file, stats)
+        return False
+
+    kwargs = dict(plan.kwargs)
+    with contextlib.redirect_stdout(io.StringIO()):
+        unit = shard_unit(plan, kwargs)
+    block_size = -(-INCREMENTAL_BLOCK_SIZE // unit) * unit
+    hashes = block_hashes(input_data, block_size)
+    layout = {
+        "plan": plan_digest(plan),
+        "input_size": len(input_data),
+        "unit": unit,
+        "block_size": block_size,
+    }
+
+    if sidecar is not None and all(sidecar.get(name) == value for name, value in layout.items()):
+        try:
+            output_stat = os.stat(output_file)
+            if output_stat.st_size == sidecar["output_size"] and output_stat.st_mtime_ns == sidecar["output_mtime"]:
+                if patch_output(plan, kwargs, input_data, output_file, sidecar, hashes):
+                    save_sidecar(sidecar_file, {**sidecar, "hashes": hashes}, output_file)
+                    if stats is not None:
+                        stats.mode = "patch"
+                    return True
+        except (OSError, KeyError, IndexError):
+            pass
+
+    plan.write(plan.stream_file(ifile, jobs, stats), output_file, stats)
+    # The sidecar is only kept if the output has the layout to be patched
+    if len(input_data) >= unit:
+        line_size, output_size = output_layout(plan, kwargs, input_data, unit)
+        if os.path.getsize(output_file) == output_size:
+            save_sidecar(sidecar_file, {**layout, "line_size": line_size, "hashes": hashes}, output_file)
+    return False
@@ -10,48 +10,54 @@
 import os
 import sys
 import argparse
-import inspect
-import importlib.util
 
-from typing import Optional, BinaryIO
+from typing import BinaryIO, List
 
 from bin2hex import __version__
-from bin2hex.bin2c import bin2c_dict
-# from bin2hex.bin2ihex import bin2ihex_dict
-from bin2hex.bin2model import bin2model_dict
-# from bin2hex.bin2srec import bin2srec_dict
-from bin2hex.bin2verilog import bin2verilog_dict
-from bin2hex.ecc import ecc_dict
 from bin2hex.error import *
+from bin2hex.plan import ConversionPlan
+from bin2hex.stats import ConversionStats
+from bin2hex.registry import format_dict, ecc_dict, default_format
+from bin2hex.parallel import cpu_count
+from bin2hex.stream import safe_open
 
-format_dict = {
-    **bin2c_dict,
-    #**bin2ihex_dict,
-    **bin2model_dict,
-    #**bin2srec_dict,
-    **bin2verilog_dict,
-}
+# The modules of the cache, the incremental, the fan-out and the batch conversions are imported when their options are given,
+# so a small conversion starts without them
+# The default of --cache-size is CACHE_SIZE_DEFAULT of the cache module, which is resolved after the module is imported
 
-tool_default_format= "vhex_dw1"
+tool_default_format= default_format
 
 tool_description = f"bin2hex is an utility to convert binary file to multiple types of hexadecimal text file"
-tool_epilog = f"Supported format:\n"
-for format_str, format_sub_dict in format_dict.items():
-    format_description = format_sub_dict["description"]
-    tool_epilog = tool_epilog + " " * 2 + f"{format_str}:" + "\n"
-    for i in range(0, len(format_description)):
-        tool_epilog = tool_epilog + " " * 4 + f"{format_description[i]}" + "\n"
-    tool_epilog = tool_epilog + "\n"
-tool_epilog = tool_epilog + f"Supported ECC algorithm: \n"
-for ecc_str, ecc_sub_dict in ecc_dict.items():
-    ecc_description = ecc_sub_dict["description"]
-    tool_epilog = tool_epilog + " " * 2 + f"{ecc_str}:" + "\n"
-    for i in range(0, len(ecc_description)):
-        tool_epilog = tool_epilog + " " * 4 + f"{ecc_description[i]}" + "\n"
+
+def build_tool_epilog() -> str:
+    # The descriptions of all the formats and ECC algorithms, which import all of their modules
+    tool_epilog = f"Supported format:\n"
+    for format_str, format_sub_dict in format_dict.items():
+        format_description = format_sub_dict["description"]
+        tool_epilog = tool_epilog + " " * 2 + f"{format_str}:" + "\n"
+        for i in range(0, len(format_description)):
+            tool_epilog = tool_epilog + " " * 4 + f"{format_description[i]}" + "\n"
+        tool_epilog = tool_epilog + "\n"
+    tool_epilog = tool_epilog + f"Supported ECC algorithm: \n"
+    for ecc_str, ecc_sub_dict in ecc_dict.items():
+        ecc_description = ecc_sub_dict["description"]
+        tool_epilog = tool_epilog + " " * 2 + f"{ecc_str}:" + "\n"
+        for i in range(0, len(ecc_description)):
+            tool_epilog = tool_epilog + " " * 4 + f"{ecc_description[i]}" + "\n"
+    return tool_epilog
+
+class ToolArgumentParser(argparse.ArgumentParser):
+    # The epilog is built only when the help is printed
+    def format_help(self) -> str:
+        if self.epilog is None:
+            self.epilog = build_tool_epilog()
+        return super().format_help()
 version_help = f"Show version information"
 input_help = f"[Required] The raw binary input file to be converted"
-output_help = f"[Required] The formatted hex output file to be converted to"
-format_help = f"[Optional] The format to be converted to. Default is \"{tool_default_format}\""
+output_help = f"[Required] The formatted hex output file to be converted to. " + \
+    f"Can be given more than once, paired with the formats in order"
+format_help = f"[Optional] The format to be converted to. Default is \"{tool_default_format}\". " + \
+    f"Can be given more than once to convert the input to several formats in one pass"
 address_help = f"[Optional] The start address of the image. Not all formats require. Default is 0x0"
 alignment_help = f"[Optional] The byte count per line. Default is various according to the format"
 ecc_help = f"[Optional] The ECC type to be calculated. Not all formats require. Default is \"none\""
@@ -62,38 +68,51 @@ pad_count_help = f"[Optional] The byte count to be padded to hex lines. Default
 pad_byte_help = f"[Optional] The padding byte. Due to the typical use case of FLASH memory, default is \"0xFF\""
 split_help = f"[Optional] Split the output into multiple files with suffix \"_0\", \"_1\", ... according to the split byte count" + \
              f"Must be power of 2. Default is 1(no split)"
+sparse_help = f"[Optional] Leave out the runs of words filled by this byte. The verilog formats write an \"@address\" record where the data resumes"
+cache_help = f"[Optional] The cache directory. The output is copied from the cache if the same input was converted with the same options before"
+cache_size_help = f"[Optional] The byte count limit of the cache directory, the least recently used outputs are removed. Default is 1 GiB"
+incremental_help = f"[Optional] Rewrite only the lines of the changed input in the output file of the last conversion. " + \
+    f"Supported by the formats with the same length of lines without split"
+manifest_help = f"[Optional] Convert all the jobs of a JSON or TOML manifest file in one process, instead of the input and output options"
+stats_help = f"[Optional] Report the time of every phase of the conversion, the byte and word counts, the throughput and the peak memory"
+stats_json_help = f"[Optional] Write the statistics of the conversion to this JSON file"
+serve_help = f"[Optional] Serve the conversions on this Unix domain socket. The count of worker processes is given by -j"
+client_help = f"[Optional] Forward the conversion to the server on this Unix domain socket. " + \
+    f"The environment variable BIN2HEX_SERVER does the same"
+server_stats_help = f"[Optional] Show the queue depth and the latency of the server given by --client or BIN2HEX_SERVER"
+jobs_help = f"[Optional] The count of worker processes converting the input in parallel. Default is the count of available CPUs"
 # The entry address is reserved for future use, such as iHex and SRecord
 #entry_help = f"[Optional] The start entry address of the executable binary. Default is \"No entry\""
 
-def safe_open(file:str, mode: str = 'r') -> Optional[BinaryIO]:
-    try:
-        if file is None:
-            print(f"Error: No file specified.")
-            return None
-        if 'b' in mode:
-            return open(file, mode)
-        else:
-            # With newline='', no conversion between CRLF and LF is performed automatically
-            return open(file, mode, newline='')
-    except FileNotFoundError:
-        print(f"Error: {file} doesn't exist.")
-    except PermissionError:
-        print(f"Error: Permission denied for {file}")
-    except IsADirectoryError:
-        print(f"Error: {file} is a directory, not a file")
-    except OSError as e:
-        print(f"Error: Failed to open {file}.")
-    except Exception as e:
-        print(f"Error: An unexpected error occurred: {e}")
-    return None
+def convert_single(ifile:BinaryIO, output_file:str, plan:ConversionPlan, jobs:int, cache_dir:str, cache_size:int, incremental:bool, stats:ConversionStats = None) -> None:
+    if incremental is True and cache_dir is not None:
+        raise ConversionError(INVALID_OPTION, f"Error: The incremental option can't be used with the cache option.")
+    cache = None
+    if cache_dir is not None:
+        from bin2hex.cache import CACHE_SIZE_DEFAULT, ConversionCache
+        try:
+            cache = ConversionCache(cache_dir, cache_size if cache_size is not None else CACHE_SIZE_DEFAULT)
+        except OSError:
+            print(f"Warning: The cache directory {cache_dir} can't be created. Converting without the cache.")
+    if incremental is True:
+        from bin2hex.incremental import convert_file_incremental
+        convert_file_incremental(plan, ifile, output_file, jobs, stats)
+    elif cache is not None:
+        cache.convert_file(plan, ifile, output_file, jobs, stats)
+    else:
+        # Read the input file block by block and perform the conversion on the fly
+        plan.write(plan.stream_file(ifile, jobs, stats), output_file, stats)
 
-def main() -> bool:
+def main(argv:List[str] = None, jobs_default:int = None) -> int:
+    # argv are the arguments without the program name, which are sys.argv[1:] by default
+    # jobs_default is the count of worker processes when -j is not given, which is the count of CPUs by default
+    argv = sys.argv[1:] if argv is None else argv
     # parse the input arguments
-    parse = argparse.ArgumentParser(formatter_class = argparse.RawDescriptionHelpFormatter and argparse.RawTextHelpFormatter, description = tool_description, epilog = tool_epilog)
+    parse = ToolArgumentParser(formatter_class = argparse.RawDescriptionHelpFormatter and argparse.RawTextHelpFormatter, description = tool_description)
     parse.add_argument('-v', '--version', action = 'version', version=__version__, help = version_help)
     parse.add_argument('-i', '--input', type = str, help = input_help)
-    parse.add_argument('-o', '--output', type = str, help = output_help)
-    parse.add_argument('-f', '--format', default = tool_default_format, help = format_help)
+    parse.add_argument('-o', '--output', type = str, action = 'append', help = output_help)
+    parse.add_argument('-f', '--format', action = 'append', help = format_help)
     parse.add_argument('-a', '--address', type = lambda x:int(x, 0), default = None, help = address_help)
     parse.add_argument('-A', '--alignment', type = lambda x:int(x, 0), default = None, help = alignment_help)
     parse.add_argument('-e', '--ecc', default = None, help = ecc_help)
@@ -102,12 +121,23 @@ def main() -> bool:
     parse.add_argument('-c', '--pad-count', type = lambda x:int(x, 0), default = None, help = pad_count_help)
     parse.add_argument('-b', '--pad-byte', type = lambda x:int(x, 0), default = None, help = pad_byte_help)
     parse.add_argument('-s', '--split', type = lambda x:int(x, 0), default = 1, help = split_help)
+    parse.add_argument('--sparse', type = lambda x:int(x, 0), default = None, help = sparse_help)
+    parse.add_argument('--cache', type = str, default = None, help = cache_help)
+    parse.add_argument('--cache-size', type = lambda x:int(x, 0), default = None, help = cache_size_help)
+    parse.add_argument('--incremental', action = 'store_true', default = False, help = incremental_help)
+    parse.add_argument('-m', '--manifest', type = str, default = None, help = manifest_help)
+    parse.add_argument('--stats', action = 'store_true', default = False, help = stats_help)
+    parse.add_argument('--stats-json', type = str, default = None, help = stats_json_help)
+    parse.add_argument('--serve', type = str, default = None, help = serve_help)
+    parse.add_argument('--client', type = str, default = None, help = client_help)
+    parse.add_argument('--server-stats', action = 'store_true', default = False, help = server_stats_help)
+    parse.add_argument('-j', '--jobs', type = lambda x:int(x, 0), default = None, help = jobs_help)
     #parse.add_argument('-E', '--entry', type = lambda x:int(x, 0), default = None, help=entry_help)
-    args = parse.parse_args()
+    args = parse.parse_args(argv)
 
     input_file = args.input
-    output_file = args.output
-    convert_format = args.format
+    output_files = args.output if args.output is not None else []
+    convert_formats = args.format if args.format is not None else [tool_default_format]
     start_address = args.address
     align_width = args.alignment
     ecc = args.ecc
@@ -116,113 +146,80 @@ def main() -> bool:
     pad_count = args.pad_count
     pad_byte = args.pad_byte
     split_count = args.split
+    sparse_fill = args.sparse
+    cache_dir = args.cache
+    cache_size = args.cache_size
+    incremental = args.incremental
+    manifest_file = args.manifest
+    stats_json = args.stats_json
+    stats = args.stats or stats_json is not None
+    jobs = args.jobs if args.jobs is not None else (jobs_default if jobs_default is not None else cpu_count())
+    serve_socket = args.serve
+    client_socket = args.client
     #start_entry = args.entry
 
-    if len(sys.argv) == 1:
+    if len(argv) == 0:
         parse.print_usage()
         return SUCCESS
 
-    kwargs = {}
-
-    ifile = safe_open(input_file, 'rb')
-    if ifile is None:
-        return INVALID_INPUT_FILE
-
-    if output_file is None:
-        print(f"Error: No output file specified.")
-        return INVALID_INPUT_FILE
-
-    # Check the format is supported
-    if convert_format not in format_dict:
-        print(f"Error: The format {convert_format} is not supported.")
-        return INVALID_FORMAT
-    # Prepare the conversion function and arguments
-    convert_function = format_dict[convert_format]["function"]
-
-    if start_address is not None:
-        if "start_address" in inspect.signature(convert_function).parameters:
-            kwargs["start_address"] = start_address
-        else:
-            print(f"Error: The format {convert_format} does not support \"address\" option.")
+    if serve_socket is not None:
+        if client_socket is not None:
+            print(f"Error: The serve option can't be used with the client option.")
             return INVALID_OPTION
+        from bin2hex.server import serve
+        return serve(serve_socket, jobs)
 
-    if align_width is not None:
-        if "align_width" in inspect.signature(convert_function).parameters:
-            kwargs["align_width"] = align_width
-        else:
-            print(f"Error: The format {convert_format} does not support \"alignment\" option.")
+    if args.server_stats is True:
+        from bin2hex.server import SERVER_ENV, server_stats
+        client_socket = client_socket if client_socket is not None else os.environ.get(SERVER_ENV)
+        if client_socket is None:
+            print(f"Error: No server specified by the client option or {SERVER_ENV}.")
             return INVALID_OPTION
+        return server_stats(client_socket)
 
-    if ecc_skip_all_ones is True and ecc_skip_all_zeros is True:
-        print(f"Error: Both ecc-skip-all-ones and ecc-skip-all-zeros are enabled. Only one of them can be enabled at a time.")
-        return INVALID_OPTION
+    if client_socket is not None:
+        # The conversion is forwarded to the server, which has everything loaded already
+        from bin2hex.server import forward_request
+        try:
+            return forward_request(client_socket, argv)
+        except (OSError, ValueError):
+            print(f"Error: The server {client_socket} can't be connected.")
+            return GENERAL_FAIL
 
-    if ecc is not None:
-        if "ecc_encode" in inspect.signature(convert_function).parameters:
-            if ecc_skip_all_ones is True:
-                kwargs["ecc_skip"] = 0xFF
-            elif ecc_skip_all_zeros is True:
-                kwargs["ecc_skip"] = 0x00
-            else:
-                kwargs["ecc_skip"] = None
-            if ecc in ecc_dict:
-                kwargs["ecc_encode"] = ecc_dict[ecc]["function"]
-            else:
-                if (os.path.isfile(ecc)):
-                    ecc_spec = importlib.util.spec_from_file_location("python2_module", ecc)
-                    ecc_module = importlib.util.module_from_spec(ecc_spec)
-                    ecc_spec.loader.exec_module(ecc_module)
-                    if hasattr(ecc_module, 'ecc_encode'):
-                        kwargs["ecc_encode"] = getattr(ecc_module, 'ecc_encode')
-                    else:
-                        print(f"Error: Doesn't find ecc_encode function in {ecc}.")
-                        return INVALID_OPTION
-                else:
-                    print(f"Error: The ECC type {ecc} is not supported.")
-                    return INVALID_OPTION
+    from bin2hex.server import SERVER_ENV
+    if os.environ.get(SERVER_ENV):
+        # The conversion is done here if the server of the environment variable is not running
+        from bin2hex.server import forward_request
+        try:
+            return forward_request(os.environ[SERVER_ENV], argv)
+        except (OSError, ValueError):
+            print(f"Warning: The server {os.environ[SERVER_ENV]} can't be connected. Converting without the server.")
 
-            if "start_address" in inspect.signature(kwargs["ecc_encode"]).parameters:
-                if start_address is None:
-                    print(f"Warning: The ECC function in {ecc} requires start address parameter, but no start address is specified. Using default 0x0.")
-            else:
-                if start_address is not None:
-                    print(f"Error: The ECC function in {ecc} doesn't support start address parameter.")
-                    return INVALID_OPTION
-        else:
-            print(f"Error: The format {convert_format} does not support \"ecc\" option.")
+    if manifest_file is not None:
+        if input_file is not None or len(output_files) != 0:
+            print(f"Error: The input and output options can't be used with the manifest option.")
             return INVALID_OPTION
-
-    if ecc_skip_all_ones is True or ecc_skip_all_zeros is True:
-        if ecc is None:
-            print(f"Error: ecc-skip-all-ones or ecc-skip-all-zeros is enabled, but no ECC type is specified.")
+        if stats is True:
+            print(f"Error: The stats option can't be used with the manifest option.")
             return INVALID_OPTION
+        # The jobs are converted by the worker processes
+        from bin2hex.batch import run_batch
+        return run_batch(manifest_file, jobs)
 
-    if pad_count is not None:
-        if "pad_count" in inspect.signature(convert_function).parameters:
-            if pad_count < 0:
-                print(f"Error: The pad count {pad_count} is invalid.")
-                return INVALID_OPTION
-            kwargs["pad_count"] = pad_count
-        else:
-            print(f"Error: The format {convert_format} does not support \"padcount\" option.")
-            return INVALID_OPTION
+    ifile = safe_open(input_file, 'rb')
+    if ifile is None:
+        return INVALID_INPUT_FILE
 
-    if pad_byte is not None:
-        if pad_count is not None:
-            if "pad_byte" in inspect.signature(convert_function).parameters:
-                if pad_byte < 0 or pad_byte > 255:
-                    print(f"Error: The pad byte {pad_byte} is out of range (0-255).")
-                    return INVALID_OPTION
-                kwargs["pad_byte"] = pad_byte & 0xFF
-            else:
-                print(f"Error: The format {convert_format} does not support \"padbyte\" option.")
-                return INVALID_OPTION
-        else:
-            print(f"Error: The pad byte is specified but pad count is not.")
-            return INVALID_OPTION
+    if len(output_files) == 0:
+        print(f"Error: No output file specified.")
+        return INVALID_INPUT_FILE
+
+    if len(output_files) != len(convert_formats):
+        print(f"Error: {len(convert_formats)} formats are specified for {len(output_files)} output files. Every output file requires a format.")
+        return INVALID_OPTION
 
-    if split_count <= 0 or (split_count & (split_count - 1)) != 0:
-        print(f"Error: The split count {split_count} is not valid. It must be a power of 2 (1, 2, 4, 8, ...).")
+    if len(set(output_files)) != len(output_files):
+        print(f"Error: The same output file is specified more than once.")
         return INVALID_OPTION
 
     #if start_entry is not None:
@@ -231,35 +228,38 @@ def main() -> bool:
     #    else:
     #        print(f"Warning: The format {convert_format} does not support \"entry\" option, which will be ignored.")
 
-    # Read bytes from the input file
-    input_data = ifile.read()
-
-    # Perform the conversion
-    output_data = convert_function(input_data, **kwargs)
-
-    # Write the hex string to the output file
-    if split_count == 1:
-        ofile = safe_open(output_file, 'w')
-        if ofile is None:
-            return FAIL_WRITE_OUTPUT_FILE
-        ofile.write(output_data)
-        ofile.close()
-    else:
-        output_data_lines = output_data.splitlines(keepends=True)
-        ofile_data_lines = [[] for _ in range(split_count)]
-        i = 0
-        for output_data_line in output_data_lines:
-            ofile_data_lines[i % split_count].append(output_data_line)
-            i = i + 1
-        name, extension = output_file.rsplit('.', 1)
-        for i in range(split_count):
-            # Remove the trailing newline for each split file
-            ofile_data_lines[i][-1] = ofile_data_lines[i][-1].rstrip('\n')
-            ofile = safe_open(f"{name}_{i}.{extension}", 'w')
-            if ofile is None:
-                return FAIL_WRITE_OUTPUT_FILE
-            for ofile_data_line in ofile_data_lines[i]:
-                ofile.write(ofile_data_line)
+    with ifile:
+        try:
+            if len(convert_formats) > 1:
+                if incremental is True or cache_dir is not None:
+                    raise ConversionError(INVALID_OPTION, f"Error: The incremental or cache option can't be used with more than one format.")
+                if stats is True:
+                    raise ConversionError(INVALID_OPTION, f"Error: The stats option can't be used with more than one format.")
+                # Every format is given the options it supports
+                from bin2hex.fanout import fanout_plans, convert_file_fanout
+                plans = fanout_plans(convert_formats, start_address = start_address, align_width = align_width, ecc = ecc, ecc_skip_all_ones = ecc_skip_all_ones, ecc_skip_all_zeros = ecc_skip_all_zeros,
+                                     pad_count = pad_count, pad_byte = pad_byte, split_count = split_count, sparse_fill = sparse_fill)
+                # The input is read once for all the formats, and the ECC words are shared by the verilog formats
+                convert_file_fanout(plans, ifile, output_files)
+            else:
+                plan = ConversionPlan(convert_formats[0], start_address, align_width, ecc, ecc_skip_all_ones, ecc_skip_all_zeros, pad_count, pad_byte, split_count, sparse_fill)
+                conversion_stats = ConversionStats(ifile) if stats is True else None
+                convert_single(ifile, output_files[0], plan, jobs, cache_dir, cache_size, incremental, conversion_stats)
+                if conversion_stats is not None:
+                    conversion_stats.finish(plan, output_files[0])
+                    if args.stats is True:
+                        conversion_stats.report()
+                    if stats_json is not None:
+                        import json
+                        try:
+                            with open(stats_json, 'w') as f:
+                                json.dump(conversion_stats.result, f, indent = 2)
+                        except OSError:
+                            raise ConversionError(FAIL_WRITE_OUTPUT_FILE, f"Error: The statistics can't be written to {stats_json}.")
+        except ConversionError as e:
+            if e.message:
+                print(e.message)
+            return e.code
 
     return SUCCESS
 
@@ -0,0 +1,119 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import os
+import io
+import math
+import inspect
+import contextlib
+
+from collections import deque
+from typing import BinaryIO, Iterator, List
+
+from bin2hex.registry import format_dict
+from bin2hex.stream import BLOCK_SIZE, map_file, join_chunks
+
+# A shard is not smaller than this, so the cost of the worker processes is paid back
+SHARD_SIZE_MIN = 16 * BLOCK_SIZE
+
+# Every worker is given a few shards, so a slow shard doesn't hold back the others
+SHARDS_PER_JOB = 4
+
+def cpu_count() -> int:
+    # The CPUs this process is allowed to run on
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+
+    # The CPU quota of the container, which is the cgroup v2 cpu.max or the cgroup v1 cfs quota
+    quota = None
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            fields = f.read().split()
+        if fields[0] != "max":
+            quota = int(fields[0]) / int(fields[1])
+    except (OSError, ValueError, IndexError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                cfs_quota = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                cfs_period = int(f.read())
+            if cfs_quota > 0 and cfs_period > 0:
+                quota = cfs_quota / cfs_period
+        except (OSError, ValueError):
+            pass
+
+    if quota is not None:
+        count = min(count, math.ceil(quota))
+    return max(count, 1)
+
+def shard_unit(plan, stream_kwargs:dict) -> int:
+    # The byte count of a line, the shards must hold whole lines to give the same layout as the serial conversion
+    data_width = format_dict[plan.convert_format]["data_width"]
+    parameters = inspect.signature(plan.stream_function).parameters
+    if "align_width" not in parameters:
+        return data_width
+    align_width = plan.kwargs.get("align_width", parameters["align_width"].default)
+    if align_width % data_width != 0:
+        print(f"Warning: The alignment width {align_width} is not aligned to the data width {data_width}. Expanding the alignment width to {align_width + data_width - (align_width % data_width)}.")
+        align_width += data_width - (align_width % data_width)
+    # The workers are given the expanded alignment width, so the warning is not repeated by every shard
+    stream_kwargs["align_width"] = align_width
+    return max(align_width, data_width)
+
+def shard_ranges(size:int, unit:int, jobs:int) -> List[tuple]:
+    shard_size = max(SHARD_SIZE_MIN, -(-size // (jobs * SHARDS_PER_JOB)))
+    shard_size = -(-shard_size // unit) * unit
+    return [(offset, min(shard_size, size - offset)) for offset in range(0, size, shard_size)]
+
+# The state of a worker process, which is set up once by init_worker
+_worker_plan = None
+_worker_kwargs = None
+_worker_input = None
+
+def init_worker(plan_class:type, options:dict, stream_kwargs:dict, input_file:str) -> None:
+    global _worker_plan, _worker_kwargs, _worker_input
+    # The plan is rebuilt from the options, because the functions of a user ECC file can't be pickled
+    # The options were validated by the main process, so the warnings are not repeated
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_plan = plan_class(**options)
+    _worker_kwargs = {**_worker_plan.kwargs, **stream_kwargs}
+    # All the workers share the pages of the input file instead of receiving copies of the data
+    with open(input_file, 'rb') as ifile:
+        _worker_input = map_file(ifile)
+
+def convert_range(plan, kwargs:dict, input_data:memoryview, offset:int, length:int) -> str:
+    # Convert a range of the input, which holds whole lines, to the same lines as converting the whole input
+    kwargs = dict(kwargs)
+    # The range starts at its offset in the image, which matters to the addresses and the address-aware ECC
+    parameters = inspect.signature(plan.stream_function).parameters
+    if "start_address" in parameters:
+        kwargs["start_address"] = kwargs.get("start_address", parameters["start_address"].default) + offset
+    input_blocks = (input_data[i : min(i + BLOCK_SIZE, offset + length)] for i in range(offset, offset + length, BLOCK_SIZE))
+    return join_chunks(plan.stream_function(input_blocks, **kwargs), plan.separator)
+
+def convert_shard(shard:tuple) -> str:
+    offset, length = shard
+    return convert_range(_worker_plan, _worker_kwargs, _worker_input, offset, length)
+
+def iter_file_parallel(plan, ifile:BinaryIO, jobs:int) -> Iterator[str]:
+    # Convert the input file by shards in worker processes, the shard outputs are yielded in order
+    # The process pool is imported here, the serial conversions don't pay for importing it
+    from concurrent.futures import ProcessPoolExecutor
+    stream_kwargs = {}
+    unit = shard_unit(plan, stream_kwargs)
+    shards = shard_ranges(os.fstat(ifile.fileno()).st_size, unit, jobs)
+    with ProcessPoolExecutor(min(jobs, len(shards)), initializer=init_worker, initargs=(type(plan), plan.options, stream_kwargs, ifile.name)) as executor:
+        # Only a window of shards is in flight, so the memory usage doesn't grow with the size of the input
+        pending = deque()
+        for shard in shards:
+            pending.append(executor.submit(convert_shard, shard))
+            if len(pending) >= jobs * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,216 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import os
+import stat
+import contextlib
+import inspect
+import importlib.util
+
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+from bin2hex.error import *
+from bin2hex.registry import format_dict, ecc_dict, default_format
+from bin2hex.parallel import SHARD_SIZE_MIN, iter_file_parallel
+from bin2hex.stream import safe_open, read_blocks_mapped, ChunkWriter, SplitChunkWriter
+from bin2hex.stats import ConversionStats, TimedFile, TimedWriter
+
+# The user ECC files loaded by the plans, the same content is loaded once and its functions are shared
+_ecc_modules = {}
+
+def load_ecc_module(ecc:str) -> tuple:
+    # Load the user ECC file and return its ecc_encode function and the optional ecc_encode_batch function
+    import hashlib
+    with open(ecc, 'rb') as ecc_file:
+        ecc_key = (os.path.realpath(ecc), hashlib.sha256(ecc_file.read()).hexdigest())
+    if ecc_key not in _ecc_modules:
+        _ecc_modules[ecc_key] = load_ecc_functions(ecc)
+    return _ecc_modules[ecc_key]
+
+def load_ecc_functions(ecc:str) -> tuple:
+    ecc_spec = importlib.util.spec_from_file_location("python2_module", ecc)
+    ecc_module = importlib.util.module_from_spec(ecc_spec)
+    ecc_spec.loader.exec_module(ecc_module)
+    if not hasattr(ecc_module, 'ecc_encode'):
+        raise ConversionError(INVALID_OPTION, f"Error: Doesn't find ecc_encode function in {ecc}.")
+    # The batch function is optional, it is preferred to the word function when present
+    return getattr(ecc_module, 'ecc_encode'), getattr(ecc_module, 'ecc_encode_batch', None)
+
+class ConversionPlan:
+    # The options are validated and bound to the conversion function once,
+    # then the plan can convert any count of inputs with the same options
+    def __init__(self, convert_format:str = default_format, start_address:int = None, align_width:int = None, ecc:str = None, ecc_skip_all_ones:bool = False, ecc_skip_all_zeros:bool = False, pad_count:int = None, pad_byte:int = None, split_count:int = 1, sparse_fill:int = None):
+        self.options = {
+            "convert_format": convert_format,
+            "start_address": start_address,
+            "align_width": align_width,
+            "ecc": ecc,
+            "ecc_skip_all_ones": ecc_skip_all_ones,
+            "ecc_skip_all_zeros": ecc_skip_all_zeros,
+            "pad_count": pad_count,
+            "pad_byte": pad_byte,
+            "split_count": split_count,
+            "sparse_fill": sparse_fill,
+        }
+        kwargs = {}
+
+        # Check the format is supported
+        if convert_format not in format_dict:
+            raise ConversionError(INVALID_FORMAT, f"Error: The format {convert_format} is not supported.")
+        # Prepare the conversion function and arguments
+        convert_function = format_dict[convert_format]["function"]
+        parameters = inspect.signature(convert_function).parameters
+
+        if start_address is not None:
+            if "start_address" in parameters:
+                kwargs["start_address"] = start_address
+            else:
+                raise ConversionError(INVALID_OPTION, f"Error: The format {convert_format} does not support \"address\" option.")
+
+        if align_width is not None:
+            if "align_width" in parameters:
+                kwargs["align_width"] = align_width
+            else:
+                raise ConversionError(INVALID_OPTION, f"Error: The format {convert_format} does not support \"alignment\" option.")
+
+        if ecc_skip_all_ones is True and ecc_skip_all_zeros is True:
+            raise ConversionError(INVALID_OPTION, f"Error: Both ecc-skip-all-ones and ecc-skip-all-zeros are enabled. Only one of them can be enabled at a time.")
+
+        if ecc is not None:
+            if "ecc_encode" in parameters:
+                if ecc_skip_all_ones is True:
+                    kwargs["ecc_skip"] = 0xFF
+                elif ecc_skip_all_zeros is True:
+                    kwargs["ecc_skip"] = 0x00
+                else:
+                    kwargs["ecc_skip"] = None
+                if ecc in ecc_dict:
+                    kwargs["ecc_encode"] = ecc_dict[ecc]["function"]
+                    kwargs["ecc_encode_batch"] = ecc_dict[ecc]["batch_function"]
+                elif os.path.isfile(ecc):
+                    kwargs["ecc_encode"], kwargs["ecc_encode_batch"] = load_ecc_module(ecc)
+                else:
+                    raise ConversionError(INVALID_OPTION, f"Error: The ECC type {ecc} is not supported.")
+
+                if "start_address" in inspect.signature(kwargs["ecc_encode"]).parameters:
+                    if start_address is None:
+                        print(f"Warning: The ECC function in {ecc} requires start address parameter, but no start address is specified. Using default 0x0.")
+                else:
+                    if start_address is not None:
+                        raise ConversionError(INVALID_OPTION, f"Error: The ECC function in {ecc} doesn't support start address parameter.")
+            else:
+                raise ConversionError(INVALID_OPTION, f"Error: The format {convert_format} does not support \"ecc\" option.")
+
+        if ecc_skip_all_ones is True or ecc_skip_all_zeros is True:
+            if ecc is None:
+                raise ConversionError(INVALID_OPTION, f"Error: ecc-skip-all-ones or ecc-skip-all-zeros is enabled, but no ECC type is specified.")
+
+        if pad_count is not None:
+            if "pad_count" in parameters:
+                if pad_count < 0:
+                    raise ConversionError(INVALID_OPTION, f"Error: The pad count {pad_count} is invalid.")
+                kwargs["pad_count"] = pad_count
+            else:
+                raise ConversionError(INVALID_OPTION, f"Error: The format {convert_format} does not support \"padcount\" option.")
+
+        if pad_byte is not None:
+            if pad_count is not None:
+                if "pad_byte" in parameters:
+                    if pad_byte < 0 or pad_byte > 255:
+                        raise ConversionError(INVALID_OPTION, f"Error: The pad byte {pad_byte} is out of range (0-255).")
+                    kwargs["pad_byte"] = pad_byte & 0xFF
+                else:
+                    raise ConversionError(INVALID_OPTION, f"Error: The format {convert_format} does not support \"padbyte\" option.")
+            else:
+                raise ConversionError(INVALID_OPTION, f"Error: The pad byte is specified but pad count is not.")
+
+        if sparse_fill is not None:
+            if "sparse_fill" in parameters:
+                if sparse_fill < 0 or sparse_fill > 255:
+                    raise ConversionError(INVALID_OPTION, f"Error: The sparse fill byte {sparse_fill} is out of range (0-255).")
+                kwargs["sparse_fill"] = sparse_fill
+            else:
+                raise ConversionError(INVALID_OPTION, f"Error: The format {convert_format} does not support \"sparse\" option.")
+
+        if split_count <= 0 or (split_count & (split_count - 1)) != 0:
+            raise ConversionError(INVALID_OPTION, f"Error: The split count {split_count} is not valid. It must be a power of 2 (1, 2, 4, 8, ...).")
+
+        # The lines are dealt to the split files in turn, which would separate the address records from their words
+        if sparse_fill is not None and split_count > 1:
+            raise ConversionError(INVALID_OPTION, f"Error: The sparse option can't be used with the split option.")
+
+        self.convert_format = convert_format
+        self.convert_function = convert_function
+        self.stream_function = format_dict[convert_format]["stream_function"]
+        self.separator = format_dict[convert_format]["separator"]
+        self.split_count = split_count
+        self.kwargs = kwargs
+
+    def convert(self, input_data:bytes) -> str:
+        return self.convert_function(input_data, **self.kwargs)
+
+    def stream(self, input_blocks:Iterable[bytes]) -> Iterator[str]:
+        return self.stream_function(input_blocks, **self.kwargs)
+
+    def stream_file(self, ifile:BinaryIO, jobs:int = 1, stats:ConversionStats = None) -> Iterator[str]:
+        if jobs < 1:
+            raise ConversionError(INVALID_OPTION, f"Error: The job count {jobs} is not valid. It must be 1 at least.")
+        # The worker processes are only used when the input is a regular file which can be split into shards
+        # The sparse output is serial, because its address records depend on the words before them
+        file_stat = os.fstat(ifile.fileno())
+        if jobs > 1 and stat.S_ISREG(file_stat.st_mode) and file_stat.st_size > SHARD_SIZE_MIN and "sparse_fill" not in self.kwargs:
+            if stats is not None:
+                stats.mode = "parallel"
+            return iter_file_parallel(self, ifile, jobs)
+        elif stats is not None:
+            return self.stream_function(stats.time_blocks(read_blocks_mapped(ifile)), **stats.instrument(self.kwargs))
+        else:
+            return self.stream(read_blocks_mapped(ifile))
+
+    def output_files(self, output_file:str) -> List[str]:
+        # The split files are named with suffix "_0", "_1", ...
+        if self.split_count == 1:
+            return [output_file]
+        name, extension = output_file.rsplit('.', 1)
+        return [f"{name}_{i}.{extension}" for i in range(self.split_count)]
+
+    def open_output(self, output_file:str, stack:contextlib.ExitStack, stats:ConversionStats = None):
+        # Open the output files in the stack, and return the writer of the chunks
+        # All the split files are written at once, so the whole output is never held in memory
+        ofiles = []
+        for split_file in self.output_files(output_file):
+            ofile = safe_open(split_file, 'w')
+            if ofile is None:
+                raise ConversionError(FAIL_WRITE_OUTPUT_FILE)
+            if stats is not None:
+                ofile = TimedFile(ofile, stats)
+            ofiles.append(stack.enter_context(ofile))
+        if self.split_count == 1:
+            writer = ChunkWriter(ofiles[0], self.separator)
+        else:
+            writer = SplitChunkWriter(ofiles, self.separator)
+        return TimedWriter(writer, stats) if stats is not None else writer
+
+    def write(self, output_chunks:Iterable[str], output_file:str, stats:ConversionStats = None) -> None:
+        # Write the hex string to the output file
+        with contextlib.ExitStack() as stack:
+            writer = self.open_output(output_file, stack, stats)
+            if stats is not None:
+                output_chunks = stats.time_chunks(output_chunks)
+            for chunk in output_chunks:
+                writer.write(chunk)
+            writer.close()
+
+    def convert_file(self, input_file:str, output_file:str, jobs:int = 1, stats:bool = False) -> Optional[dict]:
+        # The statistics of the conversion are returned if stats is True
+        ifile = safe_open(input_file, 'rb')
+        if ifile is None:
+            raise ConversionError(INVALID_INPUT_FILE)
+        with ifile:
+            conversion_stats = ConversionStats(ifile) if stats else None
+            self.write(self.stream_file(ifile, jobs, conversion_stats), output_file, conversion_stats)
+        return conversion_stats.finish(self, output_file) if stats else None
@@ -0,0 +1,74 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import importlib
+
+from collections.abc import Mapping
+
+class LazyRegistry(Mapping):
+    # The names of the registry are known without importing anything, the module of a name is imported at its first use,
+    # so a conversion imports the converters of its own format only
+    def __init__(self, modules:dict):
+        # modules maps the module name to the name of its dict and the keys of the dict, in the order of the help
+        self.names = {}
+        for module_name, (dict_name, names) in modules.items():
+            for name in names:
+                self.names[name] = (module_name, dict_name)
+
+    def __getitem__(self, name:str) -> dict:
+        module_name, dict_name = self.names[name]
+        return getattr(importlib.import_module(module_name), dict_name)[name]
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name) -> bool:
+        return name in self.names
+
+format_modules = {
+    "bin2hex.bin2c": ("bin2c_dict", ["c_uint8", "c_uint16", "c_uint32", "c_uint64"]),
+    # "bin2hex.bin2ihex": ("bin2ihex_dict", []),
+    "bin2hex.bin2model": ("bin2model_dict", ["denali", "denali_dw2", "denali_dw4", "denali_dw8", "denali_dw16"]),
+    # "bin2hex.bin2srec": ("bin2srec_dict", []),
+    "bin2hex.bin2verilog": ("bin2verilog_dict", [
+        "vhex_dw1", "vhex_dw2", "vhex_dw4", "vhex_dw8", "vhex_dw16",
+        "verilog_dw1", "verilog_dw2", "verilog_dw4", "verilog_dw8", "verilog_dw16",
+        "vhex_addr_dw1", "vhex_addr_dw2", "vhex_addr_dw4", "vhex_addr_dw8", "vhex_addr_dw16",
+        "verilog_addr_dw1", "verilog_addr_dw2", "verilog_addr_dw4", "verilog_addr_dw8", "verilog_addr_dw16",
+        "vbin_dw1", "vbin_dw2", "vbin_dw4", "vbin_dw8", "vbin_dw16",
+    ]),
+}
+
+ecc_modules = {
+    "bin2hex.ecc": ("ecc_dict", ["none", "arm_secded", "xxxx.py"]),
+}
+
+# The lines of the formats with "fixed_line" have the same length, except the last line,
+# so the line of any input word can be found in the output by its offset
+format_dict = LazyRegistry(format_modules)
+
+ecc_dict = LazyRegistry(ecc_modules)
+
+default_format = "vhex_dw1"
+
+def warm_up() -> None:
+    # Import all the converters and ECC algorithms, and build the tables of the engines,
+    # so the worker processes of a server or a pool start every conversion with them ready
+    from bin2hex.engine import engine_list, load_numpy
+    from bin2hex.ecc import ARM_SECDED_BATCH_TABLE, ecc_encode_arm_secded_batch
+    for _ in format_dict.values():
+        pass
+    for _ in ecc_dict.values():
+        pass
+    if "numpy" in engine_list:
+        load_numpy()
+    for engine in engine_list:
+        for data_width in ARM_SECDED_BATCH_TABLE:
+            ecc_encode_arm_secded_batch(bytes(data_width), data_width, engine)
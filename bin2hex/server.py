@@ -0,0 +1,251 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import io
+import os
+import json
+import time
+import signal
+import socket
+import threading
+import contextlib
+import socketserver
+
+from collections import deque
+from typing import List
+
+from bin2hex.error import *
+from bin2hex.registry import warm_up
+
+# The command line tool forwards its conversions to the server on this socket if the variable is set
+SERVER_ENV = "BIN2HEX_SERVER"
+
+# The latencies of this count of the last requests are kept for the statistics
+SERVER_LATENCY_COUNT = 1000
+
+# The options which are handled by the command line tool itself, and are not forwarded to the server
+server_options = ["--serve", "--client", "--server-stats"]
+
+# The barrier of the start tasks, which is given to every worker when it is started
+start_barrier = None
+
+def init_worker(barrier) -> None:
+    global start_barrier
+    start_barrier = barrier
+
+def start_worker(index:int) -> int:
+    # A start task waits until all the start tasks are running, so a worker can't take a second one
+    # and every worker of the pool is started
+    start_barrier.wait()
+    return os.getpid()
+
+def run_request(argv:List[str], cwd:str) -> tuple:
+    # Run the command line tool in a worker process, and return its return code, its messages and its start time
+    # A worker runs one request at a time, so it can change to the directory of the client
+    from bin2hex.main import main
+    start_time = time.time()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+            os.chdir(cwd)
+            # The requests are already run by the workers in parallel, so a request runs in its worker unless -j is given
+            code = main(argv, jobs_default = 1)
+        except SystemExit as e:
+            # The argument errors and the help exit from argparse
+            code = e.code if isinstance(e.code, int) else GENERAL_FAIL
+        except Exception as e:
+            print(f"Error: {e}")
+            code = GENERAL_FAIL
+    return code, output.getvalue(), start_time
+
+def summarize(values:List[float]) -> dict:
+    if len(values) == 0:
+        return {"mean": None, "p50": None, "p95": None, "max": None}
+    values = sorted(values)
+    return {
+        "mean": sum(values) / len(values),
+        "p50": values[len(values) // 2],
+        "p95": values[min(len(values) - 1, len(values) * 95 // 100)],
+        "max": values[-1],
+    }
+
+class ServerStats:
+    # The counts of the requests and the latencies of the last requests, which are updated by the request threads
+    def __init__(self, workers:int):
+        self.lock = threading.Lock()
+        self.workers = workers
+        self.start_time = time.time()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.latencies = deque(maxlen = SERVER_LATENCY_COUNT)
+        self.queue_waits = deque(maxlen = SERVER_LATENCY_COUNT)
+
+    def submit(self) -> None:
+        with self.lock:
+            self.in_flight += 1
+
+    def finish(self, submit_time:float, start_time:float, code:int) -> None:
+        end_time = time.time()
+        with self.lock:
+            self.in_flight -= 1
+            self.completed += 1
+            if code != SUCCESS:
+                self.failed += 1
+            self.latencies.append(end_time - submit_time)
+            self.queue_waits.append(max(start_time - submit_time, 0.0))
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "uptime": time.time() - self.start_time,
+                "workers": self.workers,
+                "in_flight": self.in_flight,
+                # The requests beyond the count of workers wait in the queue of the pool
+                "queue_depth": max(self.in_flight - self.workers, 0),
+                "completed": self.completed,
+                "failed": self.failed,
+                "latency": summarize(list(self.latencies)),
+                "queue_wait": summarize(list(self.queue_waits)),
+            }
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    # A request is a line of JSON, and so is its response
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+            command = request.get("command", "convert")
+        except (ValueError, AttributeError):
+            self.respond({"code": INVALID_OPTION, "output": "Error: The request is not valid.\n"})
+            return
+        if command == "ping":
+            self.respond({"code": SUCCESS})
+        elif command == "stats":
+            self.respond({"code": SUCCESS, "stats": self.server.stats.snapshot()})
+        elif command == "convert":
+            argv = request.get("args", [])
+            if not isinstance(argv, list) or any(not isinstance(arg, str) or arg.split("=")[0] in server_options for arg in argv):
+                self.respond({"code": INVALID_OPTION, "output": "Error: The arguments of the request are not valid.\n"})
+                return
+            self.respond(self.server.convert(argv, request.get("cwd", os.getcwd())))
+        else:
+            self.respond({"code": INVALID_OPTION, "output": f"Error: The command {command} is not supported.\n"})
+
+    def respond(self, response:dict) -> None:
+        with contextlib.suppress(OSError):
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+class ConversionServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    # Every connection is served by a thread, which waits for its request to be converted by the worker processes
+    daemon_threads = True
+
+    def __init__(self, socket_path:str, executor:"ProcessPoolExecutor", workers:int):
+        self.executor = executor
+        self.stats = ServerStats(workers)
+        super().__init__(socket_path, RequestHandler)
+
+    def convert(self, argv:List[str], cwd:str) -> dict:
+        submit_time = time.time()
+        self.stats.submit()
+        code, output, start_time = GENERAL_FAIL, "", submit_time
+        try:
+            code, output, start_time = self.executor.submit(run_request, argv, cwd).result()
+        except Exception as e:
+            output = f"Error: The server failed to convert the request. {e}\n"
+        finally:
+            self.stats.finish(submit_time, start_time, code)
+        return {"code": code, "output": output}
+
+def request_server(socket_path:str, request:dict) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError(f"The server {socket_path} closed the connection.")
+    return json.loads(line)
+
+def strip_server_options(argv:List[str]) -> List[str]:
+    # The arguments forwarded to the server, without the options of the client
+    forward_argv = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg in ["--client", "--serve"]:
+            skip = True
+        elif arg.split("=")[0] not in server_options:
+            forward_argv.append(arg)
+    return forward_argv
+
+def forward_request(socket_path:str, argv:List[str]) -> int:
+    # Convert by the server, the messages of the conversion are printed as if it was converted here
+    response = request_server(socket_path, {"command": "convert", "args": strip_server_options(argv), "cwd": os.getcwd()})
+    print(response.get("output", ""), end = "")
+    return response.get("code", GENERAL_FAIL)
+
+def server_stats(socket_path:str) -> int:
+    try:
+        response = request_server(socket_path, {"command": "stats"})
+    except (OSError, ValueError):
+        print(f"Error: The server {socket_path} can't be connected.")
+        return GENERAL_FAIL
+    print(json.dumps(response["stats"], indent = 2))
+    return SUCCESS
+
+def stop_server(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+def serve(socket_path:str, workers:int) -> int:
+    # Serve the conversions on the Unix domain socket until the server is interrupted or terminated
+    if not hasattr(socket, "AF_UNIX"):
+        print(f"Error: The server requires Unix domain sockets, which are not supported by this system.")
+        return INVALID_OPTION
+    if os.path.exists(socket_path):
+        # The socket of a stopped server is replaced, but not the socket of a running server
+        try:
+            request_server(socket_path, {"command": "ping"})
+            print(f"Error: A server is already running on {socket_path}.")
+            return INVALID_OPTION
+        except (OSError, ValueError):
+            os.remove(socket_path)
+
+    # The workers convert the requests by themselves, instead of forwarding them to a server again
+    os.environ.pop(SERVER_ENV, None)
+    # The process pool is imported here, since the command line tool imports this module for SERVER_ENV on every run
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    warm_up()
+    # All the workers are started before any thread of the server, so they are forked from a single thread
+    executor = ProcessPoolExecutor(workers, initializer = init_worker, initargs = (multiprocessing.Barrier(workers),))
+    list(executor.map(start_worker, range(workers)))
+    # Only the user of the server can connect to it, the socket is created with this permission,
+    # so no other user can connect between binding it and changing its permission
+    umask = os.umask(0o077)
+    try:
+        server = ConversionServer(socket_path, executor, workers)
+    except OSError as e:
+        executor.shutdown()
+        print(f"Error: The server can't listen on {socket_path}. {e}")
+        return INVALID_OPTION
+    finally:
+        os.umask(umask)
+    signal.signal(signal.SIGTERM, stop_server)
+    print(f"Serving on {socket_path} with {workers} workers.", flush = True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        executor.shutdown()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(socket_path)
+        stats = server.stats.snapshot()
+        print(f"The server is stopped. {stats['completed']} requests are converted, {stats['failed']} of them failed.")
+    return SUCCESS
@@ -0,0 +1,203 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import os
+import sys
+import stat
+import time
+import functools
+
+from typing import BinaryIO, Iterable, Iterator, Optional, TextIO
+
+from bin2hex import __version__
+from bin2hex.registry import format_dict
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# The phases of a conversion, in the order the data goes through them, with their names in the report
+STATS_PHASES = ["read", "ecc", "format", "split", "write"]
+stats_phase_names = {"read": "Read", "ecc": "ECC", "format": "Format", "split": "Split", "write": "Write"}
+
+def peak_rss(children:bool = False) -> Optional[int]:
+    # The peak resident memory in KB of this process, or of the largest worker process which has exited
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+class TimedFile:
+    # The output file which counts the time of writing and closing it
+    def __init__(self, ofile:TextIO, stats:"ConversionStats"):
+        self.ofile = ofile
+        self.stats = stats
+
+    def write(self, text:str) -> int:
+        start_time = time.perf_counter()
+        count = self.ofile.write(text)
+        self.stats.file_time += time.perf_counter() - start_time
+        return count
+
+    def __enter__(self):
+        self.ofile.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        # The buffered lines are written to the disk when the file is closed
+        start_time = time.perf_counter()
+        try:
+            return self.ofile.__exit__(*exc_info)
+        finally:
+            self.stats.close_time += time.perf_counter() - start_time
+
+class TimedWriter:
+    # The chunk writer which counts the time of dealing the lines to the output files
+    def __init__(self, writer, stats:"ConversionStats"):
+        self.writer = writer
+        self.stats = stats
+
+    def write(self, chunk:str) -> None:
+        start_time = time.perf_counter()
+        self.writer.write(chunk)
+        self.stats.writer_time += time.perf_counter() - start_time
+
+    def close(self) -> None:
+        start_time = time.perf_counter()
+        self.writer.close()
+        self.stats.writer_time += time.perf_counter() - start_time
+
+class ConversionStats:
+    # The time of every phase of a conversion and the count of the data through them
+    # The phases are measured by wrapping the input blocks, the ECC functions, the output chunks and the output files,
+    # so the conversion functions are not changed and nothing is counted when no statistics are asked for
+    def __init__(self, ifile:BinaryIO = None):
+        self.start_time = time.perf_counter()
+        # "convert" is the serial conversion, others are "parallel", "cache" for a cache hit, and "patch" for an incremental patch
+        self.mode = "convert"
+        self.read_time = 0.0
+        self.read_bytes = 0
+        self.ecc_time = 0.0
+        self.ecc_words = None
+        self.chunk_time = 0.0
+        self.writer_time = 0.0
+        self.file_time = 0.0
+        self.close_time = 0.0
+        self.input_size = None
+        if ifile is not None:
+            file_stat = os.fstat(ifile.fileno())
+            if stat.S_ISREG(file_stat.st_mode):
+                self.input_size = file_stat.st_size
+        # The counters of the cache directory, when the conversion is done by a cache
+        self.cache = None
+        self.result = None
+
+    def time_blocks(self, input_blocks:Iterable[bytes]) -> Iterator[bytes]:
+        input_blocks = iter(input_blocks)
+        while True:
+            start_time = time.perf_counter()
+            block = next(input_blocks, None)
+            self.read_time += time.perf_counter() - start_time
+            if block is None:
+                return
+            self.read_bytes += len(block)
+            yield block
+
+    def time_chunks(self, output_chunks:Iterable[str]) -> Iterator[str]:
+        # The time of producing the chunks includes reading the input and encoding the ECC
+        output_chunks = iter(output_chunks)
+        while True:
+            start_time = time.perf_counter()
+            chunk = next(output_chunks, None)
+            self.chunk_time += time.perf_counter() - start_time
+            if chunk is None:
+                return
+            yield chunk
+
+    def time_ecc(self, ecc_function:callable, batch:bool) -> callable:
+        # The wrapper keeps the signature of the ECC function, which tells the encoder whether it takes the address
+        @functools.wraps(ecc_function)
+        def timed_ecc(data, data_width, *args, **kwargs):
+            start_time = time.perf_counter()
+            ecc_data = ecc_function(data, data_width, *args, **kwargs)
+            self.ecc_time += time.perf_counter() - start_time
+            self.ecc_words += len(data) // data_width if batch else 1
+            return ecc_data
+        # The encoder calls the untimed function for the words which are not in the input
+        timed_ecc.untimed = ecc_function
+        return timed_ecc
+
+    def instrument(self, kwargs:dict) -> dict:
+        # The arguments of the conversion function with the ECC functions timed
+        kwargs = dict(kwargs)
+        if kwargs.get("ecc_encode") is not None:
+            self.ecc_words = 0
+            kwargs["ecc_encode"] = self.time_ecc(kwargs["ecc_encode"], False)
+            if kwargs.get("ecc_encode_batch") is not None:
+                kwargs["ecc_encode_batch"] = self.time_ecc(kwargs["ecc_encode_batch"], True)
+        return kwargs
+
+    def finish(self, plan, output_file:str) -> dict:
+        wall_time = time.perf_counter() - self.start_time
+        phases = dict.fromkeys(STATS_PHASES)
+        if self.mode in ["convert", "parallel"]:
+            if self.mode == "convert":
+                phases["read"] = self.read_time
+                phases["ecc"] = self.ecc_time
+            # The workers read the input and encode the ECC, which are counted in the format phase
+            phases["format"] = max(self.chunk_time - self.read_time - self.ecc_time, 0.0)
+            # Without the split the time of the writer is not a phase of its own, and it is left to the other time
+            if plan.split_count > 1:
+                phases["split"] = max(self.writer_time - self.file_time, 0.0)
+            phases["write"] = self.file_time + self.close_time
+        input_bytes = self.read_bytes if self.mode == "convert" else (self.input_size or 0)
+        output_bytes = sum(os.path.getsize(split_file) for split_file in plan.output_files(output_file) if os.path.isfile(split_file))
+        words = -(-input_bytes // format_dict[plan.convert_format]["data_width"])
+        # The ECC of the long erased runs is not encoded, but the ECC counts are only known to the serial conversion
+        ecc_words = self.ecc_words if self.mode == "convert" else None
+        rss = [value for value in [peak_rss(), peak_rss(True)] if value is not None]
+        self.result = {
+            "version": __version__,
+            "format": plan.convert_format,
+            "output": output_file,
+            "mode": self.mode,
+            "phases": phases,
+            "other": max(wall_time - sum(value for value in phases.values() if value is not None), 0.0),
+            "wall_time": wall_time,
+            "input_bytes": input_bytes,
+            "output_bytes": output_bytes,
+            "words": words,
+            "ecc_words": ecc_words,
+            "ecc_skipped_words": max(words - ecc_words, 0) if ecc_words is not None else None,
+            "pad_bytes": plan.kwargs.get("pad_count", 0) * words,
+            "mb_per_s": input_bytes / wall_time / 1e6 if wall_time > 0 else 0.0,
+            "words_per_s": words / wall_time if wall_time > 0 else 0.0,
+            "peak_rss_kb": max(rss) if rss else None,
+            "cache": self.cache,
+        }
+        return self.result
+
+    def report(self) -> None:
+        result = self.result
+        print(f"Statistics of {result['output']} ({result['mode']}):")
+        for phase in STATS_PHASES:
+            value = result["phases"][phase]
+            print(f"  {stats_phase_names[phase]:<8}" + (f"{value:.3f}s" if value is not None else "-"))
+        print(f"  {'Other':<8}{result['other']:.3f}s")
+        print(f"  {'Total':<8}{result['wall_time']:.3f}s")
+        print(f"  Input: {result['input_bytes']} bytes, {result['words']} words. Output: {result['output_bytes']} bytes.")
+        if result["ecc_words"] is not None:
+            print(f"  ECC encoded: {result['ecc_words']} words, skipped: {result['ecc_skipped_words']} words.")
+        if result["pad_bytes"]:
+            print(f"  Padded: {result['pad_bytes']} bytes.")
+        print(f"  Throughput: {result['mb_per_s']:.2f} MB/s, {result['words_per_s']:.0f} words/s.")
+        if result["peak_rss_kb"] is not None:
+            print(f"  Peak RSS: {result['peak_rss_kb']} KB.")
+        if result["cache"] is not None:
+            cache = result["cache"]
+            print(f"  Cache: {cache['hits']} hits, {cache['misses']} misses, {cache['entries']} entries, {cache['size']} bytes.")
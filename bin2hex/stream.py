@@ -0,0 +1,161 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import io
+import os
+import mmap
+import stat
+
+from typing import BinaryIO, Iterable, Iterator, List, Optional, TextIO
+
+# The byte count read from the input file per conversion block
+# It is a multiple of all the supported data widths, so the blocks are word-aligned in the common case
+BLOCK_SIZE = 0x10000
+
+def safe_open(file:str, mode: str = 'r') -> Optional[BinaryIO]:
+    try:
+        if file is None:
+            print(f"Error: No file specified.")
+            return None
+        if 'b' in mode:
+            return open(file, mode)
+        else:
+            # With newline='', no conversion between CRLF and LF is performed automatically
+            return open(file, mode, newline='')
+    except FileNotFoundError:
+        print(f"Error: {file} doesn't exist.")
+    except PermissionError:
+        print(f"Error: Permission denied for {file}")
+    except IsADirectoryError:
+        print(f"Error: {file} is a directory, not a file")
+    except OSError as e:
+        print(f"Error: Failed to open {file}.")
+    except Exception as e:
+        print(f"Error: An unexpected error occurred: {e}")
+    return None
+
+def read_blocks(ifile:BinaryIO, block_size:int = BLOCK_SIZE) -> Iterator[bytes]:
+    while True:
+        block = ifile.read(block_size)
+        if not block:
+            break
+        yield block
+
+def map_file(ifile:BinaryIO) -> Optional[memoryview]:
+    # Map the whole input file to memory, the pages are read by the OS on demand and shared by all the processes
+    # None is returned if the file can't be mapped, such as an empty file or a pipe
+    try:
+        file_stat = os.fstat(ifile.fileno())
+        if not stat.S_ISREG(file_stat.st_mode) or file_stat.st_size == 0:
+            return None
+        mapped_file = mmap.mmap(ifile.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, io.UnsupportedOperation):
+        return None
+    # The file is read from the beginning to the end
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+        mapped_file.madvise(mmap.MADV_SEQUENTIAL)
+    # The mapping is closed when the last view of it is released
+    return memoryview(mapped_file)
+
+def read_blocks_mapped(ifile:BinaryIO, block_size:int = BLOCK_SIZE) -> Iterator[bytes]:
+    # The blocks are zero-copy views of the mapped file, the file is read block by block if it can't be mapped
+    input_data = map_file(ifile)
+    if input_data is None:
+        yield from read_blocks(ifile, block_size)
+        return
+    for offset in range(0, len(input_data), block_size):
+        yield input_data[offset : offset + block_size]
+
+def align_blocks(input_blocks:Iterable[bytes], unit:int) -> Iterator[bytes]:
+    # Regroup the input blocks so that every block is a multiple of unit bytes
+    # Only the last block might be shorter, which is left to the converter to pad
+    remain = b""
+    for block in input_blocks:
+        if len(remain) != 0:
+            block = remain + block
+        cut = len(block) - len(block) % unit
+        if cut == len(block):
+            remain = b""
+            yield block
+        else:
+            # The remain is copied, a view of the input can't be concatenated to the next block
+            remain = bytes(block[cut:])
+            if cut != 0:
+                yield block[:cut]
+    if len(remain) != 0:
+        yield remain
+
+def join_chunks(output_chunks:Iterable[str], separator:str) -> str:
+    return separator.join(chunk for chunk in output_chunks if chunk)
+
+class ChunkWriter:
+    # Write the chunks to the output file as they are produced, the chunks are joined by the separator
+    def __init__(self, ofile:TextIO, separator:str):
+        self.ofile = ofile
+        self.separator = separator
+        self.first = True
+
+    def write(self, chunk:str) -> None:
+        # Empty chunks carry no lines, so they must not introduce an empty line
+        if not chunk:
+            return
+        if not self.first:
+            self.ofile.write(self.separator)
+        self.ofile.write(chunk)
+        self.first = False
+
+    def close(self) -> None:
+        pass
+
+class SplitChunkWriter:
+    # Distribute the lines of the output to the files round-robin as the chunks are produced
+    # The lines in a file are joined by newlines, so there is no trailing newline at the end of a file
+    def __init__(self, ofiles:List[TextIO], separator:str):
+        self.ofiles = ofiles
+        self.separator = separator
+        self.started = [False] * len(ofiles)
+        self.index = 0
+        self.partial = ""
+        self.first = True
+
+    def write(self, chunk:str) -> None:
+        if not chunk:
+            return
+        if not self.first:
+            chunk = self.separator + chunk
+        self.first = False
+        split_count = len(self.ofiles)
+        # The last line of a chunk might be continued by the next chunk
+        lines = (self.partial + chunk).split("\n")
+        self.partial = lines.pop()
+        for i in range(split_count):
+            file_lines = lines[(i - self.index) % split_count :: split_count]
+            if file_lines:
+                if self.started[i]:
+                    self.ofiles[i].write("\n")
+                self.ofiles[i].write("\n".join(file_lines))
+                self.started[i] = True
+        self.index = (self.index + len(lines)) % split_count
+
+    def close(self) -> None:
+        if self.partial:
+            if self.started[self.index]:
+                self.ofiles[self.index].write("\n")
+            self.ofiles[self.index].write(self.partial)
+            self.partial = ""
+
+def write_chunks(ofile:TextIO, output_chunks:Iterable[str], separator:str) -> None:
+    writer = ChunkWriter(ofile, separator)
+    for chunk in output_chunks:
+        writer.write(chunk)
+    writer.close()
+
+def write_split_chunks(ofiles:List[TextIO], output_chunks:Iterable[str], separator:str) -> None:
+    writer = SplitChunkWriter(ofiles, separator)
+    for chunk in output_chunks:
+        writer.write(chunk)
+    writer.close()
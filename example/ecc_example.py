@@ -5,3 +5,11 @@ def ecc_encode(data: bytes, data_width: int) -> bytes:
     ecc_bytes = bytearray(0)
 
     return data + ecc_bytes
+
+def ecc_encode_batch(buffer: memoryview, data_width: int) -> bytes:
+    #
+    # Add ECC algorithm here, for all the words in buffer
+    #
+    ecc_bytes = bytearray(0)
+
+    return ecc_bytes
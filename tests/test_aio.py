@@ -0,0 +1,99 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import asyncio
+import random
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from bin2hex import aio
+from bin2hex.error import *
+from bin2hex.plan import ConversionPlan
+
+# The input is converted by 3 ranges, the last one is not aligned to the data width
+test_binary = random.Random(24).randbytes(2 * aio.AIO_RANGE_SIZE + 0x1003)
+
+class ListSink:
+    def __init__(self):
+        self.chunks = []
+
+    async def write(self, text:str) -> None:
+        self.chunks.append(text)
+
+class BlockedSink:
+    # The first write never returns, until the conversion is cancelled
+    def __init__(self):
+        self.started = asyncio.Event()
+
+    async def write(self, text:str) -> None:
+        self.started.set()
+        await asyncio.Event().wait()
+
+def test_aio_convert(tmp_path):
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary)
+    cases = [
+        ("vhex_dw4", {"ecc": "arm_secded", "pad_count": 1}),
+        ("c_uint32", {"split_count": 4}),
+        ("vhex_dw8", {"sparse_fill": 0xFF}),
+    ]
+
+    async def convert_all(executor):
+        # The conversions run at the same time on the executor
+        await asyncio.gather(*[aio.convert(str(input_file), str(tmp_path / f"output_{i}.txt"), convert_format, executor, **options) for i, (convert_format, options) in enumerate(cases)])
+
+    for executor in [None, ProcessPoolExecutor(2)]:
+        asyncio.run(convert_all(executor))
+        for i, (convert_format, options) in enumerate(cases):
+            plan = ConversionPlan(convert_format, **options)
+            plan.convert_file(str(input_file), str(tmp_path / f"expect_{i}.txt"))
+            for output_file in plan.output_files(f"output_{i}.txt"):
+                assert((tmp_path / output_file).read_text() == (tmp_path / output_file.replace("output", "expect")).read_text())
+        if executor is not None:
+            executor.shutdown()
+
+def test_aio_sink(tmp_path):
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary)
+    sink = ListSink()
+    asyncio.run(aio.convert(str(input_file), convert_format = "vbin_dw4", sink = sink))
+    assert(len(sink.chunks) == 3 and "".join(sink.chunks) == ConversionPlan("vbin_dw4").convert(test_binary))
+    # The sparse output is streamed block by block too
+    sink = ListSink()
+    sparse_binary = test_binary[:0x10000] + b"\xFF" * 0x20000 + test_binary[0x30000:]
+    input_file.write_bytes(sparse_binary)
+    asyncio.run(aio.convert(str(input_file), convert_format = "vhex_dw4", sink = sink, sparse_fill = 0xFF))
+    assert(len(sink.chunks) > 3 and "".join(sink.chunks) == ConversionPlan("vhex_dw4", sparse_fill = 0xFF).convert(sparse_binary))
+    with pytest.raises(ConversionError) as e:
+        asyncio.run(aio.convert(str(input_file), str(tmp_path / "output.hex"), sink = sink))
+    assert(e.value.code == INVALID_OPTION)
+    with pytest.raises(ConversionError) as e:
+        asyncio.run(aio.convert(str(tmp_path / "missing.bin"), str(tmp_path / "output.hex")))
+    assert(e.value.code == INVALID_INPUT_FILE)
+
+def test_aio_cancel(tmp_path):
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary)
+
+    async def cancel_sink():
+        sink = BlockedSink()
+        task = asyncio.ensure_future(aio.convert(str(input_file), sink = sink))
+        await sink.started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    asyncio.run(cancel_sink())
+
+    # The output files of a cancelled conversion are removed
+    async def cancel_file():
+        task = asyncio.ensure_future(aio.convert(str(input_file), str(tmp_path / "output.h"), "c_uint8", split_count = 2))
+        while not (tmp_path / "output_1.h").exists():
+            await asyncio.sleep(0.001)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    asyncio.run(cancel_file())
+    assert(not (tmp_path / "output_0.h").exists() and not (tmp_path / "output_1.h").exists())
@@ -0,0 +1,151 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import json
+import random
+import pytest
+import bin2hex.batch as batch
+from bin2hex.error import *
+from bin2hex.plan import ConversionPlan
+
+test_binary = random.Random(19).randbytes(0x2000 + 4)
+
+def write_inputs(tmp_path):
+    (tmp_path / "small.bin").write_bytes(test_binary[:0x100])
+    (tmp_path / "large.bin").write_bytes(test_binary)
+
+test_manifest = {
+    "defaults": {"ecc": "arm_secded", "pad-count": 1},
+    "jobs": [
+        {"name": "rom", "input": "small.bin", "format": "vhex_dw4", "output": "rom.vhx"},
+        {"input": "large.bin", "format": ["vhex_dw8", "c_uint32"], "output": ["flash.vhx", "flash.h"], "ecc_skip_all_ones": True},
+        {"input": "large.bin", "format": "denali", "output": "sram.txt", "ecc": None, "pad-count": None, "split": 2},
+        {"input": "large.bin", "format": "vhex_addr_dw4", "output": "sram.vhx", "ecc": None, "pad-count": None, "address": "0x1000"},
+    ],
+}
+
+def check_outputs(tmp_path):
+    assert((tmp_path / "rom.vhx").read_text() == ConversionPlan("vhex_dw4", ecc = "arm_secded", pad_count = 1).convert(test_binary[:0x100]))
+    assert((tmp_path / "flash.vhx").read_text() == ConversionPlan("vhex_dw8", ecc = "arm_secded", ecc_skip_all_ones = True, pad_count = 1).convert(test_binary))
+    assert((tmp_path / "flash.h").read_text() == ConversionPlan("c_uint32").convert(test_binary))
+    assert((tmp_path / "sram_0.txt").exists() and (tmp_path / "sram_1.txt").exists())
+    assert((tmp_path / "sram.vhx").read_text() == ConversionPlan("vhex_addr_dw4", start_address = 0x1000).convert(test_binary))
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch_json(tmp_path, workers):
+    write_inputs(tmp_path)
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text(json.dumps(test_manifest))
+    assert(batch.run_batch(str(manifest_file), workers) == SUCCESS)
+    check_outputs(tmp_path)
+
+def test_run_batch_toml(tmp_path):
+    pytest.importorskip("tomllib")
+    write_inputs(tmp_path)
+    manifest_file = tmp_path / "manifest.toml"
+    manifest_file.write_text(
+        "[defaults]\n"
+        "ecc = \"arm_secded\"\n"
+        "pad-count = 1\n"
+        "[[jobs]]\n"
+        "name = \"rom\"\n"
+        "input = \"small.bin\"\n"
+        "format = \"vhex_dw4\"\n"
+        "output = \"rom.vhx\"\n"
+    )
+    assert(batch.run_batch(str(manifest_file)) == SUCCESS)
+    assert((tmp_path / "rom.vhx").read_text() == ConversionPlan("vhex_dw4", ecc = "arm_secded", pad_count = 1).convert(test_binary[:0x100]))
+
+def test_load_manifest_error(tmp_path, capsys):
+    write_inputs(tmp_path)
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text(json.dumps({"jobs": [
+        {"input": "small.bin", "format": "vhex_dw3", "output": "a.vhx"},
+        {"input": "missing.bin", "output": "b.vhx"},
+        {"input": "small.bin", "output": "c.vhx", "ecc": "arm_secded", "address": 0x100},
+        {"input": "small.bin", "output": "c.vhx", "unknown": 1},
+        {"input": "small.bin", "output": "d.vhx"},
+    ]}))
+    # All the jobs are validated before any of them is converted
+    with pytest.raises(ConversionError) as e:
+        batch.load_manifest(str(manifest_file))
+    assert(e.value.code == INVALID_FORMAT)
+    assert(len([line for line in capsys.readouterr().out.splitlines() if line.startswith("Job ")]) == 4)
+    assert(batch.run_batch(str(manifest_file)) == INVALID_FORMAT)
+    assert(not (tmp_path / "d.vhx").exists())
+
+# The defaults and the jobs which are not tables are reported as invalid jobs
+@pytest.mark.parametrize("manifest, error_count", [
+    ({"jobs": ["small.bin", {"input": "small.bin", "output": "a.vhx"}]}, 1),
+    ({"defaults": [1], "jobs": [{"input": "small.bin", "output": "a.vhx"}, {"input": "small.bin", "output": "b.vhx"}]}, 2),
+])
+def test_load_manifest_not_table(tmp_path, capsys, manifest, error_count):
+    write_inputs(tmp_path)
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text(json.dumps(manifest))
+    with pytest.raises(ConversionError) as e:
+        batch.load_manifest(str(manifest_file))
+    assert(e.value.code == INVALID_INPUT_FILE)
+    assert(len([line for line in capsys.readouterr().out.splitlines() if line.startswith("Job ")]) == error_count)
+
+def test_run_batch_failed_job(tmp_path):
+    write_inputs(tmp_path)
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text(json.dumps({"jobs": [
+        {"input": "small.bin", "output": "missing/a.vhx"},
+        {"input": "small.bin", "output": "b.vhx"},
+    ]}))
+    # The other jobs are still converted
+    assert(batch.run_batch(str(manifest_file)) == FAIL_WRITE_OUTPUT_FILE)
+    assert((tmp_path / "b.vhx").read_text() == ConversionPlan().convert(test_binary[:0x100]))
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_convert_many(tmp_path, workers):
+    write_inputs(tmp_path)
+    jobs = [
+        {"input": test_binary[:0x100], "convert_format": "vhex_dw4", "ecc": "arm_secded"},
+        {"input": str(tmp_path / "large.bin"), "output": str(tmp_path / "flash.h"), "convert_format": "c_uint32", "split_count": 2},
+        {"input": str(tmp_path / "missing.bin"), "convert_format": "vhex_dw4"},
+        {"input": str(tmp_path / "small.bin"), "convert_format": "bad"},
+        {"input": str(tmp_path / "small.bin"), "convert_format": "vbin_dw8", "bad_option": 1},
+    ] + [{"input": test_binary[i : i + 0x40], "convert_format": "vhex_addr_dw4", "start_address": i} for i in range(0, 0x2000, 0x40)]
+    results = batch.convert_many(jobs, max_workers = workers)
+    # A failed job doesn't stop the others, and the results are in the order of the jobs
+    assert([result["code"] for result in results[:5]] == [SUCCESS, SUCCESS, INVALID_INPUT_FILE, INVALID_FORMAT, INVALID_OPTION])
+    assert(results[0]["text"] == ConversionPlan("vhex_dw4", ecc = "arm_secded").convert(test_binary[:0x100]))
+    assert(results[1]["text"] is None and (tmp_path / "flash_1.h").exists())
+    assert("missing.bin doesn't exist" in results[2]["messages"])
+    for i, result in enumerate(results[5:]):
+        assert(result["text"] == ConversionPlan("vhex_addr_dw4", start_address = i * 0x40).convert(test_binary[i * 0x40 : i * 0x40 + 0x40]))
+    if workers > 1:
+        # The workers are kept for the next call
+        executor = batch._many_executor
+        assert(batch.convert_many(jobs[:2], max_workers = workers)[0]["text"] == results[0]["text"])
+        assert(batch._many_executor is executor)
+        batch.shutdown_many()
+
+def test_convert_many_views(monkeypatch):
+    # The views of the data and the jobs which can't be sent to the workers don't fail the other jobs of their batch
+    monkeypatch.setattr(batch, "many_batches", lambda jobs, workers: [jobs])
+    jobs = [
+        {"input": test_binary[:0x40], "convert_format": "vhex_dw4"},
+        {"input": memoryview(test_binary)[0x40:0x80], "convert_format": "vhex_dw4"},
+        {"input": bytearray(test_binary[0x80:0xC0]), "convert_format": "vhex_dw4"},
+        {"input": test_binary[0xC0:0x100], "convert_format": "vhex_dw4", "ecc": lambda data, data_width: b""},
+        {"input": memoryview(test_binary)[0x100:0x140], "convert_format": "vhex_dw4"},
+    ]
+    results = batch.convert_many(jobs, max_workers = 2)
+    batch.shutdown_many()
+    assert([result["code"] == SUCCESS for result in results] == [True, True, True, False, True])
+    for i in [0, 1, 2, 4]:
+        assert(results[i]["text"] == ConversionPlan("vhex_dw4").convert(test_binary[i * 0x40 : i * 0x40 + 0x40]))
+
+def test_many_batches():
+    jobs = [{"input": bytes(0x100)} for _ in range(64)]
+    batches = batch.many_batches(jobs, 2)
+    assert(sum(batches, []) == jobs and len(batches) == 2 * batch.MANY_BATCHES_PER_WORKER)
+    assert(len(batch.many_batches([{"input": bytes(batch.MANY_BATCH_SIZE)}] * 64, 2)) == 64)
@@ -0,0 +1,52 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import json
+from bin2hex.bench import parse_size, format_size, bench_formats, bench_cases, generate_image, compare_results, run_startup, main
+from bin2hex.error import *
+
+def test_bench_size():
+    assert(parse_size("64K") == 0x10000 and parse_size("1m") == 0x100000 and parse_size("0x100") == 0x100)
+    assert(format_size(0x10000) == "64K" and format_size(1 << 30) == "1G" and format_size(1000) == "1000")
+
+def test_bench_cases():
+    convert_formats = bench_formats()
+    # The aliases are measured once
+    assert("vhex_dw4" in convert_formats and "verilog_dw4" not in convert_formats)
+    names = [name for name, _, _ in bench_cases("vhex_dw4")]
+    assert(names == ["vhex_dw4", "vhex_dw4+ecc", "vhex_dw4+ecc+skip", "vhex_dw4+pad", "vhex_dw4+split"])
+    # ARM SECDED doesn't support 1-byte words
+    assert([name for name, _, _ in bench_cases("vhex_dw1")] == ["vhex_dw1", "vhex_dw1+pad", "vhex_dw1+split"])
+
+def test_bench_image(tmp_path):
+    generate_image(str(tmp_path / "first.bin"), 0x30000, 1, True)
+    generate_image(str(tmp_path / "second.bin"), 0x30000, 1, True)
+    image = (tmp_path / "first.bin").read_bytes()
+    assert(image == (tmp_path / "second.bin").read_bytes())
+    assert(image[0x10000:0x20000] == b"\xFF" * 0x10000 and image[:0x10000].count(0xFF) < 0x1000)
+
+def test_bench_compare():
+    baseline = [{"case": "vhex_dw4", "size": 1024, "mb_per_s": 100.0}, {"case": "c_uint32", "size": 1024, "mb_per_s": 50.0}]
+    results = [{"case": "vhex_dw4", "size": 1024, "mb_per_s": 95.0}, {"case": "c_uint32", "size": 1024, "mb_per_s": 40.0}, {"case": "denali", "size": 1024, "mb_per_s": 1.0}]
+    assert(compare_results(results, baseline, 0.1) == [("c_uint32", 1024, 40.0, 50.0)])
+
+def test_bench_main(tmp_path):
+    results_file = tmp_path / "results.json"
+    assert(main(["-s", "4K", "-f", "c_uint32", "-r", "1", "-o", str(results_file)]) == SUCCESS)
+    report = json.loads(results_file.read_text())
+    assert([result["case"] for result in report["results"]] == ["c_uint32", "c_uint32+split"])
+    # A baseline much faster than this run flags all the cases
+    for result in report["results"]:
+        result["mb_per_s"] *= 1000
+    results_file.write_text(json.dumps(report))
+    assert(main(["-s", "4K", "-f", "c_uint32", "-r", "1", "-b", str(results_file)]) == GENERAL_FAIL)
+    assert(main(["-f", "no_format"]) == INVALID_FORMAT)
+
+def test_bench_startup():
+    results = run_startup(1)
+    assert([result["case"] for result in results] == ["startup+python", "startup+import", "startup", "startup+ecc"])
+    assert(all(result["seconds"] > 0 for result in results))
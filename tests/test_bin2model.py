@@ -60,4 +60,36 @@ test_hex_denali_67_bytes = \
 
 def test_bin_to_denali_67_bytes():
     output_data = bin2model.bin_to_denali(test_binary_67_bytes)
-    assert(output_data == test_hex_denali_67_bytes)
\ No newline at end of file
+    assert(output_data == test_hex_denali_67_bytes)
+
+# The addresses of the lines crossing the 64K ranges
+def test_bin_to_denali_64k_ranges():
+    input_data = test_binary_64_bytes * 0x900
+    output_data = bin2model.bin_to_denali(input_data)
+    assert(output_data == "\n".join(f"{i:X}/{input_data[i]:02X};" for i in range(len(input_data))))
+
+# denali_dw4
+test_hex_denali_dw4_64_bytes = \
+"0/9B452AFC;\n1/74A15A99;\n2/F218DCAB;\n3/B30D22D3;\n4/842B121E;\n5/D282ACE3;\n6/D610C24C;\n7/B00239B9;\n" \
+"8/B9739BA7;\n9/BC83E9CA;\nA/D901F881;\nB/4C00C1D9;\nC/582174C0;\nD/055A3D1A;\nE/8482FEE7;\nF/5408749C;"
+
+def test_bin_to_denali_dw4_64_bytes():
+    output_data = bin2model.bin_to_denali_dw4(test_binary_64_bytes)
+    assert(output_data == test_hex_denali_dw4_64_bytes)
+
+# denali_dw8
+test_hex_denali_dw8_67_bytes = \
+"0/74A15A999B452AFC;\n1/B30D22D3F218DCAB;\n2/D282ACE3842B121E;\n3/B00239B9D610C24C;\n" \
+"4/BC83E9CAB9739BA7;\n5/4C00C1D9D901F881;\n6/055A3D1A582174C0;\n7/5408749C8482FEE7;\n8/0000000000708A68;"
+
+def test_bin_to_denali_dw8_67_bytes():
+    output_data = bin2model.bin_to_denali_dw8(test_binary_67_bytes)
+    assert(output_data == test_hex_denali_dw8_67_bytes)
+
+# The addresses crossing the count of hex digits and the 64K ranges
+@pytest.mark.parametrize("start_address", [0x0, 0xFF0, 0xFFFF8, 0x123456780])
+@pytest.mark.parametrize("data_width", [1, 4])
+def test_iter_denali_address(start_address, data_width):
+    input_data = test_binary_64_bytes * 0x500
+    output_data = "\n".join(bin2model.iter_denali_dwn([input_data], data_width, start_address * data_width))
+    assert(output_data == "\n".join(f"{start_address + i // data_width:X}/{input_data[i : i + data_width][::-1].hex().upper()};" for i in range(0, len(input_data), data_width)))
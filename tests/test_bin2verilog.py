@@ -7,6 +7,7 @@
 
 import pytest
 import bin2hex.bin2verilog as bin2verilog
+import bin2hex.ecc as ecc
 
 # Test data generated by RNG tool
 test_binary_61_bytes = \
@@ -582,6 +583,11 @@ def test_bin_to_vhex_addr_dw16_invalid_address():
     with pytest.raises(ValueError):
         output_data = bin2verilog.bin_to_vhex_addr_dw16(test_binary_64_bytes, 0x4, 32)
 
+# The addresses above 32 bits are printed with all their digits
+def test_bin_to_vhex_addr_dw4_large_address():
+    output_data = bin2verilog.bin_to_vhex_addr_dw4(test_binary_64_bytes, 0xFFFFFFE0, 32)
+    assert(output_data == bin2verilog.bin_to_vhex_addr_dw4(test_binary_64_bytes, 0, 32).replace("@00000000", "@FFFFFFE0").replace("@00000020", "@100000000"))
+
 # vbin_dw1
 test_hex_vbin_dw1_64_bytes = \
     "01000101\n11011001\n01011000\n00010110\n00010010\n10011011\n10011101\n01000111\n" \
@@ -790,3 +796,104 @@ def test_bin_to_vbin_dw16_67_bytes():
     output_data = bin2verilog.bin_to_vbin_dw16(test_binary_67_bytes)
     assert(output_data == test_hex_vbin_dw16_67_bytes)
 
+
+# ECC
+
+@pytest.mark.parametrize("ecc_skip", [None, 0xFF])
+def test_bin_to_vhex_dw4_ecc_batch(ecc_skip):
+    input_data = test_binary_67_bytes[:32] + b"\xFF" * 8 + test_binary_67_bytes[32:]
+    output_data = bin2verilog.bin_to_vhex_dw4(input_data, ecc.ecc_encode_arm_secded, ecc_skip, 2, 0xA5, 0x0)
+    output_data_batch = bin2verilog.bin_to_vhex_dw4(input_data, ecc.ecc_encode_arm_secded, ecc_skip, 2, 0xA5, 0x0, ecc.ecc_encode_arm_secded_batch)
+    assert(output_data_batch == output_data)
+
+def custom_ecc_encode(data:bytes, data_width:int, start_address:int) -> bytes:
+    return data + bytes([(sum(data) + start_address) & 0xFF])
+
+def custom_ecc_encode_batch(buffer:memoryview, data_width:int, start_address:int) -> bytes:
+    return bytes((sum(buffer[i : i + data_width]) + start_address + i) & 0xFF for i in range(0, len(buffer), data_width))
+
+def test_bin_to_vhex_dw2_custom_ecc_batch():
+    output_data = bin2verilog.bin_to_vhex_dw2(test_binary_64_bytes, custom_ecc_encode, None, 0, 0xFF, 0x100)
+    output_data_batch = bin2verilog.bin_to_vhex_dw2(test_binary_64_bytes, custom_ecc_encode, None, 0, 0xFF, 0x100, custom_ecc_encode_batch)
+    assert(output_data_batch == output_data)
+
+# The long erased runs are not encoded, and the output is the same as skipping the ECC word by word
+test_binary_erased = test_binary_64_bytes + b"\xFF" * 3 + b"\xFF" * 8 + test_binary_64_bytes[:8] + b"\xFF" * 0x203 + test_binary_64_bytes + b"\xFF" * 0x100
+
+def erased_reference(input_data:bytes, data_width:int, ecc_skip:int, start_address:int) -> str:
+    input_data = input_data + b"\x00" * (-len(input_data) % data_width)
+    words = []
+    for i in range(0, len(input_data), data_width):
+        data = input_data[i : i + data_width]
+        word = custom_ecc_encode(data, data_width, start_address + i)
+        if data == bytes([ecc_skip]) * data_width:
+            word = bytes([ecc_skip]) * len(word)
+        words.append((word + b"\xA5")[::-1].hex().upper())
+    return "\n".join(words)
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_bin_to_vhex_dw4_erased(batch):
+    encoded_words = []
+    def counted_ecc_encode(data:bytes, data_width:int, start_address:int) -> bytes:
+        encoded_words.append(data)
+        return custom_ecc_encode(data, data_width, start_address)
+    ecc_encode_batch = custom_ecc_encode_batch if batch else None
+    output_data = bin2verilog.bin_to_vhex_dw4(test_binary_erased, counted_ecc_encode, 0xFF, 1, 0xA5, 0x40, ecc_encode_batch)
+    assert(output_data == erased_reference(test_binary_erased, 4, 0xFF, 0x40))
+    if not batch:
+        # Only the short erased runs and the word to know the ECC width are encoded
+        assert(len(encoded_words) < len(test_binary_erased) // 4 // 2)
+
+def test_bin_to_vbin_dw4_erased():
+    output_data = bin2verilog.bin_to_vbin_dw4(test_binary_erased, custom_ecc_encode, 0xFF, 1, 0xA5, 0x40)
+    reference_lines = erased_reference(test_binary_erased, 4, 0xFF, 0x40).split("\n")
+    assert(output_data.split("\n") == [bin(int(line, 16))[2:].zfill(len(line) * 4) for line in reference_lines])
+
+# Sparse
+
+# The runs of fill words are left out, and the word index is written where the data resumes
+test_binary_sparse = b"\xFF" * 0x20 + test_binary_64_bytes + b"\xFF" * 0x0C + test_binary_61_bytes[:4] + b"\xFF" * 0x1000 + test_binary_67_bytes + b"\xFF" * 0x40
+
+def sparse_reference(output_data:str, fill_line:str) -> str:
+    lines = output_data.split("\n")
+    sparse_lines = []
+    i = 0
+    while i < len(lines):
+        j = i
+        while j < len(lines) and lines[j] == fill_line:
+            j += 1
+        if j - i >= bin2verilog.SPARSE_RUN_MIN:
+            if j < len(lines):
+                sparse_lines.append(f"@{j:08X}")
+        else:
+            sparse_lines += lines[i:j]
+        if j < len(lines):
+            sparse_lines.append(lines[j])
+        i = j + 1
+    return "\n".join(sparse_lines)
+
+def test_bin_to_vhex_dw4_sparse():
+    output_data = bin2verilog.bin_to_vhex_dw4(test_binary_sparse, sparse_fill = 0xFF)
+    assert(output_data.startswith("@00000008\n1658D945"))
+    assert(output_data == sparse_reference(bin2verilog.bin_to_vhex_dw4(test_binary_sparse), "FFFFFFFF"))
+    # The short runs of fill words are written
+    assert("FFFFFFFF" in output_data)
+    # The word index is kept across the blocks
+    input_blocks = [test_binary_sparse[:0x100], test_binary_sparse[0x100:0x800], test_binary_sparse[0x800:]]
+    assert("\n".join(chunk for chunk in bin2verilog.iter_vhex_dw4(input_blocks, sparse_fill = 0xFF) if chunk) == output_data)
+
+def test_bin_to_vbin_dw2_sparse():
+    output_data = bin2verilog.bin_to_vbin_dw2(test_binary_sparse, sparse_fill = 0xFF)
+    assert(output_data == sparse_reference(bin2verilog.bin_to_vbin_dw2(test_binary_sparse), "1" * 16))
+
+def test_bin_to_vhex_dw4_sparse_erased():
+    # The erased words are left out without calculating their ECC, when their ECC and padding are the fill too
+    output_data = bin2verilog.bin_to_vhex_dw4(test_binary_sparse, ecc.ecc_encode_arm_secded, 0xFF, 1, 0xFF, 0x0, ecc.ecc_encode_arm_secded_batch, 0xFF)
+    dense_data = bin2verilog.bin_to_vhex_dw4(test_binary_sparse, ecc.ecc_encode_arm_secded, 0xFF, 1, 0xFF, 0x0, ecc.ecc_encode_arm_secded_batch)
+    assert(output_data == sparse_reference(dense_data, "FFFFFFFFFF" + "FF"))
+
+def test_bin_to_vhex_addr_dw4_sparse():
+    output_data = bin2verilog.bin_to_vhex_addr_dw4(test_binary_sparse, 0x100, 16, 0xFF)
+    dense_lines = bin2verilog.bin_to_vhex_addr_dw4(test_binary_sparse, 0x100, 16).split("\n")
+    assert(output_data.split("\n") == [line for line in dense_lines if not line.endswith(" FFFFFFFF" * 4)])
+    assert(output_data.startswith("@00000120 "))
@@ -0,0 +1,93 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import os
+import random
+import bin2hex.cache as cache
+from bin2hex.cache import ConversionCache
+from bin2hex.plan import ConversionPlan
+
+test_binary = random.Random(16).randbytes(0x1000)
+
+def convert_cached(conversion_cache:ConversionCache, plan:ConversionPlan, input_file:str, output_file:str) -> bool:
+    with open(input_file, 'rb') as ifile:
+        return conversion_cache.convert_file(plan, ifile, output_file)
+
+def test_cache_hit(tmp_path):
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary)
+    output_file = tmp_path / "output.hex"
+    conversion_cache = ConversionCache(str(tmp_path / "cache"))
+    plan = ConversionPlan("vhex_dw4", ecc = "arm_secded", pad_count = 1)
+    assert(convert_cached(conversion_cache, plan, str(input_file), str(output_file)) is False)
+    output_file.unlink()
+    assert(convert_cached(conversion_cache, plan, str(input_file), str(output_file)) is True)
+    assert(output_file.read_text() == plan.convert(test_binary))
+    # The aliases and the default values share the same entry
+    assert(convert_cached(conversion_cache, ConversionPlan("verilog_dw4", ecc = "arm_secded", pad_count = 1, pad_byte = 0xFF), str(input_file), str(output_file)) is True)
+    stats = conversion_cache.stats()
+    assert(stats["hits"] == 2 and stats["misses"] == 1 and stats["entries"] == 1)
+    # The counters are rewritten in place, the file doesn't grow with the lookups
+    stats_size = (tmp_path / "cache" / cache.CACHE_STATS_FILE).stat().st_size
+    for _ in range(5):
+        convert_cached(conversion_cache, plan, str(input_file), str(output_file))
+    assert(conversion_cache.stats()["hits"] == 7 and (tmp_path / "cache" / cache.CACHE_STATS_FILE).stat().st_size == stats_size)
+
+def test_cache_miss(tmp_path):
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary)
+    output_file = tmp_path / "output.hex"
+    conversion_cache = ConversionCache(str(tmp_path / "cache"))
+    assert(convert_cached(conversion_cache, ConversionPlan("vhex_dw4"), str(input_file), str(output_file)) is False)
+    assert(convert_cached(conversion_cache, ConversionPlan("vhex_dw4", pad_count = 1), str(input_file), str(output_file)) is False)
+    input_file.write_bytes(test_binary[1:])
+    assert(convert_cached(conversion_cache, ConversionPlan("vhex_dw4"), str(input_file), str(output_file)) is False)
+    assert(output_file.read_text() == ConversionPlan("vhex_dw4").convert(test_binary[1:]))
+
+def test_cache_custom_ecc(tmp_path):
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary)
+    output_file = tmp_path / "output.hex"
+    ecc_file = tmp_path / "custom_ecc.py"
+    ecc_file.write_text("def ecc_encode(data, data_width):\n    return data + b'\\x01'\n")
+    conversion_cache = ConversionCache(str(tmp_path / "cache"))
+    assert(convert_cached(conversion_cache, ConversionPlan("vhex_dw2", ecc = str(ecc_file)), str(input_file), str(output_file)) is False)
+    # The edited ECC file doesn't hit the entry of its old content
+    ecc_file.write_text("def ecc_encode(data, data_width):\n    return data + b'\\x02'\n")
+    plan = ConversionPlan("vhex_dw2", ecc = str(ecc_file))
+    assert(convert_cached(conversion_cache, plan, str(input_file), str(output_file)) is False)
+    assert(output_file.read_text() == plan.convert(test_binary))
+
+def test_cache_split(tmp_path):
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary)
+    conversion_cache = ConversionCache(str(tmp_path / "cache"))
+    plan = ConversionPlan("vhex_dw4", split_count = 4)
+    convert_cached(conversion_cache, plan, str(input_file), str(tmp_path / "first.hex"))
+    assert(convert_cached(conversion_cache, plan, str(input_file), str(tmp_path / "second.hex")) is True)
+    for i in range(4):
+        assert((tmp_path / f"second_{i}.hex").read_text() == (tmp_path / f"first_{i}.hex").read_text())
+
+def test_cache_evict(tmp_path):
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary)
+    output_file = tmp_path / "output.hex"
+    # The entries are 9K, 11K and 13K bytes, so two entries are kept at most
+    conversion_cache = ConversionCache(str(tmp_path / "cache"), 0x6000)
+    keys = []
+    for i in range(3):
+        plan = ConversionPlan("vhex_dw4", pad_count = i)
+        with open(input_file, 'rb') as ifile:
+            keys.append(conversion_cache.key(plan, ifile))
+        convert_cached(conversion_cache, plan, str(input_file), str(output_file))
+        # The entries are told apart by their last use
+        os.utime(tmp_path / "cache" / keys[i], (1000 + i, 1000 + i))
+        if i == 1:
+            # The first entry is used again, so the second one is the least recently used
+            os.utime(tmp_path / "cache" / keys[0], (2000, 2000))
+    assert(sorted(os.listdir(tmp_path / "cache")) == sorted([keys[0], keys[2], cache.CACHE_STATS_FILE]))
+    assert(conversion_cache.stats()["size"] <= 0x6000)
@@ -0,0 +1,70 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import random
+import pytest
+import bin2hex.ecc as ecc
+
+test_binary_16_bytes = bytes(range(16))
+
+# Check bytes generated by the bit-by-bit matrix implementation
+test_ecc_arm_secded = [
+    (4, test_binary_16_bytes[:4], b"\x7E"),
+    (4, b"\xFF" * 4, b"\x00"),
+    (4, b"\x00" * 4, b"\x42"),
+    (8, test_binary_16_bytes[:8], b"\xB1"),
+    (8, b"\xFF" * 8, b"\xD4"),
+    (8, b"\x00" * 8, b"\x03"),
+    (16, test_binary_16_bytes, b"\x0D\x01"),
+    (16, b"\xFF" * 16, b"\xE0\x01"),
+    (16, b"\x00" * 16, b"\x1E\x00"),
+]
+
+@pytest.mark.parametrize("data_width, data, ecc_bytes", test_ecc_arm_secded)
+def test_ecc_encode_arm_secded(data_width, data, ecc_bytes):
+    assert(ecc.ecc_encode_arm_secded(data, data_width) == data + ecc_bytes)
+
+def bitwise_ecc(data:bytes, check_matrix:list, odd_even_key:list) -> int:
+    ecc_value = 0
+    for i in range(len(check_matrix)):
+        parity = odd_even_key[i]
+        for j in range(len(data) * 8):
+            parity ^= ((data[j // 8] >> (j % 8)) & 1) & check_matrix[i][j]
+        ecc_value |= parity << i
+    return ecc_value
+
+# The lookup tables must match the parity check matrices bit by bit
+@pytest.mark.parametrize("data_width, check_matrix, odd_even_key", [
+    (4, ecc.ARM_SECDED_32BIT_CB, ecc.ARM_SECDED_32BIT_KEY),
+    (8, ecc.ARM_SECDED_64BIT_CB, ecc.ARM_SECDED_64BIT_KEY),
+    (16, ecc.ARM_SECDED_128BIT_CB, ecc.ARM_SECDED_128BIT_KEY),
+])
+def test_ecc_encode_arm_secded_random(data_width, check_matrix, odd_even_key):
+    rng = random.Random(data_width)
+    for _ in range(200):
+        data = bytes(rng.randrange(256) for _ in range(data_width))
+        ecc_bytes = ecc.ecc_encode_arm_secded(data, data_width)[data_width:]
+        assert(int.from_bytes(ecc_bytes, 'little') == bitwise_ecc(data, check_matrix, odd_even_key))
+
+def test_ecc_encode_arm_secded_invalid_width():
+    with pytest.raises(ValueError):
+        ecc.ecc_encode_arm_secded(b"\x00\x00", 2)
+
+# The batch encoder must give the same check bytes as the word encoder with every engine
+@pytest.mark.parametrize("engine_str", ["python", "numpy"])
+@pytest.mark.parametrize("data_width", [4, 8, 16])
+def test_ecc_encode_arm_secded_batch(engine_str, data_width):
+    if engine_str == "numpy":
+        pytest.importorskip("numpy")
+    rng = random.Random(data_width)
+    input_data = bytes(rng.randrange(256) for _ in range(data_width * 100))
+    ecc_data = b"".join(ecc.ecc_encode_arm_secded(input_data[i : i + data_width], data_width)[data_width:] for i in range(0, len(input_data), data_width))
+    assert(ecc.ecc_encode_arm_secded_batch(input_data, data_width, engine = engine_str) == ecc_data)
+
+def test_ecc_encode_arm_secded_batch_invalid_width():
+    with pytest.raises(ValueError):
+        ecc.ecc_encode_arm_secded_batch(b"\x00\x00", 2)
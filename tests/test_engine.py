@@ -0,0 +1,68 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import random
+import pytest
+import bin2hex.engine as engine
+
+test_binary_64_bytes = \
+    b"\x45\xD9\x58\x16\x12\x9B\x9D\x47\x96\xBF\x19\x6C\xF6\xD6\x9E\x2D" \
+    b"\xE6\x59\x1A\xF1\x01\xE2\x01\xEE\xA9\xDB\xDE\xD5\x31\xE5\x79\xA3" \
+    b"\x88\x7F\x61\x27\xA8\xC6\xC7\x4A\x81\x4C\xEE\x1C\x1B\x5C\xA3\x3D" \
+    b"\x26\x2E\x8C\x2A\x4F\xE5\x2E\x71\xE0\x55\xFE\xF0\xAD\xDD\xF3\x88"
+
+test_hex_dw4_64_bytes = \
+    "1658D945\n479D9B12\n6C19BF96\n2D9ED6F6\n" \
+    "F11A59E6\nEE01E201\nD5DEDBA9\nA379E531\n" \
+    "27617F88\n4AC7C6A8\n1CEE4C81\n3DA35C1B\n" \
+    "2A8C2E26\n712EE54F\nF0FE55E0\n88F3DDAD"
+
+@pytest.mark.parametrize("engine_str", engine.engine_list)
+def test_hex_words_dw4_64_bytes(engine_str):
+    output_data = engine.hex_words(test_binary_64_bytes, 4, engine = engine_str)
+    assert(output_data == test_hex_dw4_64_bytes)
+
+@pytest.mark.parametrize("engine_str", engine.engine_list)
+def test_hex_words_empty(engine_str):
+    assert(engine.hex_words(b"", 4, engine = engine_str) == "")
+
+# All the engines must give the same result as the reference python engine
+@pytest.mark.parametrize("engine_str", engine.engine_list)
+@pytest.mark.parametrize("word_width", [1, 2, 3, 4, 5, 8, 16, 18])
+@pytest.mark.parametrize("swap_endian", [False, True])
+def test_hex_words_random(engine_str, word_width, swap_endian):
+    rng = random.Random(word_width)
+    input_data = bytes(rng.randrange(256) for _ in range(word_width * 97))
+    output_data = engine.hex_words(input_data, word_width, swap_endian, engine = engine_str)
+    assert(output_data == engine.hex_words_python(input_data, word_width, swap_endian))
+
+def test_swap_words():
+    assert(engine.swap_words(b"\x00\x01\x02\x03\x04\x05", 3) == b"\x02\x01\x00\x05\x04\x03")
+
+@pytest.mark.parametrize("engine_str", engine.engine_list)
+def test_hex_lines(engine_str):
+    output_lines = engine.hex_lines(test_binary_64_bytes[:20], 2, 8, engine = engine_str)
+    assert(output_lines == ["D945 1658 9B12 479D", "BF96 6C19 D6F6 2D9E", "59E6 F11A"])
+
+# The binary digits are the same as the digits converted from the hex strings
+@pytest.mark.parametrize("engine_str", engine.engine_list)
+@pytest.mark.parametrize("word_width", [1, 2, 4, 5, 16])
+@pytest.mark.parametrize("swap_endian", [False, True])
+def test_bin_words(engine_str, word_width, swap_endian):
+    rng = random.Random(word_width)
+    input_data = bytes(rng.randrange(256) for _ in range(word_width * 33))
+    hex_lines = engine.hex_words(input_data, word_width, swap_endian, engine = engine_str).split("\n")
+    output_data = engine.bin_words(input_data, word_width, swap_endian, engine = engine_str)
+    assert(output_data.split("\n") == [bin(int(line, 16))[2:].zfill(len(line) * 4) for line in hex_lines])
+
+@pytest.mark.parametrize("engine_str", engine.engine_list)
+def test_bin_words_empty(engine_str):
+    assert(engine.bin_words(b"", 4, engine = engine_str) == "")
+
+@pytest.mark.parametrize("engine_str", engine.engine_list)
+def test_bin_words_separator(engine_str):
+    assert(engine.bin_words(b"\x01\x80\x0F\xF0", 2, separator = ", ", engine = engine_str) == "1000000000000001, 1111000000001111")
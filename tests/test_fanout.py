@@ -0,0 +1,51 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import random
+import pytest
+import bin2hex.ecc as ecc
+import bin2hex.fanout as fanout
+from bin2hex.error import *
+
+test_binary = random.Random(18).randbytes(0x3000) + b"\xFF" * 0x400 + random.Random(18).randbytes(0x105)
+
+def test_fanout_plans():
+    plans = fanout.fanout_plans(["vhex_dw4", "vbin_dw4", "c_uint32", "denali"], ecc = "arm_secded", ecc_skip_all_ones = True, pad_count = 1, align_width = 8)
+    # The options are given to the formats which support them
+    assert("ecc_encode" in plans[0].kwargs and "ecc_encode" in plans[1].kwargs)
+    assert("ecc_encode" not in plans[2].kwargs and plans[2].kwargs["align_width"] == 8)
+    assert(plans[3].kwargs == {})
+
+def test_fanout_plans_error():
+    # The option which is supported by none of the formats
+    with pytest.raises(ConversionError) as e:
+        fanout.fanout_plans(["c_uint32", "denali"], ecc = "arm_secded")
+    assert(e.value.code == INVALID_OPTION)
+    with pytest.raises(ConversionError) as e:
+        fanout.fanout_plans(["vhex_dw4", "vhex_dw3"])
+    assert(e.value.code == INVALID_FORMAT)
+
+def test_convert_file_fanout(tmp_path, monkeypatch):
+    encoded_words = []
+    def counted_ecc_encode_batch(buffer:memoryview, data_width:int) -> bytes:
+        encoded_words.append(len(buffer) // data_width)
+        return ecc.ecc_encode_arm_secded_batch(buffer, data_width)
+    monkeypatch.setitem(ecc.ecc_dict["arm_secded"], "batch_function", counted_ecc_encode_batch)
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary)
+    convert_formats = ["vhex_dw4", "vbin_dw4", "c_uint32", "denali_dw4", "vhex_dw8"]
+    output_files = [str(tmp_path / f"output_{i}.txt") for i in range(len(convert_formats))]
+    options = {"ecc": "arm_secded", "ecc_skip_all_ones": True, "pad_count": 1, "split_count": 2}
+    plans = fanout.fanout_plans(convert_formats, **options)
+    with open(input_file, 'rb') as ifile:
+        fanout.convert_file_fanout(plans, ifile, output_files)
+    # The words of vhex_dw4 and vbin_dw4 are encoded once for both formats
+    assert(sum(encoded_words) < len(test_binary) // 4 + len(test_binary) // 8)
+    for plan, output_file in zip(plans, output_files):
+        plan.convert_file(str(input_file), str(tmp_path / "reference.txt"))
+        for split_file, reference_file in zip(plan.output_files(output_file), plan.output_files(str(tmp_path / "reference.txt"))):
+            assert(open(split_file).read() == open(reference_file).read())
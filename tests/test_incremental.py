@@ -0,0 +1,95 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import random
+import pytest
+import bin2hex.ecc as ecc
+import bin2hex.incremental as incremental
+from bin2hex.plan import ConversionPlan
+
+test_binary = random.Random(17).randbytes(0x5000 + 3)
+
+def convert_incremental(plan:ConversionPlan, input_file:str, output_file:str) -> bool:
+    with open(input_file, 'rb') as ifile:
+        return incremental.convert_file_incremental(plan, ifile, output_file)
+
+def change_binary(input_data:bytes, offsets:list) -> bytes:
+    input_data = bytearray(input_data)
+    for offset in offsets:
+        input_data[offset] ^= 0x5A
+    return bytes(input_data)
+
+test_incremental_options = [
+    {"convert_format": "vhex_dw4"},
+    {"convert_format": "vhex_dw8", "ecc": "arm_secded", "ecc_skip_all_ones": True, "pad_count": 1},
+    {"convert_format": "vbin_dw2"},
+    {"convert_format": "c_uint32", "align_width": 10},
+    {"convert_format": "vhex_addr_dw4", "start_address": 0x100, "align_width": 24},
+]
+
+@pytest.mark.parametrize("options", test_incremental_options)
+def test_convert_file_incremental(tmp_path, options):
+    input_file = tmp_path / "input.bin"
+    output_file = tmp_path / "output.hex"
+    plan = ConversionPlan(**options)
+    input_file.write_bytes(test_binary)
+    assert(convert_incremental(plan, str(input_file), str(output_file)) is False)
+    # The first, middle and last blocks are changed
+    input_data = change_binary(test_binary, [0x10, 0x2345, 0x2346, len(test_binary) - 1])
+    input_file.write_bytes(input_data)
+    assert(convert_incremental(plan, str(input_file), str(output_file)) is True)
+    assert(output_file.read_text() == plan.convert(input_data))
+    # Nothing is changed
+    assert(convert_incremental(plan, str(input_file), str(output_file)) is True)
+    assert(output_file.read_text() == plan.convert(input_data))
+
+def test_convert_file_incremental_ecc_words(tmp_path, monkeypatch):
+    input_file = tmp_path / "input.bin"
+    output_file = tmp_path / "output.hex"
+    encoded_words = []
+    def counted_ecc_encode(data:bytes, data_width:int) -> bytes:
+        encoded_words.append(data)
+        return ecc.ecc_encode_arm_secded(data, data_width)
+    monkeypatch.setitem(ecc.ecc_dict["arm_secded"], "function", counted_ecc_encode)
+    monkeypatch.setitem(ecc.ecc_dict["arm_secded"], "batch_function", None)
+    plan = ConversionPlan("vhex_dw4", ecc = "arm_secded")
+    input_file.write_bytes(test_binary)
+    convert_incremental(plan, str(input_file), str(output_file))
+    encoded_words.clear()
+    input_file.write_bytes(change_binary(test_binary, [0x2345]))
+    assert(convert_incremental(plan, str(input_file), str(output_file)) is True)
+    # Only the words of the changed block are encoded again
+    assert(len(encoded_words) == incremental.INCREMENTAL_BLOCK_SIZE // 4)
+
+def test_convert_file_incremental_fallback(tmp_path):
+    input_file = tmp_path / "input.bin"
+    output_file = tmp_path / "output.hex"
+    plan = ConversionPlan("vhex_dw4")
+    input_file.write_bytes(test_binary)
+    convert_incremental(plan, str(input_file), str(output_file))
+    # The size of the input is changed
+    input_file.write_bytes(test_binary[:-4])
+    assert(convert_incremental(plan, str(input_file), str(output_file)) is False)
+    assert(output_file.read_text() == plan.convert(test_binary[:-4]))
+    # The output file is changed by someone else
+    output_file.write_text("")
+    assert(convert_incremental(plan, str(input_file), str(output_file)) is False)
+    assert(output_file.read_text() == plan.convert(test_binary[:-4]))
+    # The options are changed
+    plan = ConversionPlan("vhex_dw4", pad_count = 1)
+    assert(convert_incremental(plan, str(input_file), str(output_file)) is False)
+    assert(output_file.read_text() == plan.convert(test_binary[:-4]))
+
+def test_convert_file_incremental_unsupported(tmp_path):
+    input_file = tmp_path / "input.bin"
+    output_file = tmp_path / "output.hex"
+    input_file.write_bytes(test_binary)
+    plan = ConversionPlan("denali")
+    assert(convert_incremental(plan, str(input_file), str(output_file)) is False)
+    assert(convert_incremental(plan, str(input_file), str(output_file)) is False)
+    assert(output_file.read_text() == plan.convert(test_binary))
+    assert(not (tmp_path / ("output.hex" + incremental.SIDECAR_SUFFIX)).exists())
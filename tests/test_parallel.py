@@ -0,0 +1,59 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import random
+import pytest
+import bin2hex.parallel as parallel
+import bin2hex.plan as plan
+from bin2hex.plan import ConversionPlan
+
+test_binary = random.Random(9).randbytes(0x3000 + 5)
+
+def test_cpu_count():
+    assert(parallel.cpu_count() >= 1)
+
+def test_shard_ranges():
+    shards = parallel.shard_ranges(0x30000, 24, 2)
+    assert(all(length % 24 == 0 for _, length in shards[:-1]))
+    assert(sum(length for _, length in shards) == 0x30000)
+    assert([offset for offset, _ in shards] == [sum(length for _, length in shards[:i]) for i in range(len(shards))])
+
+# The parallel conversion must give the same output as the serial conversion
+test_parallel_options = [
+    {"convert_format": "vhex_dw4"},
+    {"convert_format": "vhex_dw8", "ecc": "arm_secded", "ecc_skip_all_ones": True, "pad_count": 1},
+    {"convert_format": "vhex_addr_dw8", "start_address": 0x1000, "align_width": 20},
+    {"convert_format": "vbin_dw2"},
+    {"convert_format": "c_uint16", "align_width": 10},
+    {"convert_format": "denali"},
+]
+
+@pytest.mark.parametrize("options", test_parallel_options)
+def test_stream_file_parallel(tmp_path, monkeypatch, options):
+    # Small shards, so the small test input is split into many shards
+    monkeypatch.setattr(parallel, "SHARD_SIZE_MIN", 0x400)
+    monkeypatch.setattr(plan, "SHARD_SIZE_MIN", 0x400)
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary)
+    conversion_plan = ConversionPlan(**options)
+    with open(input_file, 'rb') as ifile:
+        output_chunks = list(conversion_plan.stream_file(ifile, 3))
+    assert(len(output_chunks) > 1)
+    assert(conversion_plan.separator.join(output_chunks) == conversion_plan.convert(test_binary))
+
+def test_stream_file_parallel_custom_ecc(tmp_path, monkeypatch):
+    monkeypatch.setattr(parallel, "SHARD_SIZE_MIN", 0x400)
+    monkeypatch.setattr(plan, "SHARD_SIZE_MIN", 0x400)
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary)
+    ecc_file = tmp_path / "address_ecc.py"
+    ecc_file.write_text("def ecc_encode(data, data_width, start_address):\n    return data + (start_address >> 2 & 0xFF).to_bytes(1, 'little')\n")
+    conversion_plan = ConversionPlan("vhex_dw4", start_address = 0x100, ecc = str(ecc_file))
+    with open(input_file, 'rb') as ifile:
+        output_data = "\n".join(conversion_plan.stream_file(ifile, 2))
+    # The address of every shard is propagated to the ECC function
+    assert(output_data == "\n".join(conversion_plan.stream([test_binary])))
@@ -0,0 +1,98 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import pytest
+import bin2hex.bin2verilog as bin2verilog
+import bin2hex.ecc as ecc
+from bin2hex.error import *
+from bin2hex.plan import ConversionPlan
+
+test_binary_64_bytes = bytes(range(0x40, 0x80))
+
+def test_plan_convert():
+    plan = ConversionPlan("vhex_dw4", ecc = "arm_secded", pad_count = 1)
+    output_data = bin2verilog.bin_to_vhex_dw4(test_binary_64_bytes, ecc.ecc_encode_arm_secded, None, 1, 0xFF, 0x0, ecc.ecc_encode_arm_secded_batch)
+    # The plan is reusable for any count of conversions
+    assert(plan.convert(test_binary_64_bytes) == output_data)
+    assert(plan.convert(test_binary_64_bytes) == output_data)
+    assert("\n".join(plan.stream([test_binary_64_bytes[:20], test_binary_64_bytes[20:]])) == output_data)
+
+def test_plan_convert_file(tmp_path):
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary_64_bytes)
+    output_file = tmp_path / "output.hex"
+    ConversionPlan("c_uint32").convert_file(str(input_file), str(output_file))
+    assert(output_file.read_text() == ConversionPlan("c_uint32").convert(test_binary_64_bytes))
+
+test_plan_errors = [
+    ({"convert_format": "vhex_dw3"}, INVALID_FORMAT),
+    ({"convert_format": "denali", "start_address": 0x100}, INVALID_OPTION),
+    ({"convert_format": "vhex_dw4", "align_width": 8}, INVALID_OPTION),
+    ({"convert_format": "vhex_dw4", "ecc": "arm_secded", "ecc_skip_all_ones": True, "ecc_skip_all_zeros": True}, INVALID_OPTION),
+    ({"convert_format": "vhex_dw4", "ecc": "unknown"}, INVALID_OPTION),
+    ({"convert_format": "vhex_dw4", "ecc": "arm_secded", "start_address": 0x100}, INVALID_OPTION),
+    ({"convert_format": "vhex_dw4", "ecc_skip_all_ones": True}, INVALID_OPTION),
+    ({"convert_format": "vhex_dw4", "pad_count": -1}, INVALID_OPTION),
+    ({"convert_format": "vhex_dw4", "pad_byte": 0x00}, INVALID_OPTION),
+    ({"convert_format": "vhex_dw4", "split_count": 3}, INVALID_OPTION),
+]
+
+@pytest.mark.parametrize("options, code", test_plan_errors)
+def test_plan_error(options, code):
+    with pytest.raises(ConversionError) as e:
+        ConversionPlan(**options)
+    assert(e.value.code == code)
+
+def test_plan_convert_file_missing(tmp_path):
+    with pytest.raises(ConversionError) as e:
+        ConversionPlan().convert_file(str(tmp_path / "missing.bin"), str(tmp_path / "output.hex"))
+    assert(e.value.code == INVALID_INPUT_FILE)
+
+def address_ecc_encode(data:bytes, data_width:int, start_address:int) -> bytes:
+    return data + (start_address & 0xFF).to_bytes(1, 'little')
+
+def test_word_encoder_address():
+    encoder = bin2verilog.WordEncoder(4, address_ecc_encode, pad_count = 1, pad_byte = 0xAA)
+    assert(encoder.ecc_encode_address is True)
+    assert(encoder.to_hex(test_binary_64_bytes[:8], 0x10) == "AA1043424140\nAA1447464544")
+    # The encoder is reusable for the following blocks
+    assert(encoder.to_hex(test_binary_64_bytes[8:12], 0x18) == "AA184B4A4948")
+
+def variable_ecc_encode(data:bytes, data_width:int) -> bytes:
+    return data + b"\x00" * ((data[0] >> 2) & 1)
+
+def test_word_encoder_variable_width():
+    encoder = bin2verilog.WordEncoder(4, variable_ecc_encode)
+    with pytest.raises(ValueError):
+        encoder.to_hex(test_binary_64_bytes[:8])
+
+def test_plan_sparse(tmp_path):
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(b"\x00" * 0x20 + test_binary_64_bytes)
+    output_file = tmp_path / "output.hex"
+    ConversionPlan("vhex_dw8", sparse_fill = 0x00).convert_file(str(input_file), str(output_file), 2)
+    assert(output_file.read_text() == "@00000004\n" + bin2verilog.bin_to_vhex_dw8(test_binary_64_bytes))
+
+test_plan_sparse_errors = [
+    {"convert_format": "denali", "sparse_fill": 0xFF},
+    {"convert_format": "vhex_dw4", "sparse_fill": 0x100},
+    {"convert_format": "vhex_dw4", "sparse_fill": 0xFF, "split_count": 2},
+]
+
+@pytest.mark.parametrize("options", test_plan_sparse_errors)
+def test_plan_sparse_error(options):
+    with pytest.raises(ConversionError) as e:
+        ConversionPlan(**options)
+    assert(e.value.code == INVALID_OPTION)
+
+def test_word_encoder_to_texts():
+    encoder = bin2verilog.WordEncoder(4, ecc.ecc_encode_arm_secded, 0xFF, 1, 0xFF, sparse_fill = 0xFF)
+    input_data = test_binary_64_bytes + b"\xFF" * 0x40 + test_binary_64_bytes
+    hex_text, bin_text = encoder.to_texts(input_data, 0x0, [bin2verilog.hex_words, bin2verilog.bin_words])
+    assert("@00000020" in hex_text.split("\n"))
+    assert(hex_text == bin2verilog.bin_to_vhex_dw4(input_data, ecc.ecc_encode_arm_secded, 0xFF, 1, 0xFF, sparse_fill = 0xFF))
+    assert(bin_text == bin2verilog.bin_to_vbin_dw4(input_data, ecc.ecc_encode_arm_secded, 0xFF, 1, 0xFF, sparse_fill = 0xFF))
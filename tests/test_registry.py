@@ -0,0 +1,48 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import sys
+import pkgutil
+import importlib
+import bin2hex
+import subprocess
+import bin2hex.main as main
+from bin2hex.registry import format_modules, ecc_modules, format_dict, ecc_dict
+
+# The names of the lazy registry are written by hand, they must be the same as the dicts of the modules, in the same order
+def test_registry_names():
+    for modules in [format_modules, ecc_modules]:
+        for module_name, (dict_name, names) in modules.items():
+            assert(list(getattr(importlib.import_module(module_name), dict_name)) == names)
+
+# Every converter module of the package is registered, so a new module can't be left out of the registry
+def test_registry_modules():
+    names = []
+    for module_info in pkgutil.iter_modules(bin2hex.__path__):
+        # The converters and ECC algorithms of a module are in its dict named after it, such as bin2c_dict
+        dict_name = f"{module_info.name}_dict"
+        if module_info.name == "__main__":
+            continue
+        module = importlib.import_module(f"bin2hex.{module_info.name}")
+        if isinstance(getattr(module, dict_name, None), dict):
+            assert(format_modules.get(module.__name__, ecc_modules.get(module.__name__)) == (dict_name, list(getattr(module, dict_name))))
+            names += list(getattr(module, dict_name))
+    assert(sorted(names) == sorted(list(format_dict) + list(ecc_dict)))
+
+def test_registry_lookup():
+    from bin2hex.bin2verilog import bin2verilog_dict
+    assert(format_dict["vhex_dw4"] is bin2verilog_dict["vhex_dw4"])
+    assert("vhex_dw4" in format_dict and "vhex_dw3" not in format_dict and len(format_dict) == 34)
+    assert(ecc_dict["arm_secded"]["batch_function"] is not None)
+
+def test_registry_lazy():
+    # The command line tool starts without the converters, NumPy and the process pool
+    code = "import sys, bin2hex.main; print(' '.join(sorted(name for name in sys.modules if name.startswith(('bin2hex.bin2', 'bin2hex.ecc', 'numpy', 'concurrent')))))"
+    assert(subprocess.run([sys.executable, "-c", code], capture_output = True, text = True).stdout.strip() == "")
+
+def test_tool_epilog():
+    assert("vhex_addr_dw16:" in main.build_tool_epilog() and "arm_secded:" in main.build_tool_epilog())
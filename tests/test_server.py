@@ -0,0 +1,83 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import os
+import sys
+import stat
+import time
+import random
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from bin2hex.error import *
+from bin2hex.main import main
+from bin2hex.plan import ConversionPlan
+from bin2hex.server import ServerStats, init_worker, request_server, start_worker, strip_server_options
+
+test_binary = random.Random(23).randbytes(0x4000)
+
+def start_server(socket_path:str) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    server = subprocess.Popen([sys.executable, "-m", "bin2hex", "--serve", socket_path, "-j", "2"], env = env, stdout = subprocess.PIPE, text = True)
+    # The server prints its first line when it is listening
+    assert(server.stdout.readline().startswith("Serving on"))
+    return server
+
+def test_server_strip_options():
+    assert(strip_server_options(["--client", "a.sock", "-i", "a.bin", "-o", "a.hex"]) == ["-i", "a.bin", "-o", "a.hex"])
+    assert(strip_server_options(["-i", "a.bin", "--client=a.sock", "--server-stats"]) == ["-i", "a.bin"])
+
+def test_server_stats():
+    stats = ServerStats(2)
+    for _ in range(3):
+        stats.submit()
+    submit_time = time.time()
+    stats.finish(submit_time, submit_time, SUCCESS)
+    stats.finish(submit_time, submit_time, INVALID_INPUT_FILE)
+    snapshot = stats.snapshot()
+    assert(snapshot["in_flight"] == 1 and snapshot["queue_depth"] == 0)
+    assert(snapshot["completed"] == 2 and snapshot["failed"] == 1)
+    assert(snapshot["latency"]["max"] >= snapshot["latency"]["p50"] >= 0)
+
+# Every start task runs in a worker of its own, so all the workers are started
+def test_server_start_workers():
+    executor = ProcessPoolExecutor(4, initializer = init_worker, initargs = (multiprocessing.Barrier(4),))
+    try:
+        assert(len(set(executor.map(start_worker, range(4)))) == 4)
+    finally:
+        executor.shutdown()
+
+def test_server_convert(tmp_path, monkeypatch):
+    socket_path = str(tmp_path / "server.sock")
+    (tmp_path / "input.bin").write_bytes(test_binary)
+    monkeypatch.chdir(tmp_path)
+    server = start_server(socket_path)
+    try:
+        assert(request_server(socket_path, {"command": "ping"})["code"] == SUCCESS)
+        # Only the user of the server can connect to it
+        assert(stat.S_IMODE(os.stat(socket_path).st_mode) & 0o077 == 0)
+        # The relative paths are of the directory of the client
+        assert(main(["--client", socket_path, "-i", "input.bin", "-o", "output.hex", "-f", "vhex_dw4", "-e", "arm_secded"]) == SUCCESS)
+        assert((tmp_path / "output.hex").read_text() == ConversionPlan("vhex_dw4", ecc = "arm_secded").convert(test_binary))
+        monkeypatch.setenv("BIN2HEX_SERVER", socket_path)
+        assert(main(["-i", "missing.bin", "-o", "output.hex"]) == INVALID_INPUT_FILE)
+        assert(main(["-i", "input.bin", "-o", "output.h", "-f", "c_uint32", "-s", "2"]) == SUCCESS)
+        assert((tmp_path / "output_1.h").exists())
+        # The options of the server are not accepted from the requests
+        assert(request_server(socket_path, {"command": "convert", "args": ["--serve", "other.sock"], "cwd": str(tmp_path)})["code"] == INVALID_OPTION)
+        stats = request_server(socket_path, {"command": "stats"})["stats"]
+        assert(stats["workers"] == 2 and stats["completed"] == 3 and stats["failed"] == 1)
+        assert(main(["--server-stats"]) == SUCCESS)
+        # A second server can't listen on the socket of a running server
+        assert(main(["--serve", socket_path]) == INVALID_OPTION)
+    finally:
+        server.terminate()
+        server.wait(10)
+    assert(not os.path.exists(socket_path))
+    # The conversion is done without the server if it is not running
+    assert(main(["-i", "input.bin", "-o", "output2.hex", "-f", "vhex_dw4"]) == SUCCESS)
+    assert(main(["--client", socket_path, "-i", "input.bin", "-o", "output2.hex"]) == GENERAL_FAIL)
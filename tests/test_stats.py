@@ -0,0 +1,62 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import random
+from bin2hex.plan import ConversionPlan
+from bin2hex.cache import ConversionCache
+from bin2hex.stats import STATS_PHASES, ConversionStats
+
+test_binary = random.Random(21).randbytes(0x4000)
+
+def test_stats_convert(tmp_path):
+    input_file = tmp_path / "input.bin"
+    # The second half is erased, so the ECC of its words is skipped
+    input_file.write_bytes(test_binary[:0x2000] + b"\xFF" * 0x2000)
+    output_file = tmp_path / "output.hex"
+    plan = ConversionPlan("vhex_dw4", ecc = "arm_secded", ecc_skip_all_ones = True, pad_count = 1)
+    result = plan.convert_file(str(input_file), str(output_file), stats = True)
+    # The statistics don't change the output
+    assert(output_file.read_text() == plan.convert(input_file.read_bytes()))
+    # There is no split phase without the split
+    assert(result["mode"] == "convert" and all((result["phases"][phase] is None) == (phase == "split") for phase in STATS_PHASES))
+    assert(result["input_bytes"] == 0x4000 and result["words"] == 0x1000 and result["pad_bytes"] == 0x1000)
+    assert(result["output_bytes"] == output_file.stat().st_size)
+    assert(result["ecc_words"] + result["ecc_skipped_words"] == 0x1000 and result["ecc_skipped_words"] >= 0x7F0)
+    assert(plan.convert_file(str(input_file), str(output_file)) is None)
+
+# The erased word encoded to know its width is not counted as an encoded word
+def test_stats_ecc_words(tmp_path):
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary[:0x80] + b"\xFF" * 0x100)
+    plan = ConversionPlan("vhex_dw4", ecc = "arm_secded", ecc_skip_all_ones = True)
+    result = plan.convert_file(str(input_file), str(tmp_path / "output.hex"), stats = True)
+    assert(result["words"] == 96 and result["ecc_words"] == 32 and result["ecc_skipped_words"] == 64)
+
+def test_stats_split(tmp_path):
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary)
+    plan = ConversionPlan("c_uint32", split_count = 4)
+    result = plan.convert_file(str(input_file), str(tmp_path / "output.h"), stats = True)
+    assert(result["ecc_words"] is None and result["pad_bytes"] == 0 and result["phases"]["split"] is not None)
+    assert(result["output_bytes"] == sum((tmp_path / f"output_{i}.h").stat().st_size for i in range(4)))
+
+def test_stats_cache(tmp_path):
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary)
+    output_file = tmp_path / "output.hex"
+    conversion_cache = ConversionCache(str(tmp_path / "cache"))
+    plan = ConversionPlan("vhex_dw4")
+    for mode in ["convert", "cache"]:
+        with open(input_file, 'rb') as ifile:
+            stats = ConversionStats(ifile)
+            conversion_cache.convert_file(plan, ifile, str(output_file), 1, stats)
+        result = stats.finish(plan, str(output_file))
+        assert(result["mode"] == mode and result["input_bytes"] == 0x4000)
+        # The counters of the cache are reported with the statistics
+        assert(result["cache"]["hits"] == int(mode == "cache") and result["cache"]["misses"] == 1 and result["cache"]["entries"] == 1)
+    # The phases of a cache hit are not measured
+    assert(all(result["phases"][phase] is None for phase in STATS_PHASES))
@@ -0,0 +1,99 @@
+#
+# Copyright 2025 Yitao Zhang
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import io
+import pytest
+import bin2hex.stream as stream
+import bin2hex.bin2c as bin2c
+import bin2hex.bin2model as bin2model
+import bin2hex.bin2verilog as bin2verilog
+
+# Test data generated by RNG tool
+test_binary_67_bytes = \
+    b"\x45\xD9\x58\x16\x12\x9B\x9D\x47\x96\xBF\x19\x6C\xF6\xD6\x9E\x2D" \
+    b"\xE6\x59\x1A\xF1\x01\xE2\x01\xEE\xA9\xDB\xDE\xD5\x31\xE5\x79\xA3" \
+    b"\x88\x7F\x61\x27\xA8\xC6\xC7\x4A\x81\x4C\xEE\x1C\x1B\x5C\xA3\x3D" \
+    b"\x26\x2E\x8C\x2A\x4F\xE5\x2E\x71\xE0\x55\xFE\xF0\xAD\xDD\xF3\x88" \
+    b"\x46\xF2\x48"
+
+def test_read_blocks():
+    ifile = io.BytesIO(test_binary_67_bytes)
+    blocks = list(stream.read_blocks(ifile, 16))
+    assert([len(block) for block in blocks] == [16, 16, 16, 16, 3])
+    assert(b"".join(blocks) == test_binary_67_bytes)
+
+def test_align_blocks():
+    chunks = [test_binary_67_bytes[0:5], test_binary_67_bytes[5:8], test_binary_67_bytes[8:30], test_binary_67_bytes[30:]]
+    blocks = list(stream.align_blocks(chunks, 4))
+    assert(all(len(block) % 4 == 0 for block in blocks[:-1]))
+    assert(b"".join(blocks) == test_binary_67_bytes)
+
+def test_write_chunks():
+    ofile = io.StringIO()
+    stream.write_chunks(ofile, ["00\n01", "", "02"], "\n")
+    assert(ofile.getvalue() == "00\n01\n02")
+
+# Every format must give the same output whatever the block size of the input is
+@pytest.mark.parametrize("format_dict", [bin2c.bin2c_dict, bin2model.bin2model_dict, bin2verilog.bin2verilog_dict])
+@pytest.mark.parametrize("block_size", [1, 3, 16, 4096])
+def test_stream_function(format_dict, block_size):
+    for format_str, format_sub_dict in format_dict.items():
+        output_data = format_sub_dict["function"](test_binary_67_bytes)
+        input_blocks = stream.read_blocks(io.BytesIO(test_binary_67_bytes), block_size)
+        output_chunks = format_sub_dict["stream_function"](input_blocks)
+        assert(stream.join_chunks(output_chunks, format_sub_dict["separator"]) == output_data), format_str
+
+def test_read_blocks_mapped(tmp_path):
+    input_file = tmp_path / "input.bin"
+    input_file.write_bytes(test_binary_67_bytes)
+    with open(input_file, 'rb') as ifile:
+        blocks = list(stream.read_blocks_mapped(ifile, 16))
+    assert(all(isinstance(block, memoryview) for block in blocks))
+    assert(b"".join(blocks) == test_binary_67_bytes)
+
+def test_read_blocks_mapped_empty(tmp_path):
+    # An empty file can't be mapped, it is read as usual
+    input_file = tmp_path / "empty.bin"
+    input_file.write_bytes(b"")
+    with open(input_file, 'rb') as ifile:
+        assert(stream.map_file(ifile) is None)
+        assert(list(stream.read_blocks_mapped(ifile)) == [])
+
+def ecc_encode_word(data:bytes, data_width:int, start_address:int) -> bytes:
+    return data + bytes([sum(data) & 0xFF, start_address & 0xFF])
+
+# Every format must give the same output for the views of a mapped file
+@pytest.mark.parametrize("format_dict", [bin2c.bin2c_dict, bin2model.bin2model_dict, bin2verilog.bin2verilog_dict])
+@pytest.mark.parametrize("block_size", [3, 16, 4096])
+def test_stream_function_memoryview(format_dict, block_size):
+    for format_str, format_sub_dict in format_dict.items():
+        output_data = format_sub_dict["function"](test_binary_67_bytes)
+        input_blocks = stream.read_blocks(io.BytesIO(test_binary_67_bytes), block_size)
+        output_chunks = format_sub_dict["stream_function"](memoryview(block) for block in input_blocks)
+        assert(stream.join_chunks(output_chunks, format_sub_dict["separator"]) == output_data), format_str
+
+def test_vhex_ecc_memoryview():
+    output_data = bin2verilog.bin_to_vhex_dw4(test_binary_67_bytes, ecc_encode_word, 0xFF, 1)
+    assert(bin2verilog.bin_to_vhex_dw4(memoryview(test_binary_67_bytes), ecc_encode_word, 0xFF, 1) == output_data)
+
+# The lines are distributed round-robin, the same as splitting the whole output at once
+@pytest.mark.parametrize("split_count", [2, 4, 8])
+@pytest.mark.parametrize("separator", ["\n", ",\n"])
+def test_write_split_chunks(split_count, separator):
+    lines = [f"{i:04X}" for i in range(37)]
+    output_chunks = [separator.join(lines[0:5]), "", separator.join(lines[5:6]), separator.join(lines[6:30]), separator.join(lines[30:])]
+    ofiles = [io.StringIO() for _ in range(split_count)]
+    stream.write_split_chunks(ofiles, output_chunks, separator)
+    output_lines = separator.join(lines).splitlines(keepends=True)
+    for i in range(split_count):
+        assert(ofiles[i].getvalue() == "".join(output_lines[i::split_count]).rstrip("\n"))
+
+def test_write_split_chunks_short():
+    # The files without lines are left empty
+    ofiles = [io.StringIO() for _ in range(4)]
+    stream.write_split_chunks(ofiles, ["00\n01"], "\n")
+    assert([ofile.getvalue() for ofile in ofiles] == ["00", "01", "", ""])